@@ -25,8 +25,8 @@ authentic_testimonials = [
         "service": "Career & Business Guidance",
         "location": "Mumbai, Maharashtra",
         "approved": True,
-        "created_at": datetime(2024, 11, 15).isoformat(),
-        "updated_at": datetime(2024, 11, 15).isoformat()
+        "created_at": datetime(2024, 11, 15),
+        "updated_at": datetime(2024, 11, 15)
     },
     {
         "id": str(uuid.uuid4()),
@@ -37,8 +37,8 @@ authentic_testimonials = [
         "service": "Birth Chart (Kundli) Analysis",
         "location": "Delhi",
         "approved": True,
-        "created_at": datetime(2024, 10, 20).isoformat(),
-        "updated_at": datetime(2024, 10, 20).isoformat()
+        "created_at": datetime(2024, 10, 20),
+        "updated_at": datetime(2024, 10, 20)
     },
     {
         "id": str(uuid.uuid4()),
@@ -49,8 +49,8 @@ authentic_testimonials = [
         "service": "Marriage & Relationship Compatibility",
         "location": "Bangalore, Karnataka",
         "approved": True,
-        "created_at": datetime(2024, 9, 5).isoformat(),
-        "updated_at": datetime(2024, 9, 5).isoformat()
+        "created_at": datetime(2024, 9, 5),
+        "updated_at": datetime(2024, 9, 5)
     },
     {
         "id": str(uuid.uuid4()),
@@ -61,8 +61,8 @@ authentic_testimonials = [
         "service": "Vastu Consultation",
         "location": "Ahmedabad, Gujarat",
         "approved": True,
-        "created_at": datetime(2024, 8, 12).isoformat(),
-        "updated_at": datetime(2024, 8, 12).isoformat()
+        "created_at": datetime(2024, 8, 12),
+        "updated_at": datetime(2024, 8, 12)
     },
     {
         "id": str(uuid.uuid4()),
@@ -73,8 +73,8 @@ authentic_testimonials = [
         "service": "Health & Life Path Insights",
         "location": "Pune, Maharashtra",
         "approved": True,
-        "created_at": datetime(2024, 7, 28).isoformat(),
-        "updated_at": datetime(2024, 7, 28).isoformat()
+        "created_at": datetime(2024, 7, 28),
+        "updated_at": datetime(2024, 7, 28)
     },
     {
         "id": str(uuid.uuid4()),
@@ -85,8 +85,8 @@ authentic_testimonials = [
         "service": "Gemstone Remedies & Sales",
         "location": "Jaipur, Rajasthan",
         "approved": True,
-        "created_at": datetime(2024, 6, 15).isoformat(),
-        "updated_at": datetime(2024, 6, 15).isoformat()
+        "created_at": datetime(2024, 6, 15),
+        "updated_at": datetime(2024, 6, 15)
     }
 ]
 
@@ -106,6 +106,13 @@ async def add_testimonials():
         # Add new testimonials
         result = await db.testimonials.insert_many(authentic_testimonials)
         print(f"\nAdded {len(result.inserted_ids)} authentic testimonials")
+
+        # Invalidate cached testimonial responses (ETag version)
+        await db.content_versions.update_one(
+            {"_id": "testimonials"},
+            {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
         
         # Show all testimonials
         print("\n=== All Testimonials ===")
@@ -49,6 +49,13 @@ async def approve_all_testimonials():
                 {"$set": {"approved": True, "updated_at": datetime.utcnow()}}
             )
             
+            # Invalidate cached testimonial responses (ETag version)
+            await db.content_versions.update_one(
+                {"_id": "testimonials"},
+                {"$inc": {"version": 1}, "$set": {"updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+
             print(f"\n✅ Successfully approved {result.modified_count} testimonials!")
         else:
             print("\n❌ Operation cancelled.")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark Razorpay signature verification: SDK utility vs signatures.SignatureVerifier
+Usage: python benchmark_signatures.py [iterations]
+"""
+
+import hashlib
+import hmac
+import json
+import sys
+import timeit
+
+import razorpay
+
+from signatures import SignatureVerifier
+
+KEY_SECRET = "bench_key_secret_xxxxxxxxxxxx"
+WEBHOOK_SECRET = "bench_webhook_secret_xxxxxxxx"
+PREVIOUS_WEBHOOK_SECRET = "bench_previous_webhook_secret"
+
+
+def sign(secret: str, message: str) -> str:
+    return hmac.new(secret.encode('utf-8'), message.encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+def report(name: str, seconds: float, iterations: int, baseline: float = None):
+    per_call_us = seconds / iterations * 1_000_000
+    speedup = f"  ({baseline / seconds:.2f}x)" if baseline else ""
+    print(f"  {name:<42} {per_call_us:8.2f} µs/call{speedup}")
+
+
+def benchmark(iterations: int):
+    client = razorpay.Client(auth=("rzp_test_bench", KEY_SECRET))
+
+    # Checkout payment signature
+    order_id, payment_id = "order_BENCH000000001", "pay_BENCH000000001"
+    payment_signature = sign(KEY_SECRET, f"{order_id}|{payment_id}")
+    params = {
+        'razorpay_order_id': order_id,
+        'razorpay_payment_id': payment_id,
+        'razorpay_signature': payment_signature
+    }
+    payment_verifier = SignatureVerifier([KEY_SECRET])
+
+    print(f"\nPayment signature ({iterations} iterations)")
+    sdk = timeit.timeit(lambda: client.utility.verify_payment_signature(params), number=iterations)
+    report("SDK verify_payment_signature", sdk, iterations)
+    ours = timeit.timeit(
+        lambda: payment_verifier.verify_payment(order_id, payment_id, payment_signature),
+        number=iterations
+    )
+    report("SignatureVerifier.verify_payment", ours, iterations, sdk)
+
+    # Webhook signature (typical refund payload size)
+    body = json.dumps({
+        "event": "refund.processed",
+        "payload": {"refund": {"entity": {
+            "id": "rfnd_BENCH00000001", "payment_id": payment_id, "amount": 50000,
+            "currency": "INR", "status": "processed", "notes": {"booking_id": "x" * 36}
+        }}}
+    })
+    raw_body = body.encode('utf-8')
+    webhook_signature = sign(WEBHOOK_SECRET, body)
+    webhook_verifier = SignatureVerifier([WEBHOOK_SECRET])
+    rotating_verifier = SignatureVerifier([WEBHOOK_SECRET, PREVIOUS_WEBHOOK_SECRET])
+
+    print(f"\nWebhook signature, {len(raw_body)} byte body ({iterations} iterations)")
+    # The webhook handler previously also read the secret from the environment per request
+    sdk = timeit.timeit(
+        lambda: client.utility.verify_webhook_signature(raw_body.decode('utf-8'), webhook_signature, WEBHOOK_SECRET),
+        number=iterations
+    )
+    report("SDK verify_webhook_signature", sdk, iterations)
+    ours = timeit.timeit(lambda: webhook_verifier.verify(raw_body, webhook_signature), number=iterations)
+    report("SignatureVerifier.verify (1 secret)", ours, iterations, sdk)
+    rotating = timeit.timeit(lambda: rotating_verifier.verify(raw_body, webhook_signature), number=iterations)
+    report("SignatureVerifier.verify (2 secrets)", rotating, iterations, sdk)
+
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
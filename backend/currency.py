@@ -0,0 +1,108 @@
+"""
+Multi-currency quoting
+
+Prices are computed in INR paise (pricing.py). When MULTI_CURRENCY_ENABLED is
+set, clients in supported countries are charged in their local currency: the
+INR amount is converted with the FX table in fx_rates.json, which is loaded
+once and kept in memory - quoting never calls an external service.
+
+booking.amount always stays in INR paise (refunds shown to admins, reporting);
+the charged currency and amount are stored alongside it as charge_currency /
+charge_amount and used for the Razorpay order, refunds and payment emails.
+Razorpay must have international payments enabled for non-INR orders.
+"""
+
+import hashlib
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Optional, Tuple
+
+from pricing import normalize_country
+
+BASE_CURRENCY = "INR"
+
+MULTI_CURRENCY_ENABLED = os.environ.get('MULTI_CURRENCY_ENABLED', 'false').lower() == 'true'
+FX_SNAPSHOT_PATH = Path(os.environ.get('FX_SNAPSHOT_PATH', Path(__file__).parent / 'fx_rates.json'))
+
+# Minor-unit exponent per currency (ISO 4217); everything else uses 2
+CURRENCY_EXPONENTS = {
+    "CLP": 0, "JPY": 0, "KRW": 0, "VND": 0,
+    "BHD": 3, "KWD": 3, "OMR": 3,
+}
+
+# Normalized country name/alias (same keys as pricing.COUNTRY_MULTIPLIERS) -> ISO currency
+COUNTRY_CURRENCIES = {
+    'india': 'INR',
+    # High-income
+    'united states': 'USD', 'usa': 'USD', 'canada': 'CAD', 'united kingdom': 'GBP', 'uk': 'GBP',
+    'australia': 'AUD', 'new zealand': 'NZD', 'switzerland': 'CHF', 'norway': 'NOK', 'denmark': 'DKK',
+    'sweden': 'SEK', 'germany': 'EUR', 'france': 'EUR', 'netherlands': 'EUR', 'belgium': 'EUR',
+    'austria': 'EUR', 'ireland': 'EUR', 'singapore': 'SGD', 'hong kong': 'HKD', 'japan': 'JPY',
+    'south korea': 'KRW',
+    # Upper-middle-income
+    'united arab emirates': 'AED', 'uae': 'AED', 'dubai': 'AED', 'saudi arabia': 'SAR', 'qatar': 'QAR',
+    'kuwait': 'KWD', 'bahrain': 'BHD', 'oman': 'OMR', 'israel': 'ILS', 'italy': 'EUR', 'spain': 'EUR',
+    'portugal': 'EUR', 'greece': 'EUR', 'poland': 'PLN', 'czech republic': 'CZK', 'malaysia': 'MYR',
+    'china': 'CNY', 'russia': 'RUB', 'brazil': 'BRL', 'mexico': 'MXN', 'argentina': 'ARS', 'chile': 'CLP',
+    'turkey': 'TRY', 'south africa': 'ZAR',
+    # Lower-middle-income
+    'thailand': 'THB', 'indonesia': 'IDR', 'philippines': 'PHP', 'vietnam': 'VND', 'egypt': 'EGP',
+    'morocco': 'MAD', 'ukraine': 'UAH', 'colombia': 'COP', 'peru': 'PEN', 'ecuador': 'USD',
+}
+
+
+class FxSnapshot:
+    """Immutable INR -> currency rate table"""
+
+    def __init__(self, rates: dict, as_of: Optional[str] = None):
+        self.rates = MappingProxyType({BASE_CURRENCY: 1.0, **{code.upper(): float(rate) for code, rate in rates.items()}})
+        self.as_of = as_of
+        # Changes whenever a rate does, so cached converted prices can be revalidated
+        self.version = hashlib.sha1(
+            json.dumps(dict(self.rates), sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+
+    def convert_from_inr(self, amount_paise: int, currency: str) -> int:
+        """Convert an INR paise amount to the smallest unit of `currency`"""
+        if currency == BASE_CURRENCY:
+            return amount_paise
+        exponent = CURRENCY_EXPONENTS.get(currency, 2)
+        amount_minor = round(amount_paise / 100 * self.rates[currency] * 10 ** exponent)
+        if exponent == 3:
+            # Razorpay requires three-decimal currency amounts to end in 0
+            amount_minor = round(amount_minor / 10) * 10
+        return amount_minor
+
+
+def format_amount(amount_minor: int, currency: str) -> str:
+    """Display an amount given in the currency's smallest unit, e.g. ₹1,100.00 or USD 13.20"""
+    exponent = CURRENCY_EXPONENTS.get(currency, 2)
+    value = f"{amount_minor / 10 ** exponent:,.{exponent}f}"
+    return f"₹{value}" if currency == BASE_CURRENCY else f"{currency} {value}"
+
+
+@lru_cache(maxsize=1)
+def get_fx_snapshot() -> FxSnapshot:
+    """FX table from FX_SNAPSHOT_PATH, loaded on first use and cached"""
+    with open(FX_SNAPSHOT_PATH, encoding='utf-8') as f:
+        snapshot = json.load(f)
+    return FxSnapshot(snapshot.get("rates", {}), snapshot.get("as_of"))
+
+
+def get_charge_currency(country: Optional[str]) -> str:
+    """Currency a client in `country` is charged in (INR unless multi-currency is enabled)"""
+    if not MULTI_CURRENCY_ENABLED:
+        return BASE_CURRENCY
+    currency = COUNTRY_CURRENCIES.get(normalize_country(country), BASE_CURRENCY)
+    return currency if currency in get_fx_snapshot().rates else BASE_CURRENCY
+
+
+def quote_in_charge_currency(amount_paise: int, country: Optional[str]) -> Tuple[str, int]:
+    """(currency, amount in its smallest unit) to charge for an INR paise price"""
+    currency = get_charge_currency(country)
+    if currency == BASE_CURRENCY:
+        return currency, amount_paise
+    return currency, get_fx_snapshot().convert_from_inr(amount_paise, currency)
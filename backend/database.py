@@ -0,0 +1,168 @@
+"""
+MongoDB connection
+
+Each app instance creates its client in main's lifespan (or is handed one, e.g.
+mongomock in tests) and keeps it, with its database, on app.state. Request
+handlers get the database through the get_db dependency; background jobs are
+handed it when the lifespan starts them.
+
+Pool size, timeouts and wire compression come from MONGO_* environment
+variables. Pool utilization is exported on /api/admin/metrics.
+
+Read routing: get_db always reads from the primary (bookings, payments, auth
+and anything that writes). Designated read-only queries instead depend on
+read_db(workload); a ReadRouter sends the workloads listed in
+MONGO_SECONDARY_READS to a database handle with MONGO_READ_PREFERENCE and
+MONGO_MAX_STALENESS_SECONDS, so they can be served by replica set secondaries.
+"""
+
+import os
+from datetime import timezone
+from typing import Callable, Dict, Optional
+
+from fastapi import Request
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import WriteConcern
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+
+from metrics import mongo_metrics_listener, mongo_pool_metrics_listener
+from slow_queries import SLOW_QUERY_THRESHOLD_MS, SlowQueryListener
+from tracing import tracing_command_listener
+
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 10))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 1))
+# How long an operation waits for a free pooled connection; unset waits until the operation times out
+MONGO_WAIT_QUEUE_TIMEOUT_MS = os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS')
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', 10000))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', 10000))
+# Comma-separated, in order of preference (e.g. "zstd,snappy,zlib"). zstd needs the
+# zstandard package and snappy python-snappy; pymongo warns and skips unavailable ones.
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', '')
+
+# Read preference for routed reads (primary, primaryPreferred, secondary, secondaryPreferred, nearest)
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
+# Secondaries lagging the primary by more than this are not read from (MongoDB's minimum is 90)
+MONGO_MAX_STALENESS_SECONDS = int(os.environ.get('MONGO_MAX_STALENESS_SECONDS', 90))
+# Write concern for bookings and other writes: "majority" or a number of nodes; unset uses the server default
+MONGO_WRITE_CONCERN = os.environ.get('MONGO_WRITE_CONCERN', '')
+MONGO_WRITE_CONCERN_TIMEOUT_MS = int(os.environ.get('MONGO_WRITE_CONCERN_TIMEOUT_MS', 5000))
+
+# Read-only queries that may be served by a secondary. Booking, payment and auth
+# paths are deliberately absent: they read their own writes and must use the primary.
+READ_WORKLOADS = {
+    "testimonials": "Approved testimonials (GET /api/testimonials)",
+    "blog": "Blog posts (GET /api/blog, /api/blog/{post_id})",
+    "gemstones": "Gemstone catalog (GET /api/gemstones)",
+    "availability": "Astrologer schedules and available slots (bookings re-check the slot on the primary)",
+    "admin_stats": "Admin booking list, stats and upcoming sessions",
+}
+# Comma-separated workloads routed with MONGO_READ_PREFERENCE; defaults to all of them
+MONGO_SECONDARY_READS = os.environ.get('MONGO_SECONDARY_READS', ','.join(READ_WORKLOADS))
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest,
+}
+
+
+def create_mongo_client(mongo_url: Optional[str] = None) -> AsyncIOMotorClient:
+    """MongoDB client configured from the environment (connects lazily, on first operation)"""
+    options = {}
+    if MONGO_WAIT_QUEUE_TIMEOUT_MS:
+        options["waitQueueTimeoutMS"] = int(MONGO_WAIT_QUEUE_TIMEOUT_MS)
+    if MONGO_COMPRESSORS:
+        options["compressors"] = MONGO_COMPRESSORS
+
+    return AsyncIOMotorClient(
+        mongo_url or os.environ.get('MONGO_URL'),
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,  # Keep connections alive between bursts
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+        retryWrites=True,
+        retryReads=True,
+        # Stored dates are UTC; return them timezone-aware so API output includes the offset
+        tz_aware=True,
+        tzinfo=timezone.utc,
+        # Per-command timings and pool utilization for /api/admin/metrics,
+        # slow commands for /api/admin/slow-queries, trace spans
+        event_listeners=[
+            mongo_metrics_listener, mongo_pool_metrics_listener, SlowQueryListener(SLOW_QUERY_THRESHOLD_MS),
+            tracing_command_listener
+        ],
+        **options
+    )
+
+
+def get_db_name() -> str:
+    return os.environ.get('DB_NAME', 'astrology_db')
+
+
+def get_write_concern() -> Optional[WriteConcern]:
+    """Write concern from MONGO_WRITE_CONCERN, or None for the server default"""
+    if not MONGO_WRITE_CONCERN:
+        return None
+    w = int(MONGO_WRITE_CONCERN) if MONGO_WRITE_CONCERN.isdigit() else MONGO_WRITE_CONCERN
+    return WriteConcern(w=w, wtimeout=MONGO_WRITE_CONCERN_TIMEOUT_MS)
+
+
+def get_read_preference():
+    """Read preference for routed reads, from MONGO_READ_PREFERENCE and MONGO_MAX_STALENESS_SECONDS"""
+    if MONGO_READ_PREFERENCE not in READ_PREFERENCES:
+        raise ValueError(
+            f"Invalid MONGO_READ_PREFERENCE {MONGO_READ_PREFERENCE!r}; expected one of {', '.join(READ_PREFERENCES)}"
+        )
+    if MONGO_READ_PREFERENCE == "primary":
+        # maxStalenessSeconds is only valid for modes that may read from a secondary
+        return Primary()
+    if MONGO_MAX_STALENESS_SECONDS < 90:
+        raise ValueError(f"MONGO_MAX_STALENESS_SECONDS must be at least 90, got {MONGO_MAX_STALENESS_SECONDS}")
+    return READ_PREFERENCES[MONGO_READ_PREFERENCE](max_staleness=MONGO_MAX_STALENESS_SECONDS)
+
+
+def get_secondary_read_workloads() -> frozenset:
+    """Workloads routed with the read preference, from MONGO_SECONDARY_READS"""
+    workloads = frozenset(name.strip() for name in MONGO_SECONDARY_READS.split(',') if name.strip())
+    unknown = workloads - READ_WORKLOADS.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown MONGO_SECONDARY_READS workload(s) {', '.join(sorted(unknown))}; "
+            f"expected any of {', '.join(READ_WORKLOADS)}"
+        )
+    return workloads
+
+
+class ReadRouter:
+    """Picks the database handle each read workload runs against"""
+
+    def __init__(self, primary: AsyncIOMotorDatabase, secondary: AsyncIOMotorDatabase, secondary_workloads: frozenset):
+        self.primary = primary
+        self.secondary = secondary
+        self._databases: Dict[str, AsyncIOMotorDatabase] = {
+            workload: secondary if workload in secondary_workloads else primary
+            for workload in READ_WORKLOADS
+        }
+
+    def database(self, workload: str) -> AsyncIOMotorDatabase:
+        return self._databases[workload]
+
+
+def get_db(request: Request) -> AsyncIOMotorDatabase:
+    """FastAPI dependency returning the app's database (primary reads)"""
+    return request.app.state.db
+
+
+def read_db(workload: str) -> Callable[[Request], AsyncIOMotorDatabase]:
+    """FastAPI dependency for a designated read-only query: `db = Depends(read_db("blog"))`"""
+    if workload not in READ_WORKLOADS:
+        raise ValueError(f"Unknown read workload {workload!r}")
+
+    def get_workload_db(request: Request) -> AsyncIOMotorDatabase:
+        return request.app.state.read_router.database(workload)
+
+    return get_workload_db
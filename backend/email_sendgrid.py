@@ -10,7 +10,7 @@ Usage:
    - SENDGRID_API_KEY
    - SENDGRID_FROM_EMAIL
    - SENDGRID_FROM_NAME
-3. Replace send_email() in main.py with this implementation
+3. Replace send_email() in emails.py with this implementation
 """
 
 import os
@@ -68,7 +68,7 @@ async def send_email_sendgrid(to_email: str, subject: str, body: str) -> bool:
         return False
 
 
-# Example usage in main.py:
+# Example usage in emails.py:
 """
 from email_sendgrid import send_email_sendgrid as send_email
 
@@ -0,0 +1,113 @@
+"""
+Outgoing email: SendGrid's HTTP API, with SMTP as a local-development fallback
+"""
+
+import logging
+import os
+
+from metrics import track_outbound
+
+logger = logging.getLogger(__name__)
+
+
+# Helper function to send emails using SendGrid
+async def send_email(to_email: str, subject: str, body: str):
+    """
+    Send email using SendGrid API (works on Railway, unlike SMTP)
+
+    Required environment variables:
+    - SENDGRID_API_KEY: Your SendGrid API key
+    - SENDGRID_FROM_EMAIL: Sender email (e.g., noreply@yourdomain.com)
+    - SENDGRID_FROM_NAME: Sender name (e.g., Acharyaa Indira Pandey Astrology)
+
+    Falls back to SMTP if SendGrid is not configured (for local development)
+    """
+    # Try SendGrid first (recommended for production/Railway)
+    sendgrid_api_key = os.environ.get('SENDGRID_API_KEY', '')
+
+    if sendgrid_api_key:
+        try:
+            import requests
+            from_email = os.environ.get('SENDGRID_FROM_EMAIL', 'noreply@astrology.com')
+            from_name = os.environ.get('SENDGRID_FROM_NAME', 'Acharyaa Indira Pandey Astrology')
+
+            # Use requests directly to avoid SSL issues on macOS
+            url = f"{os.environ.get('SENDGRID_API_BASE_URL', 'https://api.sendgrid.com')}/v3/mail/send"
+            headers = {
+                "Authorization": f"Bearer {sendgrid_api_key}",
+                "Content-Type": "application/json"
+            }
+            data = {
+                "personalizations": [{
+                    "to": [{"email": to_email}],
+                    "subject": subject
+                }],
+                "from": {
+                    "email": from_email,
+                    "name": from_name
+                },
+                "content": [{
+                    "type": "text/html",
+                    "value": body
+                }]
+            }
+
+            # Send request (verify=False for local dev SSL issues)
+            with track_outbound("sendgrid"):
+                response = requests.post(url, headers=headers, json=data, verify=False, timeout=10)
+
+            if response.status_code in [200, 202]:
+                logger.info(f"✅ Email sent to {to_email} via SendGrid (Status: {response.status_code})")
+                return True
+            else:
+                logger.error(f"❌ SendGrid error: {response.status_code} - {response.text}")
+                logger.warning("⚠️ Falling back to SMTP...")
+
+        except Exception as e:
+            logger.error(f"❌ SendGrid error: {str(e)}")
+            logger.warning("⚠️ Falling back to SMTP...")
+            # Don't return False yet, let it fall through to SMTP fallback
+
+    # Fallback to SMTP (for local development only - won't work on Railway)
+    else:
+        try:
+            # Only needed without SendGrid - not imported at startup
+            import smtplib
+            from email.mime.text import MIMEText
+            from email.mime.multipart import MIMEMultipart
+
+            smtp_server = os.environ.get('SMTP_SERVER', 'smtp.gmail.com')
+            smtp_port = int(os.environ.get('SMTP_PORT', 587))
+            sender_email = os.environ.get('SMTP_EMAIL', '')
+            sender_password = os.environ.get('SMTP_PASSWORD', '')
+
+            if not sender_email or not sender_password:
+                logger.warning("⚠️ Email credentials not configured - skipping email")
+                return False
+
+            msg = MIMEMultipart()
+            msg['From'] = sender_email
+            msg['To'] = to_email
+            msg['Subject'] = subject
+
+            msg.attach(MIMEText(body, 'html'))
+
+            # Add timeout to prevent hanging on Railway (SMTP ports may be blocked)
+            server = smtplib.SMTP(smtp_server, smtp_port, timeout=5)
+            server.starttls()
+            server.login(sender_email, sender_password)
+            server.send_message(msg)
+            server.quit()
+
+            logger.info(f"✅ Email sent to {to_email} via SMTP")
+            return True
+
+        except smtplib.SMTPException as e:
+            logger.error(f"❌ SMTP error: {str(e)}")
+            return False
+        except TimeoutError as e:
+            logger.error(f"❌ SMTP timeout (Railway blocks SMTP ports): {str(e)}")
+            return False
+        except Exception as e:
+            logger.error(f"❌ Failed to send email: {str(e)}")
+            return False
@@ -0,0 +1,79 @@
+"""
+HTTP caching for public read endpoints
+
+Each collection the API writes has a version counter in content_versions. ETags
+are built from that version and the request parameters, so a write only has to
+bump the counter to invalidate every cached response for the collection.
+
+Blog posts and gemstones are edited directly in Mongo, where nothing bumps a
+counter. Their ETags hash the response body instead: the query still runs, but
+any change is picked up and unchanged responses go out as an empty 304.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from fastapi import Request, Response
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+
+# Browsers revalidate with If-None-Match and get an empty 304 while the content
+# version is unchanged, so repeat visits skip the query and serialization.
+PUBLIC_CACHE_MAX_AGE = int(os.environ.get('PUBLIC_CACHE_MAX_AGE', 60))
+
+
+async def get_content_version(db: AsyncIOMotorDatabase, collection: str) -> int:
+    """Get the current content version counter for a collection"""
+    doc = await db.content_versions.find_one({"_id": collection}, {"version": 1})
+    return doc.get("version", 0) if doc else 0
+
+
+async def bump_content_version(db: AsyncIOMotorDatabase, collection: str) -> None:
+    """
+    Increment the content version of a collection.
+    Must be called after every write that changes what a cached GET returns.
+    """
+    await db.content_versions.update_one(
+        {"_id": collection},
+        {
+            "$inc": {"version": 1},
+            "$set": {"updated_at": datetime.now(timezone.utc)}
+        },
+        upsert=True
+    )
+
+
+def build_etag(collection: str, version: int, *params) -> str:
+    """Build a strong ETag from a content version and the request parameters"""
+    params_digest = hashlib.sha1(repr(params).encode('utf-8')).hexdigest()[:12]
+    return f'"{collection}-v{version}-{params_digest}"'
+
+
+def build_content_etag(collection: str, body: bytes) -> str:
+    """Build a strong ETag from the serialized response, for collections without a version counter"""
+    return f'"{collection}-{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check the If-None-Match header against an ETag (weak comparison per RFC 9110)"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    """Set ETag and Cache-Control headers for a cacheable public response"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = f"public, max-age={PUBLIC_CACHE_MAX_AGE}, must-revalidate"
+
+
+def not_modified_response(etag: str) -> Response:
+    """Empty 304 response carrying the same validators as the full response"""
+    response = Response(status_code=304)
+    set_cache_headers(response, etag)
+    return response
@@ -0,0 +1,80 @@
+"""
+Third-party clients and settings
+
+Each app instance owns one Integrations object (created in main's lifespan
+and closed on shutdown): the Razorpay client, the signature verifiers, the
+ipapi base URL and a pooled HTTP client for outbound calls. Handlers get it
+through the get_integrations dependency, so tests can build an app against
+fakes (see tests/fakes) without touching module globals.
+"""
+
+import logging
+import os
+from typing import Optional
+
+import httpx
+from fastapi import Request
+
+from currency import MULTI_CURRENCY_ENABLED, get_fx_snapshot
+from signatures import SignatureVerifier, build_payment_verifier, build_webhook_verifier
+
+logger = logging.getLogger(__name__)
+
+# FX snapshot for multi-currency quotes - loaded once, never fetched per request
+if MULTI_CURRENCY_ENABLED:
+    fx_snapshot = get_fx_snapshot()
+    logger.info(f"Multi-currency enabled: {len(fx_snapshot.rates)} currencies (FX as of {fx_snapshot.as_of})")
+
+
+class Integrations:
+    """Razorpay, signature verification and outbound HTTP for one app instance"""
+
+    def __init__(
+        self,
+        razorpay_key_id: Optional[str] = None,
+        razorpay_key_secret: Optional[str] = None,
+        razorpay_api_base_url: str = 'https://api.razorpay.com',
+        ipapi_base_url: str = 'https://ipapi.co',
+        payment_signature_verifier: Optional[SignatureVerifier] = None,
+        webhook_signature_verifier: Optional[SignatureVerifier] = None
+    ):
+        self.razorpay_key_id = razorpay_key_id
+        self.razorpay_client = None
+        if razorpay_key_id and razorpay_key_secret:
+            try:
+                # Imported here: the SDK pulls in requests and isn't needed to import the app
+                import razorpay
+                self.razorpay_client = razorpay.Client(
+                    auth=(razorpay_key_id, razorpay_key_secret),
+                    base_url=razorpay_api_base_url
+                )
+            except Exception as e:
+                logger.warning(f"Failed to initialize Razorpay client: {e}")
+        self.razorpay_enabled = self.razorpay_client is not None
+
+        # HMAC keys derived once; several secrets may be active during rotation
+        self.payment_signature_verifier = payment_signature_verifier or build_payment_verifier()
+        self.webhook_signature_verifier = webhook_signature_verifier or build_webhook_verifier()
+
+        # IP geolocation (ipapi.co free API)
+        self.ipapi_base_url = ipapi_base_url
+        # Pooled connections for outbound calls; timeouts are set per request
+        self.http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=50, max_keepalive_connections=10))
+
+    @classmethod
+    def from_env(cls) -> "Integrations":
+        return cls(
+            razorpay_key_id=os.environ.get('RAZORPAY_KEY_ID'),
+            razorpay_key_secret=os.environ.get('RAZORPAY_KEY_SECRET'),
+            # Overridable to point at local stand-ins (tests/fakes) for offline load testing
+            razorpay_api_base_url=os.environ.get('RAZORPAY_API_BASE_URL', 'https://api.razorpay.com'),
+            ipapi_base_url=os.environ.get('IPAPI_BASE_URL', 'https://ipapi.co')
+        )
+
+    async def aclose(self):
+        await self.http_client.aclose()
+
+
+def get_integrations(request: Request) -> Integrations:
+    """FastAPI dependency returning the app's integrations"""
+    return request.app.state.integrations
@@ -0,0 +1,350 @@
+"""
+Request metrics in Prometheus text format
+
+- MetricsMiddleware (ASGI) times every HTTP request per route template and
+  collects, per request, how many Mongo commands ran and how long they took.
+- MongoMetricsListener (pymongo CommandListener, registered on the Motor
+  client) times every Mongo command. Motor runs commands on executor threads
+  with a copy of the caller's contextvars, so the listener can attribute
+  commands to the request that issued them.
+- MongoPoolMetricsListener (pymongo ConnectionPoolListener) tracks pool size,
+  connections in use, waiting checkouts and checkout wait time per server, so
+  MONGO_MAX_POOL_SIZE can be sized from utilization and wait-queue data.
+- track_outbound() times calls to external services (ipapi, SendGrid,
+  Razorpay) and records them both globally and on the current request; with
+  tracing enabled each call is also a client span (tracing.py).
+
+render_metrics() produces the /api/admin/metrics payload (scrapers send the
+X-Admin-Key header). Everything is kept in process memory, so each worker
+reports its own numbers.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Tuple
+
+from pymongo import monitoring
+
+from tracing import KIND_CLIENT, start_span
+
+# Bucket upper bounds in seconds (request latency, outbound calls, Mongo commands)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Prometheus-style cumulative histogram with one series per label set"""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self.buckets = buckets
+        # label values -> [bucket counts..., +Inf count, sum]
+        self._series: Dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = {labels: list(series) for labels, series in self._series.items()}
+        for label_values, series in sorted(snapshot.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, label_values))
+            prefix = f"{labels}," if labels else ""
+            for bound, count in zip(self.buckets, series):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[len(self.buckets)]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-1]}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[len(self.buckets)]}")
+        return lines
+
+
+class Gauge:
+    """Prometheus gauge with one value per label set"""
+
+    def __init__(self, name: str, description: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.description = description
+        self.label_names = label_names
+        self._values: Dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, amount: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            snapshot = dict(self._values)
+        for label_values, value in sorted(snapshot.items()):
+            labels = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, label_values))
+            lines.append(f"{self.name}{{{labels}}} {value}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route",
+    ("method", "route", "status"), LATENCY_BUCKETS
+)
+REQUEST_MONGO_COMMANDS = Histogram(
+    "http_request_mongo_commands", "Mongo commands issued per HTTP request",
+    ("method", "route"), COUNT_BUCKETS
+)
+REQUEST_MONGO_SECONDS = Histogram(
+    "http_request_mongo_seconds", "Total Mongo command time per HTTP request",
+    ("method", "route"), LATENCY_BUCKETS
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds", "Mongo command latency by command and collection",
+    ("command", "collection", "outcome"), LATENCY_BUCKETS
+)
+OUTBOUND_DURATION = Histogram(
+    "outbound_request_duration_seconds", "Latency of calls to external services",
+    ("service", "outcome"), LATENCY_BUCKETS
+)
+REQUEST_OUTBOUND_SECONDS = Histogram(
+    "http_request_outbound_seconds", "Time spent in external service calls per HTTP request",
+    ("method", "route", "service"), LATENCY_BUCKETS
+)
+MONGO_POOL_MAX_SIZE = Gauge(
+    "mongo_pool_max_size", "Configured maximum connections per Mongo server pool", ("address",)
+)
+MONGO_POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections", "Open connections per Mongo server pool", ("address",)
+)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongo_pool_checked_out", "Connections in use per Mongo server pool", ("address",)
+)
+MONGO_POOL_WAITING = Gauge(
+    "mongo_pool_waiting", "Operations waiting to check out a connection", ("address",)
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongo_pool_checkout_wait_seconds", "Time to check out a pooled connection (outcome is the failure reason)",
+    ("address", "outcome"), LATENCY_BUCKETS
+)
+
+ALL_METRICS = (
+    REQUEST_DURATION, REQUEST_MONGO_COMMANDS, REQUEST_MONGO_SECONDS,
+    MONGO_COMMAND_DURATION, OUTBOUND_DURATION, REQUEST_OUTBOUND_SECONDS,
+    MONGO_POOL_MAX_SIZE, MONGO_POOL_CONNECTIONS, MONGO_POOL_CHECKED_OUT,
+    MONGO_POOL_WAITING, MONGO_POOL_CHECKOUT_WAIT,
+)
+
+
+class RequestStats:
+    """Mongo and outbound timings accumulated for one HTTP request"""
+
+    __slots__ = ("mongo_commands", "mongo_seconds", "outbound_seconds", "_lock")
+
+    def __init__(self):
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+        self.outbound_seconds: Dict[str, float] = {}
+        # Commands of one request may complete on several executor threads
+        self._lock = threading.Lock()
+
+    def add_mongo(self, seconds: float) -> None:
+        with self._lock:
+            self.mongo_commands += 1
+            self.mongo_seconds += seconds
+
+    def add_outbound(self, service: str, seconds: float) -> None:
+        with self._lock:
+            self.outbound_seconds[service] = self.outbound_seconds.get(service, 0.0) + seconds
+
+
+# Stats of the HTTP request being handled (None outside requests, e.g. periodic jobs)
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+@contextmanager
+def track_outbound(service: str):
+    """Time a call to an external service: `with track_outbound("sendgrid"): ...`"""
+    start = time.perf_counter()
+    outcome = "ok"
+    try:
+        with start_span(service, KIND_CLIENT, {"peer.service": service}):
+            yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        OUTBOUND_DURATION.observe(elapsed, service, outcome)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.add_outbound(service, elapsed)
+
+
+class MongoMetricsListener(monitoring.CommandListener):
+    """Times Mongo commands and attributes them to the current request"""
+
+    def __init__(self):
+        # request_id -> (collection, request stats); request ids are unique per connection pool
+        self._pending: Dict[int, Tuple[str, Optional[RequestStats]]] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        with self._lock:
+            self._pending[event.request_id] = (
+                collection if isinstance(collection, str) else "",
+                current_request_stats.get(),
+            )
+
+    def _finish(self, event, outcome: str):
+        with self._lock:
+            collection, stats = self._pending.pop(event.request_id, ("", None))
+        seconds = event.duration_micros / 1_000_000
+        MONGO_COMMAND_DURATION.observe(seconds, event.command_name, collection, outcome)
+        if stats is not None:
+            stats.add_mongo(seconds)
+
+    def succeeded(self, event):
+        self._finish(event, "ok")
+
+    def failed(self, event):
+        self._finish(event, "error")
+
+
+mongo_metrics_listener = MongoMetricsListener()
+
+
+class MongoPoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Connection pool gauges per server address. Several clients (e.g. app
+    instances in tests) talking to one server add up in the same series,
+    except the max size, which is the last created pool's setting.
+    """
+
+    def __init__(self):
+        # Check-out start time; a checkout starts and ends on the same thread
+        self._checkout_started = threading.local()
+
+    @staticmethod
+    def _address(event) -> str:
+        host, port = event.address
+        return f"{host}:{port}"
+
+    def pool_created(self, event):
+        # pymongo's default when maxPoolSize isn't set
+        MONGO_POOL_MAX_SIZE.set(event.options.get("maxPoolSize", 100), self._address(event))
+
+    def pool_closed(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.inc(1, self._address(event))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.inc(-1, self._address(event))
+
+    def connection_check_out_started(self, event):
+        self._checkout_started.value = time.perf_counter()
+        MONGO_POOL_WAITING.inc(1, self._address(event))
+
+    def _checkout_finished(self, event, outcome: str):
+        address = self._address(event)
+        MONGO_POOL_WAITING.inc(-1, address)
+        started = getattr(self._checkout_started, "value", None)
+        if started is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started, address, outcome)
+            self._checkout_started.value = None
+
+    def connection_checked_out(self, event):
+        self._checkout_finished(event, "ok")
+        MONGO_POOL_CHECKED_OUT.inc(1, self._address(event))
+
+    def connection_check_out_failed(self, event):
+        self._checkout_finished(event, str(event.reason))
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.inc(-1, self._address(event))
+
+
+mongo_pool_metrics_listener = MongoPoolMetricsListener()
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording per-route latency and per-request Mongo/outbound time"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status_code = 500
+        start = time.perf_counter()
+        elapsed = None
+
+        async def send_wrapper(message):
+            nonlocal status_code, elapsed
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # Latency ends when the response is sent; BackgroundTasks run after this
+                # (their Mongo and outbound time is still attributed to the request)
+                elapsed = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if elapsed is None:
+                elapsed = time.perf_counter() - start
+            current_request_stats.reset(token)
+
+            # Route template (e.g. /api/bookings/{booking_id}) keeps label cardinality bounded
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope["method"]
+
+            REQUEST_DURATION.observe(elapsed, method, route_path, str(status_code))
+            REQUEST_MONGO_COMMANDS.observe(stats.mongo_commands, method, route_path)
+            REQUEST_MONGO_SECONDS.observe(stats.mongo_seconds, method, route_path)
+            for service, seconds in stats.outbound_seconds.items():
+                REQUEST_OUTBOUND_SECONDS.observe(seconds, method, route_path, service)
+
+
+def render_metrics() -> str:
+    """All metrics in Prometheus text exposition format (0.0.4)"""
+    lines = []
+    for metric in ALL_METRICS:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Script to convert ISO-string timestamp fields to native BSON dates
+Usage: python migrate_timestamps.py [--dry-run]
+
+Safe to run repeatedly: only documents that still have a string value in one
+of the fields listed in timestamps.TIMESTAMP_FIELDS are touched.
+"""
+
+import asyncio
+import os
+import sys
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+from pathlib import Path
+
+from timestamps import TIMESTAMP_FIELDS, normalize_timestamps
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+BATCH_SIZE = 500
+
+
+async def migrate_collection(db, collection: str, fields: list, dry_run: bool) -> int:
+    """Convert string timestamps in one collection, returns number of documents updated"""
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+
+    operations = []
+    updated = 0
+    async for doc in db[collection].find(query, projection):
+        updates = normalize_timestamps(collection, doc)
+        if not updates:
+            continue
+        operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": updates}))
+
+        if len(operations) >= BATCH_SIZE:
+            if not dry_run:
+                await db[collection].bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        if not dry_run:
+            await db[collection].bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    return updated
+
+
+async def migrate_timestamps(dry_run: bool = False):
+    """Normalize timestamp fields in all collections"""
+
+    # Connect to MongoDB
+    mongo_url = os.environ.get('MONGO_URL')
+    mongo_client = AsyncIOMotorClient(mongo_url)
+    db = mongo_client[os.environ.get('DB_NAME', 'astrology_db')]
+
+    try:
+        total = 0
+        for collection, fields in TIMESTAMP_FIELDS.items():
+            updated = await migrate_collection(db, collection, fields, dry_run)
+            total += updated
+            print(f"{'🔎' if dry_run else '✅'} {collection}: {updated} document(s) "
+                  f"{'would be ' if dry_run else ''}updated")
+
+        print(f"\nTotal: {total} document(s){' (dry run)' if dry_run else ''}")
+
+    except Exception as e:
+        print(f"\n❌ Error: {str(e)}")
+
+    finally:
+        mongo_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate_timestamps(dry_run="--dry-run" in sys.argv))
@@ -1,11 +1,16 @@
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 from enum import Enum
 import uuid
 import re
 
 
+def utc_now() -> datetime:
+    """Timezone-aware current time, so API output carries a UTC offset"""
+    return datetime.now(timezone.utc)
+
+
 # User Models
 class UserCreate(BaseModel):
     name: str
@@ -96,10 +101,17 @@ class Booking(BaseModel):
     status: BookingStatus = BookingStatus.PENDING
     payment_status: PaymentStatus = PaymentStatus.PENDING
     amount: int = 0
+    charge_currency: str = "INR"  # Currency the client is charged in
+    charge_amount: Optional[int] = None  # Amount in charge_currency's smallest unit
     razorpay_order_id: Optional[str] = None
+    razorpay_order_ids: List[str] = Field(default_factory=list)  # Every order created, current one included
+    razorpay_order_amount: Optional[int] = None  # Amount (paise) the current order was created for
+    razorpay_order_currency: Optional[str] = None
+    razorpay_order_created_at: Optional[datetime] = None
     razorpay_payment_id: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    slot_start_at: Optional[datetime] = None  # UTC start of preferred_date/preferred_time (IST)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
     @field_validator('phone')
     @classmethod
@@ -122,7 +134,7 @@ class ContactInquiry(BaseModel):
     phone: Optional[str] = None
     subject: Optional[str] = None
     message: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
 
     @field_validator('phone')
     @classmethod
@@ -141,7 +153,7 @@ class ContactInquiry(BaseModel):
 class Newsletter(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     email: EmailStr
-    subscribed_at: datetime = Field(default_factory=datetime.utcnow)
+    subscribed_at: datetime = Field(default_factory=utc_now)
     is_active: bool = True
 
 
@@ -163,8 +175,8 @@ class Testimonial(BaseModel):
     service: str
     location: Optional[str] = None
     approved: bool = False
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 
 class BlogPost(BaseModel):
@@ -200,8 +212,8 @@ class TimeSlot(BaseModel):
     end_time: str  # Format: HH:MM (24-hour)
     is_available: bool = True
     booking_id: Optional[str] = None  # Reference to booking if slot is booked
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
 
 
 class AstrologerAvailability(BaseModel):
@@ -212,5 +224,22 @@ class AstrologerAvailability(BaseModel):
     end_time: str  # Format: HH:MM (24-hour)
     slot_duration_minutes: int = 30  # Default 30-minute slots
     is_active: bool = True
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
+
+
+class ServiceUpdate(BaseModel):
+    name: Optional[str] = Field(None, min_length=1)
+    actual_price: Optional[float] = Field(None, gt=0)  # Rupees, before discount and PPP
+    discount_percent: Optional[float] = Field(None, ge=0, lt=100)
+    price_multiplier: Optional[float] = Field(None, gt=0)
+    duration_minutes: Optional[int] = Field(None, gt=0, le=240)
+    active: Optional[bool] = None
+
+    @field_validator('*')
+    @classmethod
+    def reject_null(cls, v):
+        """Fields may be omitted but not set to null (every service field is required)"""
+        if v is None:
+            raise ValueError('Field cannot be null')
+        return v
@@ -0,0 +1,194 @@
+"""
+Consultation pricing
+
+Prices use a PPP (Purchasing Power Parity) model:
+1. Free consultations (5-10 mins) are always free
+2. Base price = actual_price * (1 - discount_percent/100)
+3. Apply PPP multiplier based on country (1.0x for India, up to 4.0x for high-income countries)
+4. Apply the service's own price_multiplier (1.5x for Marriage Compatibility)
+
+PPP Multipliers:
+- India: 1.0x (base)
+- Lower-middle income (Thailand, Vietnam, etc.): 1.1x - 1.3x
+- Upper-middle income (UAE, Malaysia, etc.): 1.4x - 2.8x
+- High income (USA, UK, Australia, etc.): 2.0x - 4.0x
+- Unlisted countries: 2.0x
+
+COUNTRY_MULTIPLIERS maps normalized country names/aliases to multipliers.
+Service prices come from the service catalog (service_catalog.py); a PriceBook
+is compiled from one catalog snapshot and holds the final price in paise for
+every (service, multiplier) pair plus the serialized /api/pricing response for
+each multiplier (and charge currency), so pricing a booking is two dict lookups.
+"""
+
+import hashlib
+import re
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+import orjson
+
+
+# Durations: "5-10" is a free introductory call, "10+" is a paid consultation
+FREE_DURATION = "5-10"
+PAID_DURATION = "10+"
+
+# PPP multipliers by income tier (keys are normalized country names or aliases)
+HIGH_INCOME_COUNTRIES = {
+    'united states': 3.5, 'usa': 3.5, 'canada': 3.2, 'united kingdom': 3.0, 'uk': 3.0,
+    'australia': 3.2, 'new zealand': 3.0, 'switzerland': 4.0, 'norway': 3.8, 'denmark': 3.5,
+    'sweden': 3.3, 'germany': 2.8, 'france': 2.8, 'netherlands': 2.9, 'belgium': 2.8,
+    'austria': 2.8, 'ireland': 3.0, 'singapore': 2.5, 'hong kong': 2.5, 'japan': 2.3,
+    'south korea': 2.0,
+}
+
+UPPER_MIDDLE_INCOME_COUNTRIES = {
+    'united arab emirates': 2.8, 'uae': 2.8, 'dubai': 2.8, 'saudi arabia': 2.5, 'qatar': 3.0,
+    'kuwait': 2.7, 'bahrain': 2.5, 'oman': 2.3, 'israel': 2.5, 'italy': 2.5, 'spain': 2.3,
+    'portugal': 2.0, 'greece': 1.8, 'poland': 1.7, 'czech republic': 1.8, 'malaysia': 1.5,
+    'china': 1.8, 'russia': 1.5, 'brazil': 1.6, 'mexico': 1.7, 'argentina': 1.5, 'chile': 1.8,
+    'turkey': 1.4, 'south africa': 1.6,
+}
+
+LOWER_MIDDLE_INCOME_COUNTRIES = {
+    'thailand': 1.3, 'indonesia': 1.2, 'philippines': 1.2, 'vietnam': 1.1, 'egypt': 1.2,
+    'morocco': 1.2, 'ukraine': 1.1, 'colombia': 1.3, 'peru': 1.3, 'ecuador': 1.2,
+}
+
+INDIA_MULTIPLIER = 1.0  # Base price for India
+DEFAULT_MULTIPLIER = 2.0  # Default for unlisted countries (assume medium-high income)
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_country(country: Optional[str]) -> str:
+    """Normalize a country name for lookup: lowercase, no dots, single spaces"""
+    if not country:
+        return ''
+    return _WHITESPACE.sub(' ', country.replace('.', '').strip().lower())
+
+
+# Normalized country name/alias -> PPP multiplier
+COUNTRY_MULTIPLIERS: Dict[str, float] = {
+    **LOWER_MIDDLE_INCOME_COUNTRIES,
+    **UPPER_MIDDLE_INCOME_COUNTRIES,
+    **HIGH_INCOME_COUNTRIES,
+    'india': INDIA_MULTIPLIER,
+}
+
+
+# Every PPP multiplier a country can resolve to
+PPP_MULTIPLIERS = sorted(set(COUNTRY_MULTIPLIERS.values()) | {DEFAULT_MULTIPLIER})
+
+
+def get_ppp_multiplier(country: Optional[str]) -> float:
+    """
+    Get PPP multiplier based on country's economic status.
+    Returns a multiplier to adjust pricing based on purchasing power.
+    """
+    return COUNTRY_MULTIPLIERS.get(normalize_country(country), DEFAULT_MULTIPLIER)
+
+
+def compute_actual_price_paise(service: Mapping, ppp_multiplier: float) -> int:
+    """Undiscounted (list) price in paise, shown struck through next to the price"""
+    final_price = service["actual_price"] * ppp_multiplier
+    final_price = final_price * service.get("price_multiplier", 1.0)
+    return round(final_price * 100)
+
+
+def compute_price_paise(service: Mapping, ppp_multiplier: float) -> int:
+    """Price in paise for a paid consultation"""
+    base_price = service["actual_price"] * (1 - service["discount_percent"] / 100)
+    final_price = base_price * ppp_multiplier
+    final_price = final_price * service.get("price_multiplier", 1.0)
+    return round(final_price * 100)
+
+
+class PriceBook:
+    """Prices for one snapshot of the service catalog, compiled up front"""
+
+    def __init__(self, services: Mapping[str, Mapping]):
+        # (service ID, PPP multiplier) -> price in paise
+        self.table: Dict[tuple, int] = {
+            (service_id, multiplier): compute_price_paise(service, multiplier)
+            for service_id, service in services.items()
+            for multiplier in PPP_MULTIPLIERS
+        }
+        self.service_ids = tuple(services)
+        self._services = services
+
+        # (PPP multiplier, charge currency) -> pre-serialized price catalog (not per country).
+        # INR catalogs are built up front; other currencies on first request.
+        self.catalogs: Dict[tuple, bytes] = {
+            (multiplier, "INR"): orjson.dumps(self._build_price_catalog(multiplier))
+            for multiplier in PPP_MULTIPLIERS
+        }
+
+        # Changes whenever any price changes, for cache validators
+        self.version = hashlib.sha1(b"".join(self.catalogs.values())).hexdigest()[:12]
+
+    def _build_price_catalog(
+        self,
+        ppp_multiplier: float,
+        charge_currency: str = "INR",
+        convert: Optional[Callable[[int, str], int]] = None
+    ) -> dict:
+        """
+        Every service's list and discounted price (INR paise) for one PPP multiplier,
+        plus the price in the charge currency's smallest unit (charge_price).
+        """
+        def to_charge(amount_paise: int) -> int:
+            return convert(amount_paise, charge_currency) if convert else amount_paise
+
+        return {
+            "currency": "INR",
+            "charge_currency": charge_currency,
+            "ppp_multiplier": ppp_multiplier,
+            "free_duration": FREE_DURATION,
+            "paid_duration": PAID_DURATION,
+            "services": [
+                {
+                    "id": service_id,
+                    "discount_percent": service["discount_percent"],
+                    "actual_price": compute_actual_price_paise(service, ppp_multiplier),
+                    "price": self.table[(service_id, ppp_multiplier)],
+                    "charge_actual_price": to_charge(compute_actual_price_paise(service, ppp_multiplier)),
+                    "charge_price": to_charge(self.table[(service_id, ppp_multiplier)]),
+                }
+                for service_id, service in self._services.items()
+            ],
+        }
+
+    def calculate_price(self, duration: str, service: str = None, country: str = "India") -> int:
+        """
+        Calculate consultation price for a duration, service and country.
+        Returns: Price in paise (0 for free consultations)
+        Raises ValueError for a paid consultation of an unknown or inactive service.
+        """
+        if duration == FREE_DURATION:
+            return 0
+        if duration != PAID_DURATION:
+            raise ValueError(f"Unknown consultation duration: {duration}")
+        if service not in self.service_ids:
+            raise ValueError(f"Service {service} is not available for booking")
+        return self.table[(service, get_ppp_multiplier(country))]
+
+    def quote_all_services(self, country: str = "India") -> Dict[str, int]:
+        """Paid consultation price in paise for every service, for one country"""
+        multiplier = get_ppp_multiplier(country)
+        return {service_id: self.table[(service_id, multiplier)] for service_id in self.service_ids}
+
+    def get_price_catalog(
+        self,
+        country: Optional[str],
+        charge_currency: str = "INR",
+        convert: Optional[Callable[[int, str], int]] = None
+    ) -> Tuple[float, bytes]:
+        """
+        PPP multiplier and serialized price catalog for a country.
+        `convert(amount_paise, currency)` is required for a non-INR charge currency.
+        """
+        multiplier = get_ppp_multiplier(country)
+        key = (multiplier, charge_currency)
+        if key not in self.catalogs:
+            self.catalogs[key] = orjson.dumps(self._build_price_catalog(multiplier, charge_currency, convert))
+        return multiplier, self.catalogs[key]
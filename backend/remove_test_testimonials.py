@@ -45,6 +45,14 @@ async def remove_test_testimonials():
             if result.deleted_count > 0:
                 print(f"\nDeleted {result.deleted_count} testimonials matching pattern: {pattern}")
         
+        if deleted_count > 0:
+            # Invalidate cached testimonial responses (ETag version)
+            await db.content_versions.update_one(
+                {"_id": "testimonials"},
+                {"$inc": {"version": 1}},
+                upsert=True
+            )
+
         print(f"\n=== Summary ===")
         print(f"Total test testimonials removed: {deleted_count}")
         
@@ -0,0 +1 @@
+"""API routers, one module per area; included by main.create_app()"""
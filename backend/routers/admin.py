@@ -0,0 +1,231 @@
+"""
+Admin endpoints. Client data, catalog management, metrics and slow queries
+require the X-Admin-Key header (ADMIN_API_KEY).
+"""
+
+from fastapi import APIRouter, HTTPException, Request, Response, Depends
+from fastapi.responses import ORJSONResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import logging
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+import uuid
+
+from models import BookingStatus, ServiceUpdate
+from database import get_db, read_db
+from security import require_admin
+from service_catalog import ServiceCatalog, CatalogStore, get_catalog, get_catalog_store
+from metrics import render_metrics
+from slow_queries import SLOW_QUERY_COLLECTION
+from http_cache import bump_content_version
+from routers.bookings import auto_cancel_expired_bookings
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["admin"])
+
+
+@router.post("/admin/cancel-expired-bookings")
+async def trigger_cancel_expired_bookings(
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    catalog: ServiceCatalog = Depends(get_catalog)
+):
+    """
+    Admin endpoint to manually trigger auto-cancellation of expired bookings.
+    Can also be called by a cron job.
+    """
+    try:
+        cancelled_count = await auto_cancel_expired_bookings(db, catalog)
+        return {
+            "success": True,
+            "message": f"Auto-cancelled {cancelled_count} expired booking(s)",
+            "cancelled_count": cancelled_count
+        }
+    except Exception as e:
+        logger.error(f"Error triggering auto-cancel: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/admin/upcoming-sessions", dependencies=[Depends(require_admin)])
+async def get_upcoming_sessions(
+    astrologer: str,
+    days: int = 7,
+    db: AsyncIOMotorDatabase = Depends(read_db("admin_stats"))
+):
+    """
+    Get pending and confirmed sessions for an astrologer starting within the next `days` days.
+    Uses the (astrologer, status, slot_start_at) index.
+    """
+    try:
+        days = max(1, min(days, 90))
+        now = datetime.now(timezone.utc)
+
+        projection = {
+            "_id": 0,
+            "id": 1,
+            "name": 1,
+            "email": 1,
+            "phone": 1,
+            "service": 1,
+            "consultation_type": 1,
+            "preferred_date": 1,
+            "preferred_time": 1,
+            "slot_start_at": 1,
+            "status": 1,
+            "payment_status": 1
+        }
+
+        sessions = await db.bookings.find(
+            {
+                "astrologer": astrologer,
+                "status": {"$in": [BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value]},
+                "slot_start_at": {"$gte": now, "$lt": now + timedelta(days=days)}
+            },
+            projection
+        ).sort("slot_start_at", 1).to_list(500)
+
+        return ORJSONResponse({"astrologer": astrologer, "days": days, "sessions": sessions})
+    except Exception as e:
+        logger.error(f"Error fetching upcoming sessions: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Service catalog management
+@router.get("/admin/services", dependencies=[Depends(require_admin)])
+async def list_services(
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    catalog: ServiceCatalog = Depends(get_catalog)
+):
+    """All services in the catalog, including inactive ones"""
+    try:
+        services = await db.services.find({}, {"_id": 0}).to_list(100)
+        return {"version": catalog.version, "services": services}
+    except Exception as e:
+        logger.error(f"Error listing services: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/admin/services/{service_id}", dependencies=[Depends(require_admin)])
+async def update_service(
+    service_id: str,
+    service_update: ServiceUpdate,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    catalog_store: CatalogStore = Depends(get_catalog_store)
+):
+    """
+    Edit a service's name, pricing, duration or active flag.
+    All workers pick the change up on their next catalog poll; this one reloads immediately.
+    """
+    try:
+        update_data = service_update.model_dump(exclude_unset=True)
+        if not update_data:
+            raise HTTPException(status_code=400, detail="No fields to update")
+
+        result = await db.services.update_one({"id": service_id}, {"$set": update_data})
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Service not found")
+
+        await bump_content_version(db, "services")
+        catalog = await catalog_store.load(db)
+
+        logger.info(f"Service {service_id} updated: {update_data}")
+        return {
+            "message": "Service updated successfully",
+            "version": catalog.version,
+            "service": await db.services.find_one({"id": service_id}, {"_id": 0})
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating service: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/admin/reset-availability")
+async def reset_availability(db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Admin endpoint to reset availability to new time slots.
+    This will delete all existing availability and create new ones.
+    """
+    try:
+        astrologer_name = "Acharyaa Indira Pandey"
+
+        # Delete all existing availability for this astrologer
+        delete_result = await db.astrologer_availability.delete_many({
+            "astrologer": astrologer_name
+        })
+        logger.info(f"Deleted {delete_result.deleted_count} old availability records")
+
+        # New time slots:
+        # 9:30 AM - 10:30 AM
+        # 1:00 PM - 3:00 PM
+        # 6:30 PM - 10:00 PM
+        time_ranges = [
+            {"start_time": "09:30", "end_time": "10:30"},
+            {"start_time": "13:00", "end_time": "15:00"},
+            {"start_time": "18:30", "end_time": "22:00"}
+        ]
+
+        availability_data = []
+        # Add availability for all 7 days (Monday to Sunday)
+        # Using 30-minute slots as standard
+        for day in range(7):
+            for time_range in time_ranges:
+                availability_data.append({
+                    "id": str(uuid.uuid4()),
+                    "astrologer": astrologer_name,
+                    "day_of_week": day,
+                    "start_time": time_range["start_time"],
+                    "end_time": time_range["end_time"],
+                    "slot_duration_minutes": 30,
+                    "is_active": True,
+                    "created_at": datetime.now(timezone.utc),
+                    "updated_at": datetime.now(timezone.utc)
+                })
+
+        result = await db.astrologer_availability.insert_many(availability_data)
+        logger.info(f"✅ Created {len(availability_data)} new availability records")
+
+        return {
+            "message": "Availability reset successfully",
+            "deleted": delete_result.deleted_count,
+            "created": len(availability_data),
+            "time_ranges": time_ranges
+        }
+    except Exception as e:
+        logger.error(f"Error resetting availability: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Prometheus scrape endpoint (per-process; see metrics.py)
+@router.get("/admin/metrics", dependencies=[Depends(require_admin)])
+async def get_metrics():
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@router.get("/admin/slow-queries", dependencies=[Depends(require_admin)])
+async def get_slow_queries(
+    request: Request,
+    collection: Optional[str] = None,
+    collscan_only: bool = False,
+    limit: int = 50,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Most recent slow Mongo commands with their query shape and plan summary"""
+    try:
+        query = {}
+        if collection:
+            query["collection"] = collection
+        if collscan_only:
+            query["plan.collscan"] = True
+
+        # Capped collection: natural order is insertion order
+        slow_queries = await db[SLOW_QUERY_COLLECTION].find(query, {"_id": 0}).sort(
+            "$natural", -1
+        ).limit(min(max(limit, 1), 500)).to_list(None)
+        return {
+            "threshold_ms": request.app.state.slow_query_listener.threshold_ms,
+            "count": len(slow_queries),
+            "slow_queries": slow_queries
+        }
+    except Exception as e:
+        logger.error(f"Error fetching slow queries: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,290 @@
+"""
+Account endpoints: signup, login, token verification and password reset
+"""
+
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import os
+import logging
+from datetime import datetime, timezone, timedelta
+import uuid
+
+from models import UserCreate, UserLogin, User, PasswordResetRequest, PasswordReset
+from database import get_db
+from security import hash_password, verify_password, create_access_token, get_current_user
+from emails import send_email
+from tracing import traced_task
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["auth"])
+
+
+@router.post("/auth/signup")
+async def signup(user_data: UserCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Register a new user"""
+    try:
+        # Check if user already exists
+        existing_user = await db.users.find_one({"email": user_data.email})
+        if existing_user:
+            raise HTTPException(status_code=400, detail="Email already registered. Please login instead.")
+
+        # Hash password
+        hashed_password = hash_password(user_data.password)
+
+        # Create user
+        user_id = str(uuid.uuid4())
+        user = {
+            "id": user_id,
+            "name": user_data.name,
+            "email": user_data.email,
+            "phone": user_data.phone,
+            "password": hashed_password,
+            "created_at": datetime.now(timezone.utc),
+            "first_booking_completed": False
+        }
+
+        await db.users.insert_one(user)
+
+        # Create access token
+        token = create_access_token(user_id, user_data.email)
+
+        # Return user data without password
+        user_response = User(
+            id=user_id,
+            name=user_data.name,
+            email=user_data.email,
+            phone=user_data.phone,
+            created_at=user["created_at"]
+        )
+
+        return {
+            "token": token,
+            "user": user_response.model_dump()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Signup error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to create account")
+
+
+@router.post("/auth/login")
+async def login(credentials: UserLogin, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Login user"""
+    try:
+        # Find user
+        user = await db.users.find_one({"email": credentials.email})
+        if not user:
+            raise HTTPException(status_code=404, detail="Invalid email or password. Account does not exist. Please create an account first.")
+
+        # Verify password
+        if not verify_password(credentials.password, user["password"]):
+            raise HTTPException(status_code=401, detail="Invalid email or password. Please try again.")
+
+        # Create access token
+        token = create_access_token(user["id"], user["email"])
+
+        # Return user data without password
+        user_response = User(
+            id=user["id"],
+            name=user["name"],
+            email=user["email"],
+            phone=user.get("phone"),
+            created_at=user["created_at"]
+        )
+
+        return {
+            "token": token,
+            "user": user_response.model_dump()
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Login error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Login failed")
+
+
+@router.get("/auth/verify")
+async def verify_token(current_user: dict = Depends(get_current_user)):
+    """Verify JWT token and return user data"""
+    user_response = User(
+        id=current_user["id"],
+        name=current_user["name"],
+        email=current_user["email"],
+        phone=current_user.get("phone"),
+        created_at=current_user["created_at"],
+        first_booking_completed=current_user.get("first_booking_completed", False)
+    )
+    return {"user": user_response.model_dump()}
+
+
+@router.get("/auth/first-booking-status")
+async def get_first_booking_status(current_user: dict = Depends(get_current_user)):
+    """Check if user can access first-time booking discount (5-10 mins option)"""
+    first_booking_completed = current_user.get("first_booking_completed", False)
+    return {
+        "can_book_first_time": not first_booking_completed,
+        "first_booking_completed": first_booking_completed
+    }
+
+
+@router.post("/auth/forgot-password")
+async def forgot_password(
+    request: PasswordResetRequest,
+    background_tasks: BackgroundTasks,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Send password reset email"""
+    try:
+        # Find user by email
+        user = await db.users.find_one({"email": request.email})
+        if not user:
+            # Don't reveal if email exists or not for security
+            return {"message": "If the email exists, a password reset link has been sent"}
+
+        # Generate reset token (valid for 1 hour)
+        reset_token = str(uuid.uuid4())
+        reset_expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+
+        # Store reset token in database
+        await db.password_resets.insert_one({
+            "user_id": user["id"],
+            "email": user["email"],
+            "token": reset_token,
+            "expires_at": reset_expiry,
+            "used": False,
+            "created_at": datetime.now(timezone.utc)
+        })
+
+        # Send reset email
+        frontend_url = os.environ.get('FRONTEND_URL', 'http://localhost:3000')
+        logger.info(f"🔗 Using FRONTEND_URL: {frontend_url}")
+        reset_link = f"{frontend_url}/reset-password/{reset_token}"
+        logger.info(f"🔗 Generated reset link: {reset_link}")
+
+        email_body = f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+</head>
+<body style="margin: 0; padding: 0; font-family: Arial, sans-serif; background-color: #f5f5f5;">
+    <table width="100%" cellpadding="0" cellspacing="0" border="0" style="background-color: #f5f5f5;">
+        <tr>
+            <td align="center" style="padding: 40px 20px;">
+                <table width="600" cellpadding="0" cellspacing="0" border="0" style="background-color: #ffffff;">
+                    <!-- Header -->
+                    <tr>
+                        <td style="padding: 40px;">
+                            <h2 style="margin: 0 0 20px 0; color: #7c3aed; font-size: 24px;">Password Reset Request</h2>
+                            <p style="margin: 0 0 15px 0; color: #333333; font-size: 16px; line-height: 1.6;">Hello {user['name']},</p>
+                            <p style="margin: 0 0 15px 0; color: #333333; font-size: 16px; line-height: 1.6;">We received a request to reset your password for your Acharyaa Indira Pandey Astrology account.</p>
+                            <p style="margin: 0 0 30px 0; color: #333333; font-size: 16px; line-height: 1.6;">Click the link below to reset your password:</p>
+                        </td>
+                    </tr>
+
+                    <!-- Button -->
+                    <tr>
+                        <td align="center" style="padding: 0 40px 30px 40px;">
+                            <a href="{reset_link}" style="display: inline-block; padding: 16px 48px; background-color: #7c3aed; color: #ffffff; text-decoration: none; font-size: 16px; font-weight: bold; border-radius: 6px;">Reset Password</a>
+                        </td>
+                    </tr>
+
+                    <!-- Alternative Link -->
+                    <tr>
+                        <td style="padding: 0 40px 30px 40px;">
+                            <p style="margin: 0 0 10px 0; color: #666666; font-size: 14px;">Or copy and paste this link:</p>
+                            <p style="margin: 0; padding: 15px; background-color: #f3f4f6; word-break: break-all; font-size: 13px;">
+                                <a href="{reset_link}" style="color: #7c3aed;">{reset_link}</a>
+                            </p>
+                        </td>
+                    </tr>
+
+                    <!-- Warning -->
+                    <tr>
+                        <td style="padding: 0 40px 40px 40px;">
+                            <p style="margin: 0 0 15px 0; color: #333333; font-size: 14px;"><strong>⏰ This link will expire in 1 hour.</strong></p>
+                            <p style="margin: 0; color: #666666; font-size: 14px;">If you didn't request this password reset, please ignore this email.</p>
+                        </td>
+                    </tr>
+
+                    <!-- Footer -->
+                    <tr>
+                        <td style="padding: 20px 40px; border-top: 1px solid #e5e7eb;">
+                            <p style="margin: 0; color: #6b7280; font-size: 14px;">
+                                Best regards,<br>
+                                <strong>Acharyaa Indira Pandey Astrology Team</strong>
+                            </p>
+                        </td>
+                    </tr>
+                </table>
+            </td>
+        </tr>
+    </table>
+</body>
+</html>"""
+
+        background_tasks.add_task(
+            traced_task(send_email),
+            user["email"],
+            "Password Reset Request - Acharyaa Indira Pandey Astrology",
+            email_body
+        )
+
+        logger.info(f"Password reset email sent to {user['email']}")
+        return {"message": "If the email exists, a password reset link has been sent"}
+
+    except Exception as e:
+        logger.error(f"Forgot password error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to process password reset request")
+
+
+@router.post("/auth/reset-password")
+async def reset_password(reset_data: PasswordReset, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """Reset password using token"""
+    try:
+        # Find reset token
+        reset_record = await db.password_resets.find_one({
+            "token": reset_data.token,
+            "used": False
+        })
+
+        if not reset_record:
+            raise HTTPException(status_code=400, detail="Invalid or expired reset token")
+
+        # Check if token has expired
+        expires_at = reset_record["expires_at"]
+        if not expires_at.tzinfo:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+
+        if expires_at < datetime.now(timezone.utc):
+            raise HTTPException(status_code=400, detail="Reset token has expired")
+
+        # Validate new password
+        if len(reset_data.new_password) < 6:
+            raise HTTPException(status_code=400, detail="Password must be at least 6 characters")
+
+        # Hash new password
+        hashed_password = hash_password(reset_data.new_password)
+
+        # Update user password
+        await db.users.update_one(
+            {"id": reset_record["user_id"]},
+            {"$set": {"password": hashed_password}}
+        )
+
+        # Mark token as used
+        await db.password_resets.update_one(
+            {"token": reset_data.token},
+            {"$set": {"used": True, "used_at": datetime.now(timezone.utc)}}
+        )
+
+        logger.info(f"Password reset successful for user {reset_record['user_id']}")
+        return {"message": "Password reset successful"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Reset password error: {str(e)}")
+        raise HTTPException(status_code=500, detail="Failed to reset password")
@@ -0,0 +1,216 @@
+"""
+Astrologer availability and bookable time slots
+"""
+
+from fastapi import APIRouter, HTTPException, Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from models import BookingStatus, AstrologerAvailability
+from database import get_db, read_db
+from timestamps import IST
+from service_catalog import ServiceCatalog, get_catalog
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["availability"])
+
+
+# Time Slot Management
+# Default working hours when an astrologer has no availability for the day
+DEFAULT_AVAILABILITY_RANGES = [
+    {"start_time": "09:30", "end_time": "10:30", "slot_duration_minutes": 30},
+    {"start_time": "13:00", "end_time": "15:00", "slot_duration_minutes": 30},
+    {"start_time": "18:30", "end_time": "22:00", "slot_duration_minutes": 30}
+]
+
+
+def generate_time_slots(
+    date: str,
+    availability_ranges: list,
+    slot_duration: int,
+    booked_times: set,
+    now_ist: datetime
+) -> list:
+    """
+    Bookable slots of slot_duration minutes on a date (YYYY-MM-DD), sorted by start time.
+    Slots whose start time is in booked_times or not after now_ist are left out.
+    """
+    all_slots = []
+
+    for availability in availability_ranges:
+        start_time = availability["start_time"]
+        end_time = availability["end_time"]
+
+        current_time = datetime.strptime(f"{date} {start_time}", "%Y-%m-%d %H:%M")
+        end_datetime = datetime.strptime(f"{date} {end_time}", "%Y-%m-%d %H:%M")
+
+        # Make current_time and end_datetime timezone-aware (IST)
+        current_time = IST.localize(current_time)
+        end_datetime = IST.localize(end_datetime)
+
+        while current_time < end_datetime:
+            # Calculate slot end time based on service duration
+            slot_end = current_time + timedelta(minutes=slot_duration)
+
+            # Check if slot fits within availability window
+            if slot_end > end_datetime:
+                break
+
+            slot_start_str = current_time.strftime("%H:%M")
+            slot_end_str = slot_end.strftime("%H:%M")
+
+            # Check if this slot is already booked (using pre-fetched set - O(1) lookup)
+            is_available = slot_start_str not in booked_times
+
+            # Don't show past slots (compare with IST time)
+            if current_time > now_ist and is_available:
+                # Format time in 12-hour format with AM/PM
+                start_12hr = current_time.strftime("%I:%M %p")
+                end_12hr = slot_end.strftime("%I:%M %p")
+
+                all_slots.append({
+                    "start_time": slot_start_str,
+                    "end_time": slot_end_str,
+                    "is_available": True,
+                    "display": f"{start_12hr} - {end_12hr}",
+                    "duration": slot_duration
+                })
+
+            # Move to next slot based on service duration
+            current_time = current_time + timedelta(minutes=slot_duration)
+
+    # Sort slots by start time
+    all_slots.sort(key=lambda x: x["start_time"])
+    return all_slots
+
+
+@router.get("/available-slots")
+async def get_available_slots(
+    astrologer: str,
+    date: str,
+    service: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(read_db("availability")),
+    catalog: ServiceCatalog = Depends(get_catalog)
+):
+    """
+    Get available time slots for a specific astrologer on a given date based on service duration.
+
+    Args:
+        astrologer: Name of the astrologer
+        date: Date in YYYY-MM-DD format
+        service: Service ID to determine slot duration (optional, defaults to 30 mins)
+
+    Returns:
+        List of available time slots
+    """
+    try:
+        # Parse the date
+        slot_date = datetime.strptime(date, "%Y-%m-%d")
+        day_of_week = slot_date.weekday()  # 0=Monday, 6=Sunday
+
+        # Get ALL astrologer's availability ranges for this day of week
+        availability_ranges = await db.astrologer_availability.find({
+            "astrologer": astrologer,
+            "day_of_week": day_of_week,
+            "is_active": True
+        }).to_list(10)
+
+        # If no availability defined, use default time ranges
+        if not availability_ranges:
+            availability_ranges = DEFAULT_AVAILABILITY_RANGES
+
+        # Determine slot duration based on service
+        slot_duration = catalog.get_slot_duration(service)
+
+        # OPTIMIZATION: Fetch all booked slots for this astrologer and date at once
+        # This reduces database queries from N (number of slots) to just 2 queries total
+        booked_times = set()
+        existing_bookings = await db.bookings.find({
+            "astrologer": astrologer,
+            "preferred_date": date,
+            "status": {"$in": [BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value]}
+        }, {"preferred_time": 1}).to_list(100)
+
+        for booking in existing_bookings:
+            booked_times.add(booking.get("preferred_time"))
+
+        # Fetch all blocked slots from time_slots collection
+        blocked_slots = await db.time_slots.find({
+            "astrologer": astrologer,
+            "date": date,
+            "is_available": False
+        }, {"start_time": 1}).to_list(100)
+
+        for slot in blocked_slots:
+            booked_times.add(slot.get("start_time"))
+
+        logger.info(f"📅 Fetching slots for {astrologer} on {date} - {len(booked_times)} slots already booked")
+
+        all_slots = generate_time_slots(
+            date, availability_ranges, slot_duration, booked_times, datetime.now(IST)
+        )
+
+        return {"slots": all_slots, "date": date, "astrologer": astrologer}
+
+    except ValueError as e:
+        logger.error(f"Invalid date format: {str(e)}")
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    except Exception as e:
+        logger.error(f"Error fetching available slots: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/astrologer-availability")
+async def create_astrologer_availability(
+    availability: AstrologerAvailability,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Create or update astrologer availability schedule.
+    This is typically used by admin to set working hours.
+    """
+    try:
+        availability_doc = availability.model_dump()
+
+        # Check if availability already exists for this astrologer and day
+        existing = await db.astrologer_availability.find_one({
+            "astrologer": availability.astrologer,
+            "day_of_week": availability.day_of_week
+        })
+
+        if existing:
+            # Update existing
+            await db.astrologer_availability.update_one(
+                {"id": existing["id"]},
+                {"$set": availability_doc}
+            )
+            return {"message": "Availability updated successfully", "id": existing["id"]}
+        else:
+            # Create new
+            await db.astrologer_availability.insert_one(availability_doc)
+            return {"message": "Availability created successfully", "id": availability.id}
+
+    except Exception as e:
+        logger.error(f"Error creating astrologer availability: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/astrologer-availability/{astrologer}")
+async def get_astrologer_availability(
+    astrologer: str,
+    db: AsyncIOMotorDatabase = Depends(read_db("availability"))
+):
+    """
+    Get all availability schedules for a specific astrologer.
+    """
+    try:
+        availability = await db.astrologer_availability.find(
+            {"astrologer": astrologer, "is_active": True},
+            {"_id": 0}
+        ).to_list(100)
+
+        return {"astrologer": astrologer, "availability": availability}
+    except Exception as e:
+        logger.error(f"Error fetching astrologer availability: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,1029 @@
+"""
+Booking endpoints and the expired-booking cleanup job
+"""
+
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks, Depends
+from fastapi.responses import ORJSONResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+import os
+import logging
+from datetime import datetime, timezone
+import uuid
+
+from models import Booking, BookingCreate, BookingStatus, PaymentStatus
+from database import get_db, read_db
+from security import get_current_user
+from emails import send_email
+from integrations import Integrations, get_integrations
+from timestamps import compute_slot_start_at
+from service_catalog import ServiceCatalog, get_catalog
+from pricing import FREE_DURATION
+from currency import quote_in_charge_currency
+from metrics import track_outbound
+from tracing import traced_task
+from routers.payments import format_booking_charge, get_booking_charge, get_refund_next_sync_at
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["bookings"])
+
+
+# Backfill typed slot start for bookings created before slot_start_at existed
+async def backfill_slot_start_at(db: AsyncIOMotorDatabase) -> int:
+    """
+    Set slot_start_at on bookings that have a preferred_date but no slot_start_at.
+    Bookings whose date/time can't be parsed get slot_start_at None (as new bookings
+    do), so they are reported once rather than rescanned at every startup.
+    Idempotent - returns the number of bookings given a slot start.
+    """
+    cursor = db.bookings.find(
+        {
+            "slot_start_at": {"$exists": False},
+            "preferred_date": {"$exists": True, "$ne": None}
+        },
+        {"_id": 1, "id": 1, "preferred_date": 1, "preferred_time": 1}
+    )
+
+    operations = []
+    unparseable = []
+    async for booking in cursor:
+        slot_start_at = compute_slot_start_at(booking.get("preferred_date"), booking.get("preferred_time"))
+        if slot_start_at is None:
+            unparseable.append(booking.get("id", str(booking["_id"])))
+        operations.append(UpdateOne({"_id": booking["_id"]}, {"$set": {"slot_start_at": slot_start_at}}))
+
+    if operations:
+        await db.bookings.bulk_write(operations, ordered=False)
+    if unparseable:
+        logger.warning(
+            f"⚠️ {len(unparseable)} booking(s) have an unparseable preferred date/time and no slot start "
+            f"(they won't be auto-cancelled): {', '.join(unparseable[:20])}"
+        )
+    return len(operations) - len(unparseable)
+
+
+# Auto-cancel expired bookings function
+async def auto_cancel_expired_bookings(db: AsyncIOMotorDatabase, catalog: ServiceCatalog):
+    """
+    Auto-cancel bookings that:
+    1. Have a slot start (slot_start_at) in the past
+    2. Status is still PENDING
+    3. Payment status is PENDING
+
+    This prevents users from paying for expired bookings.
+    """
+    try:
+        now = datetime.now(timezone.utc)
+
+        # Find all pending bookings whose slot has started (indexed range query on slot_start_at)
+        expired_bookings = await db.bookings.find({
+            "status": BookingStatus.PENDING,
+            "payment_status": PaymentStatus.PENDING,
+            "slot_start_at": {"$lt": now}
+        }).to_list(length=None)
+
+        cancelled_count = 0
+
+        for booking in expired_bookings:
+            try:
+                booking_date_str = booking.get('preferred_date')
+                booking_time_str = booking.get('preferred_time', '00:00')
+
+                # Cancel the booking (status re-checked in case it was paid meanwhile)
+                result = await db.bookings.update_one(
+                    {
+                        "id": booking['id'],
+                        "status": BookingStatus.PENDING,
+                        "payment_status": PaymentStatus.PENDING
+                    },
+                    {
+                        "$set": {
+                            "status": BookingStatus.CANCELLED,
+                            "updated_at": now,
+                            "cancellation_reason": "Auto-cancelled: Booking date passed with pending payment"
+                        }
+                    }
+                )
+
+                if result.modified_count > 0:
+                    cancelled_count += 1
+                    logger.info(
+                        f"Auto-cancelled expired booking {booking['id']} "
+                        f"(Date: {booking_date_str}, Customer: {booking.get('email')})"
+                    )
+
+                    # Send cancellation email to customer
+                    try:
+                        customer_email_body = f"""
+                        <html>
+                        <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+                            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                                <h2 style="color: #ef4444;">Booking Auto-Cancelled</h2>
+                                <p>Dear {booking.get('name')},</p>
+                                <p>Your booking has been automatically cancelled because the scheduled date has passed and payment was not completed.</p>
+
+                                <h3 style="color: #7c3aed;">Booking Details:</h3>
+                                <table style="width: 100%; border-collapse: collapse;">
+                                    <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong></td><td>{booking['id']}</td></tr>
+                                    <tr><td style="padding: 8px 0;"><strong>Service:</strong></td><td>{catalog.get_service_name(booking.get('service'))}</td></tr>
+                                    <tr><td style="padding: 8px 0;"><strong>Scheduled Date:</strong></td><td>{booking_date_str}</td></tr>
+                                    <tr><td style="padding: 8px 0;"><strong>Scheduled Time:</strong></td><td>{booking_time_str}</td></tr>
+                                </table>
+
+                                <p style="margin-top: 20px;">If you would like to book a new consultation, please visit our website.</p>
+                                <p style="margin-top: 30px;">Best regards,<br><strong>Acharyaa Indira Pandey Team</strong></p>
+                            </div>
+                        </body>
+                        </html>
+                        """
+                        await send_email(
+                            booking.get('email'),
+                            "Booking Auto-Cancelled - Payment Not Completed",
+                            customer_email_body
+                        )
+                    except Exception as email_error:
+                        logger.error(f"Failed to send cancellation email: {str(email_error)}")
+
+            except Exception as booking_error:
+                logger.error(f"Error processing booking {booking.get('id')}: {str(booking_error)}")
+                continue
+
+        if cancelled_count > 0:
+            logger.info(f"✅ Auto-cancelled {cancelled_count} expired booking(s)")
+
+        return cancelled_count
+
+    except Exception as e:
+        logger.error(f"Error in auto_cancel_expired_bookings: {str(e)}")
+        return 0
+
+
+# Booking endpoints
+@router.post("/bookings")
+async def create_booking(
+    booking_data: BookingCreate,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+    test_country: str = None,  # Add test_country parameter for testing
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    integrations: Integrations = Depends(get_integrations),
+    catalog: ServiceCatalog = Depends(get_catalog)
+):
+    try:
+        # Check if test_country parameter is provided (for testing)
+        if test_country:
+            country = test_country
+            logger.info(f"🧪 Testing mode: Using test country for booking: {country}")
+        else:
+            # Detect country from IP address
+            client_ip = request.headers.get("X-Forwarded-For")
+            if client_ip:
+                client_ip = client_ip.split(",")[0].strip()
+            else:
+                client_ip = request.client.host
+
+            # Detect country
+            country = "India"  # Default
+            try:
+                if client_ip not in ["127.0.0.1", "localhost", "::1"] and not client_ip.startswith("192.168.") and not client_ip.startswith("10."):
+                    with track_outbound("ipapi"):
+                        response = await integrations.http_client.get(
+                            f"{integrations.ipapi_base_url}/{client_ip}/json/", timeout=3.0
+                        )
+                    if response.status_code == 200:
+                        data = response.json()
+                        country = data.get("country_name", "India")
+                        logger.info(f"Detected country: {country} for booking from IP: {client_ip}")
+            except Exception as geo_error:
+                logger.warning(f"Geolocation failed, using default India: {str(geo_error)}")
+
+        # Check if this is user's first booking
+        user_bookings_count = await db.bookings.count_documents({"email": current_user["email"]})
+        is_first_booking = user_bookings_count == 0
+
+        # Calculate price based on duration, service, and detected country
+        # (unknown or inactive services can't be booked - they'd otherwise come out free)
+        is_free = booking_data.consultation_duration == FREE_DURATION
+        try:
+            amount = catalog.pricing.calculate_price(
+                booking_data.consultation_duration,
+                booking_data.service,
+                country
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        # Amount actually charged (local currency when multi-currency is enabled)
+        charge_currency, charge_amount = quote_in_charge_currency(amount, country)
+
+        # The Razorpay order is created lazily by /bookings/{id}/payment-order when the
+        # payment modal opens, so booking creation doesn't wait on the Razorpay API
+
+        # Create booking
+        booking_dict = booking_data.model_dump()
+
+        # For free bookings (5-10 mins), payment is completed and booking is confirmed
+        # For paid bookings, payment is pending and booking is pending
+        if not is_free:
+            payment_status = PaymentStatus.PENDING
+            booking_status = BookingStatus.PENDING
+            logger.info(f"Creating PAID booking: amount=₹{amount/100}, status=PENDING, payment=PENDING")
+        else:
+            payment_status = PaymentStatus.COMPLETED
+            booking_status = BookingStatus.CONFIRMED  # Free bookings are auto-confirmed
+            logger.info(f"Creating FREE booking: amount=₹0, status=CONFIRMED, payment=COMPLETED")
+
+        booking = Booking(
+            **booking_dict,
+            country=country,  # Store detected country
+            amount=amount,
+            charge_currency=charge_currency,
+            charge_amount=charge_amount,
+            slot_start_at=compute_slot_start_at(booking_data.preferred_date, booking_data.preferred_time),
+            status=booking_status,
+            payment_status=payment_status
+        )
+
+        # Save to database
+        booking_doc = booking.model_dump()
+
+        await db.bookings.insert_one(booking_doc)
+
+        # Reserve the time slot if date and time are provided
+        if booking_data.preferred_date and booking_data.preferred_time:
+            # Check if slot is already booked
+            existing_booking = await db.bookings.find_one({
+                "astrologer": booking_data.astrologer,
+                "preferred_date": booking_data.preferred_date,
+                "preferred_time": booking_data.preferred_time,
+                "status": {"$in": [BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value]},
+                "id": {"$ne": booking.id}
+            })
+
+            if not existing_booking:
+                # Reserve the slot
+                slot_doc = {
+                    "id": str(uuid.uuid4()),
+                    "astrologer": booking_data.astrologer,
+                    "date": booking_data.preferred_date,
+                    "start_time": booking_data.preferred_time,
+                    "end_time": booking_data.preferred_time,  # Will be calculated based on duration
+                    "is_available": False,
+                    "booking_id": booking.id,
+                    "created_at": datetime.now(timezone.utc),
+                    "updated_at": datetime.now(timezone.utc)
+                }
+                await db.time_slots.insert_one(slot_doc)
+                logger.info(f"Reserved time slot: {booking_data.preferred_date} at {booking_data.preferred_time} for booking {booking.id}")
+
+        # Mark first booking as completed ONLY if user used the free 5-10 mins option
+        if booking_data.consultation_duration == "5-10":
+            await db.users.update_one(
+                {"email": current_user["email"]},
+                {"$set": {"first_booking_completed": True}}
+            )
+            logger.info(f"Marked first free booking (5-10 mins) completed for user: {current_user['email']}")
+
+        # Send confirmation email in background (non-blocking)
+        # Amounts in the currency the client is charged in (admins also see the INR price)
+        amount_display = format_booking_charge(booking_doc) if amount > 0 else 'Free (First Time)'
+        admin_amount_display = format_booking_charge(booking_doc, with_inr=True)
+        consultation_type = booking.consultation_type.value.title()
+        duration_display = f"{booking.consultation_duration.value} minutes"
+        service_name = catalog.get_service_name(booking.service)
+
+        email_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #7c3aed;">Booking Confirmation</h2>
+                <p>Dear {booking.name},</p>
+                <p>Thank you for booking a consultation with us!</p>
+                <h3 style="color: #7c3aed;">Booking Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong>
+                    </td><td>{booking.id}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Astrologer:</strong>
+                    </td><td>{booking.astrologer}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Service:</strong>
+                    </td><td>{service_name}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Duration:</strong>
+                    </td><td>{duration_display}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Amount:</strong>
+                    </td><td>{amount_display}</td></tr>
+                    <tr><td style="padding: 8px 0;">
+                    <strong>Consultation Type:</strong>
+                    </td><td>{consultation_type}</td></tr>
+                </table>
+                <p style="margin-top: 20px;">
+                We will review your request and contact you within 24 hours.
+                </p>
+                <p style="margin-top: 30px;">Best regards,<br>
+                <strong>Acharyaa Indira Pandey Team</strong></p>
+            </div>
+        </body>
+        </html>
+        """
+        # Different email subject and content based on payment status
+        if payment_status == PaymentStatus.PENDING:
+            email_subject = "Booking Request Received - Please Complete Payment"
+            payment_notice = f"""
+                <div style="margin: 20px 0; padding: 15px; background-color: #fef3c7; border-left: 4px solid #f59e0b;">
+                    <strong>⚠️ Payment Pending:</strong> Your booking request has been received.
+                    Please complete the payment of <strong>{amount_display}</strong> to confirm your booking.
+                </div>
+            """
+        else:
+            email_subject = "Booking Confirmation - Free Consultation"
+            payment_notice = f"""
+                <div style="margin: 20px 0; padding: 15px; background-color: #d1fae5; border-left: 4px solid #10b981;">
+                    <strong>✅ Confirmed:</strong> Your first-time free consultation has been confirmed!
+                </div>
+            """
+
+        # Update email body to include payment notice
+        email_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #7c3aed;">Booking Request Received</h2>
+                <p>Dear {booking.name},</p>
+                <p>Thank you for your interest in booking a consultation with us!</p>
+                {payment_notice}
+                <h3 style="color: #7c3aed;">Booking Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong>
+                    </td><td>{booking.id}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Astrologer:</strong>
+                    </td><td>{booking.astrologer}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Service:</strong>
+                    </td><td>{service_name}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Duration:</strong>
+                    </td><td>{duration_display}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Preferred Date:</strong>
+                    </td><td>{booking.preferred_date}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Preferred Time:</strong>
+                    </td><td>{booking.preferred_time}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Amount:</strong>
+                    </td><td>{amount_display}</td></tr>
+                    <tr><td style="padding: 8px 0;">
+                    <strong>Consultation Type:</strong>
+                    </td><td>{consultation_type}</td></tr>
+                </table>
+                <p style="margin-top: 20px;">
+                We will review your request and contact you within 24 hours to confirm your preferred time slot.
+                </p>
+                <p style="margin-top: 30px;">Best regards,<br>
+                <strong>Acharyaa Indira Pandey Team</strong></p>
+            </div>
+        </body>
+        </html>
+        """
+
+        # Send email to customer immediately (not background task)
+        try:
+            customer_email_sent = await send_email(booking.email, email_subject, email_body)
+            if customer_email_sent:
+                logger.info(f"📧 Customer email sent to {booking.email}")
+            else:
+                logger.warning(f"⚠️ Failed to send customer email to {booking.email}")
+        except Exception as e:
+            logger.error(f"❌ Error sending customer email: {str(e)}")
+
+        # Send notification email to admin/astrologer
+        admin_email = os.environ.get('SENDGRID_FROM_EMAIL', 'indirapandey2526@gmail.com')
+
+        # Different admin notification based on payment status
+        if payment_status == PaymentStatus.PENDING:
+            admin_subject = f"⚠️ New Booking - Payment Pending - {booking.name}"
+            admin_payment_notice = f"""
+                <div style="margin: 20px 0; padding: 15px; background-color: #fef3c7; border-left: 4px solid #f59e0b;">
+                    <strong>⚠️ Payment Status: PENDING</strong><br>
+                    Amount: {admin_amount_display}<br>
+                    Customer needs to complete payment to confirm this booking.
+                </div>
+            """
+            admin_action = "Wait for payment confirmation before scheduling the appointment."
+        else:
+            admin_subject = f"✅ New Booking - Confirmed - {booking.name}"
+            admin_payment_notice = f"""
+                <div style="margin: 20px 0; padding: 15px; background-color: #d1fae5; border-left: 4px solid #10b981;">
+                    <strong>✅ Payment Status: CONFIRMED</strong><br>
+                    This is a free first-time consultation.
+                </div>
+            """
+            admin_action = "Please contact the customer within 24 hours to schedule the appointment."
+
+        admin_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #7c3aed;">New Booking Request Received</h2>
+                <p>You have received a new booking request:</p>
+                {admin_payment_notice}
+                <h3 style="color: #7c3aed;">Customer Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Name:</strong>
+                    </td><td>{booking.name}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Email:</strong>
+                    </td><td>{booking.email}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Phone:</strong>
+                    </td><td>{booking.phone}</td></tr>
+                </table>
+
+                <h3 style="color: #7c3aed; margin-top: 20px;">Birth Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Date of Birth:</strong>
+                    </td><td>{booking.date_of_birth or '<em style="color: #999;">To be collected during call</em>'}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Time of Birth:</strong>
+                    </td><td>{booking.time_of_birth or '<em style="color: #999;">To be collected during call</em>'}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Place of Birth:</strong>
+                    </td><td>{booking.place_of_birth or '<em style="color: #999;">To be collected during call</em>'}</td></tr>
+                </table>
+
+                <h3 style="color: #7c3aed; margin-top: 20px;">Consultation Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Chosen Astrologer:</strong>
+                    </td><td>{booking.astrologer}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Service:</strong>
+                    </td><td>{booking.service}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Duration:</strong>
+                    </td><td>{duration_display}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Preferred Date:</strong>
+                    </td><td>{booking.preferred_date}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Preferred Time:</strong>
+                    </td><td>{booking.preferred_time}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Consultation Type:</strong>
+                    </td><td>{consultation_type}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Amount:</strong>
+                    </td><td>{amount_display}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong>
+                    </td><td>{booking.id}</td></tr>
+                </table>
+                {f'<p style="margin-top: 20px;"><strong>Message:</strong><br>{booking.message}</p>' if booking.message else ''}
+                <p style="margin-top: 30px; padding: 15px; background-color: #f3f4f6; border-left: 4px solid #7c3aed;">
+                    <strong>Action Required:</strong> {admin_action}
+                </p>
+            </div>
+        </body>
+        </html>
+        """
+
+        try:
+            admin_email_sent = await send_email(admin_email, admin_subject, admin_body)
+            if admin_email_sent:
+                logger.info(f"📧 Admin notification sent to {admin_email}")
+            else:
+                logger.warning(f"⚠️ Failed to send admin notification to {admin_email}")
+        except Exception as e:
+            logger.error(f"❌ Error sending admin notification: {str(e)}")
+
+        return booking
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating booking: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/bookings")
+async def get_bookings(
+    status: str = None,
+    page: int = 1,
+    limit: int = 50,
+    include_stats: bool = False,
+    db: AsyncIOMotorDatabase = Depends(read_db("admin_stats"))
+):
+    """
+    Get bookings with pagination and optional stats.
+
+    Args:
+        status: Filter by booking status (pending, confirmed, completed, cancelled)
+        page: Page number (default: 1)
+        limit: Items per page (default: 50, max: 100)
+        include_stats: Include statistics in response (default: False)
+    """
+    try:
+        # Validate and limit page size
+        limit = min(limit, 100)
+        skip = (page - 1) * limit
+
+        # Build query
+        query = {}
+        if status:
+            query["status"] = status
+
+        # Optimized projection - only fields needed by frontend
+        projection = {
+            "_id": 0,
+            "id": 1,
+            "name": 1,
+            "email": 1,
+            "phone": 1,
+            "astrologer": 1,
+            "service": 1,
+            "consultation_duration": 1,
+            "consultation_type": 1,
+            "preferred_date": 1,
+            "preferred_time": 1,
+            "status": 1,
+            "payment_status": 1,
+            "amount": 1,
+            "created_at": 1,
+            "updated_at": 1
+        }
+
+        # Execute query with pagination
+        bookings_cursor = db.bookings.find(query, projection).sort("created_at", -1).skip(skip).limit(limit)
+        bookings = await bookings_cursor.to_list(length=limit)
+
+        # Prepare response
+        response = {
+            "bookings": bookings,
+            "page": page,
+            "limit": limit,
+            "total": await db.bookings.count_documents(query)
+        }
+
+        # Add stats if requested (for admin dashboard)
+        if include_stats:
+            stats_pipeline = [
+                {
+                    "$group": {
+                        "_id": "$status",
+                        "count": {"$sum": 1}
+                    }
+                }
+            ]
+            stats_result = await db.bookings.aggregate(stats_pipeline).to_list(None)
+            stats = {item["_id"]: item["count"] for item in stats_result}
+
+            response["stats"] = {
+                "total": await db.bookings.count_documents({}),
+                "pending": stats.get("pending", 0),
+                "confirmed": stats.get("confirmed", 0),
+                "completed": stats.get("completed", 0),
+                "cancelled": stats.get("cancelled", 0)
+            }
+
+        return ORJSONResponse(response)
+    except Exception as e:
+        logger.error(f"Error fetching bookings: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/bookings/{booking_id}")
+async def get_booking(booking_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    try:
+        booking = await db.bookings.find_one({"id": booking_id}, {"_id": 0})
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        return ORJSONResponse(booking)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching booking: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Fields shown on the "My bookings" page - excludes birth details, messages and Razorpay ids
+USER_BOOKING_PROJECTION = {
+    "_id": 0,
+    "id": 1,
+    "astrologer": 1,
+    "service": 1,
+    "consultation_type": 1,
+    "consultation_duration": 1,
+    "preferred_date": 1,
+    "preferred_time": 1,
+    "status": 1,
+    "payment_status": 1,
+    "amount": 1,
+    "refund_id": 1,
+    "refund_status": 1,
+    "refund_amount": 1,
+    "refund_currency": 1,
+    "created_at": 1
+}
+
+
+@router.get("/user/bookings")
+async def get_user_bookings(
+    page: int = 1,
+    limit: int = 20,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Get the current user's bookings, newest first, with pagination.
+
+    Args:
+        page: Page number (default: 1)
+        limit: Items per page (default: 20, max: 100)
+    """
+    try:
+        page = max(page, 1)
+        limit = max(1, min(limit, 100))
+        skip = (page - 1) * limit
+
+        # Fetch one extra row to know whether another page exists without a count query
+        # Served by the (email, created_at desc) index
+        bookings = await db.bookings.find(
+            {"email": current_user["email"]},
+            USER_BOOKING_PROJECTION
+        ).sort("created_at", -1).skip(skip).limit(limit + 1).to_list(length=limit + 1)
+
+        has_more = len(bookings) > limit
+
+        return ORJSONResponse({
+            "bookings": bookings[:limit],
+            "page": page,
+            "limit": limit,
+            "has_more": has_more
+        })
+    except Exception as e:
+        logger.error(f"Error fetching user bookings: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/bookings/{booking_id}/cancel")
+async def cancel_booking(
+    booking_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    integrations: Integrations = Depends(get_integrations),
+    catalog: ServiceCatalog = Depends(get_catalog)
+):
+    """Cancel a booking"""
+    try:
+        # Find the booking
+        booking = await db.bookings.find_one({"id": booking_id})
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        # Verify the booking belongs to the current user
+        if booking["email"] != current_user["email"]:
+            raise HTTPException(status_code=403, detail="Not authorized to cancel this booking")
+
+        # Check if booking is already cancelled
+        if booking["status"] == BookingStatus.CANCELLED:
+            raise HTTPException(status_code=400, detail="Booking is already cancelled")
+
+        # Process refund if payment was completed
+        refund_status = None
+        refund_id = None
+
+        if booking.get("payment_status") == PaymentStatus.COMPLETED and booking.get("razorpay_payment_id"):
+            razorpay_client = integrations.razorpay_client
+            if razorpay_client:
+                try:
+                    payment_id = booking["razorpay_payment_id"]
+                    charge_currency, charge_amount = get_booking_charge(booking)
+
+                    # Create refund in Razorpay (in the currency the payment was made in)
+                    # Razorpay refund API: https://razorpay.com/docs/api/refunds/
+                    with track_outbound("razorpay"):
+                        refund = razorpay_client.payment.refund(payment_id, {
+                            "amount": charge_amount,  # Full refund
+                            "speed": "normal",  # normal (5-7 days) or optimum (instant if available)
+                            "notes": {
+                                "booking_id": booking_id,
+                                "reason": "Booking cancelled by customer"
+                            }
+                        })
+
+                    refund_id = refund.get("id")
+                    refund_status = refund.get("status")  # "processed" or "pending"
+
+                    # Update booking with refund information
+                    await db.bookings.update_one(
+                        {"id": booking_id},
+                        {
+                            "$set": {
+                                "refund_id": refund_id,
+                                "refund_status": refund_status,
+                                # Refunded in the charged currency, not necessarily INR
+                                "refund_amount": charge_amount,
+                                "refund_currency": charge_currency,
+                                "refund_initiated_at": datetime.now(timezone.utc),
+                                "refund_sync_attempts": 0,
+                                "refund_next_sync_at": get_refund_next_sync_at(0)
+                            }
+                        }
+                    )
+
+                    logger.info(
+                        f"✅ Refund initiated for booking {booking_id}: "
+                        f"{format_booking_charge(booking)} (Refund ID: {refund_id}, Status: {refund_status})"
+                    )
+
+                except Exception as refund_error:
+                    logger.error(f"❌ Refund failed for booking {booking_id}: {str(refund_error)}")
+                    # Continue with cancellation even if refund fails
+                    # Admin will need to process refund manually
+                    refund_status = "failed"
+            else:
+                logger.warning(f"Razorpay not enabled - manual refund required for booking {booking_id}")
+                refund_status = "manual_required"
+
+        # Release the time slot if it was booked
+        if booking.get("preferred_date") and booking.get("preferred_time"):
+            # Remove the slot from time_slots collection if it exists
+            await db.time_slots.delete_many({
+                "astrologer": booking["astrologer"],
+                "date": booking["preferred_date"],
+                "start_time": booking["preferred_time"],
+                "booking_id": booking_id
+            })
+            logger.info(f"Released time slot for {booking['astrologer']} on {booking['preferred_date']} at {booking['preferred_time']}")
+
+        # Update booking status
+        await db.bookings.update_one(
+            {"id": booking_id},
+            {
+                "$set": {
+                    "status": BookingStatus.CANCELLED,
+                    "updated_at": datetime.now(timezone.utc),
+                    "cancelled_by": current_user["email"],
+                    "cancelled_at": datetime.now(timezone.utc)
+                }
+            }
+        )
+
+        # Generate refund notice HTML
+        refund_notice_html = ""
+        if booking.get('payment_status') == PaymentStatus.COMPLETED:
+            if refund_status == "processed" or refund_status == "pending":
+                refund_notice_html = f'''
+                <div style="margin-top: 20px; padding: 15px; background-color: #d1fae5; border-left: 4px solid #10b981;">
+                    <strong>✅ Refund Initiated:</strong><br>
+                    A full refund of {format_booking_charge(booking)} has been initiated to your original payment method.<br>
+                    <strong>Refund ID:</strong> {refund_id}<br>
+                    <strong>Status:</strong> {refund_status.title()}<br>
+                    <em>The refund will be credited to your account within 5-7 business days.</em>
+                </div>
+                '''
+            elif refund_status == "failed":
+                refund_notice_html = '''
+                <div style="margin-top: 20px; padding: 15px; background-color: #fee2e2; border-left: 4px solid #ef4444;">
+                    <strong>⚠️ Refund Processing Issue:</strong><br>
+                    We encountered an issue processing your refund automatically. Our team has been notified and will process your refund manually within 24 hours.
+                </div>
+                '''
+            elif refund_status == "manual_required":
+                refund_notice_html = '''
+                <div style="margin-top: 20px; padding: 15px; background-color: #fef3c7; border-left: 4px solid #f59e0b;">
+                    <strong>💳 Refund Processing:</strong><br>
+                    Your refund will be processed manually by our team within 24 hours.
+                </div>
+                '''
+            else:
+                refund_notice_html = '''
+                <div style="margin-top: 20px; padding: 15px; background-color: #fef3c7; border-left: 4px solid #f59e0b;">
+                    <strong>Refund Information:</strong><br>
+                    A refund will be processed within 5-7 business days.
+                </div>
+                '''
+
+        # Send cancellation email to customer
+        customer_email_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #7c3aed;">Booking Cancelled</h2>
+                <p>Dear {booking['name']},</p>
+                <p>Your booking has been cancelled as requested.</p>
+
+                <h3 style="color: #7c3aed;">Cancelled Booking Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong></td><td>{booking['id']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Astrologer:</strong></td><td>{booking['astrologer']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Service:</strong></td><td>{catalog.get_service_name(booking['service'])}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Preferred Date:</strong></td><td>{booking.get('preferred_date', 'N/A')}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Preferred Time:</strong></td><td>{booking.get('preferred_time', 'N/A')}</td></tr>
+                </table>
+
+                {refund_notice_html}
+
+                <p style="margin-top: 20px;">If you have any questions, please contact us.</p>
+                <p style="margin-top: 30px;">Best regards,<br><strong>Acharyaa Indira Pandey Team</strong></p>
+            </div>
+        </body>
+        </html>
+        """
+
+        background_tasks.add_task(
+            traced_task(send_email),
+            booking['email'],
+            "Booking Cancelled",
+            customer_email_body
+        )
+
+        # Send notification to admin
+        admin_email = os.environ.get('SENDGRID_FROM_EMAIL', 'indirapandey2526@gmail.com')
+        admin_email_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #ef4444;">Booking Cancelled by Customer</h2>
+                <p>A booking has been cancelled:</p>
+
+                <h3 style="color: #7c3aed;">Customer Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Name:</strong></td><td>{booking['name']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Email:</strong></td><td>{booking['email']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Phone:</strong></td><td>{booking['phone']}</td></tr>
+                </table>
+
+                <h3 style="color: #7c3aed; margin-top: 20px;">Booking Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong></td><td>{booking['id']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Astrologer:</strong></td><td>{booking['astrologer']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Service:</strong></td><td>{catalog.get_service_name(booking['service'])}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Amount:</strong></td><td>{format_booking_charge(booking, with_inr=True)}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Payment Status:</strong></td><td>{booking.get('payment_status', 'N/A')}</td></tr>
+                </table>
+
+                {f'<p style="margin-top: 20px; padding: 15px; background-color: #fee2e2; border-left: 4px solid #ef4444;"><strong>Action Required:</strong> Process refund for {format_booking_charge(booking)} if payment was completed.</p>' if booking.get('payment_status') == PaymentStatus.COMPLETED else ''}
+            </div>
+        </body>
+        </html>
+        """
+
+        background_tasks.add_task(
+            traced_task(send_email),
+            admin_email,
+            f"Booking Cancelled - {booking['name']}",
+            admin_email_body
+        )
+
+        logger.info(f"Booking {booking_id} cancelled by user {current_user['email']}")
+        return {"message": "Booking cancelled successfully"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error cancelling booking: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/bookings/{booking_id}")
+async def update_booking(
+    booking_id: str,
+    booking_data: BookingCreate,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Update a booking (only if status is PENDING)"""
+    try:
+        # Find the booking
+        booking = await db.bookings.find_one({"id": booking_id})
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        # Verify the booking belongs to the current user
+        if booking["email"] != current_user["email"]:
+            raise HTTPException(status_code=403, detail="Not authorized to update this booking")
+
+        # Check if booking can be updated (only PENDING bookings)
+        if booking["status"] != BookingStatus.PENDING:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Cannot update booking with status: {booking['status']}"
+            )
+
+        # Check if date/time is being changed
+        old_date = booking.get("preferred_date")
+        old_time = booking.get("preferred_time")
+        new_date = booking_data.preferred_date
+        new_time = booking_data.preferred_time
+
+        # If date or time changed, release old slot and check new slot availability
+        if (old_date != new_date or old_time != new_time):
+            # Release old slot if it exists
+            if old_date and old_time:
+                await db.time_slots.delete_many({
+                    "astrologer": booking["astrologer"],
+                    "date": old_date,
+                    "start_time": old_time,
+                    "booking_id": booking_id
+                })
+                logger.info(f"Released old time slot: {old_date} at {old_time}")
+
+            # Check if new slot is available
+            if new_date and new_time:
+                # Check if slot is already booked by another booking
+                existing_booking = await db.bookings.find_one({
+                    "astrologer": booking_data.astrologer,
+                    "preferred_date": new_date,
+                    "preferred_time": new_time,
+                    "status": {"$in": [BookingStatus.PENDING.value, BookingStatus.CONFIRMED.value]},
+                    "id": {"$ne": booking_id}  # Exclude current booking
+                })
+
+                if existing_booking:
+                    raise HTTPException(
+                        status_code=400,
+                        detail="This time slot is no longer available. Please choose another slot."
+                    )
+
+                # Reserve the new slot
+                slot_doc = {
+                    "id": str(uuid.uuid4()),
+                    "astrologer": booking_data.astrologer,
+                    "date": new_date,
+                    "start_time": new_time,
+                    "end_time": new_time,  # Will be calculated based on duration
+                    "is_available": False,
+                    "booking_id": booking_id,
+                    "created_at": datetime.now(timezone.utc),
+                    "updated_at": datetime.now(timezone.utc)
+                }
+                await db.time_slots.insert_one(slot_doc)
+                logger.info(f"Reserved new time slot: {new_date} at {new_time}")
+
+        # Update booking
+        update_data = booking_data.model_dump()
+        update_data["slot_start_at"] = compute_slot_start_at(new_date, new_time)
+        update_data["updated_at"] = datetime.now(timezone.utc)
+
+        await db.bookings.update_one(
+            {"id": booking_id},
+            {"$set": update_data}
+        )
+
+        logger.info(f"Booking {booking_id} updated by user {current_user['email']}")
+        return {"message": "Booking updated successfully"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating booking: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.put("/bookings/{booking_id}/status")
+async def update_booking_status(booking_id: str, status: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Update booking status with automatic payment_status synchronization.
+
+    Rules:
+    - If status is CONFIRMED, payment_status must be COMPLETED
+    - If status is PENDING and payment_status is COMPLETED, reject the update
+    - If status is CANCELLED or COMPLETED, keep payment_status as is
+    """
+    try:
+        # Normalize status to lowercase
+        status = status.lower()
+
+        # Validate status
+        valid_statuses = ['pending', 'confirmed', 'completed', 'cancelled']
+        if status not in valid_statuses:
+            raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
+
+        # Get current booking to check payment status
+        booking = await db.bookings.find_one({"id": booking_id})
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        current_payment_status = booking.get('payment_status', '').lower()
+
+        # Enforce consistency rules
+        update_fields = {
+            "status": status,
+            "updated_at": datetime.now(timezone.utc)
+        }
+
+        # Rule 1: If setting status to CONFIRMED, payment must be COMPLETED
+        if status == 'confirmed':
+            if current_payment_status != 'completed':
+                raise HTTPException(
+                    status_code=400,
+                    detail="Cannot set status to CONFIRMED when payment is not COMPLETED. Please complete payment first."
+                )
+
+        # Rule 2: If setting status to PENDING but payment is COMPLETED, this is inconsistent
+        if status == 'pending' and current_payment_status == 'completed':
+            raise HTTPException(
+                status_code=400,
+                detail="Cannot set status to PENDING when payment is already COMPLETED. This would create an inconsistent state."
+            )
+
+        # Update the booking
+        result = await db.bookings.update_one(
+            {"id": booking_id},
+            {"$set": update_fields}
+        )
+
+        if result.modified_count == 0:
+            raise HTTPException(status_code=404, detail="Booking not found or no changes made")
+
+        logger.info(f"Booking {booking_id} status updated to {status} (payment_status: {current_payment_status})")
+        return {"message": "Status updated successfully", "status": status, "payment_status": current_payment_status}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error updating booking status: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,415 @@
+"""
+Public site content: status, country detection, pricing, testimonials, blog and gemstones
+"""
+
+from fastapi import APIRouter, HTTPException, Request, Response, BackgroundTasks, Depends
+from fastapi.responses import ORJSONResponse
+from motor.motor_asyncio import AsyncIOMotorDatabase
+import os
+import logging
+from datetime import datetime, timezone
+
+from models import TestimonialCreate, Testimonial
+from database import get_db, read_db
+from emails import send_email
+from integrations import Integrations, get_integrations
+from service_catalog import ServiceCatalog, get_catalog
+from currency import get_charge_currency, get_fx_snapshot
+from metrics import track_outbound
+from tracing import traced_task
+from http_cache import (
+    get_content_version, bump_content_version, build_etag, build_content_etag, etag_matches,
+    set_cache_headers, not_modified_response
+)
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["catalog"])
+
+
+# Root endpoint
+@router.get("/")
+async def root(integrations: Integrations = Depends(get_integrations)):
+    return {
+        "message": "Astrology Booking API",
+        "status": "online",
+        "razorpay_enabled": integrations.razorpay_enabled
+    }
+
+
+# Get country from IP address
+@router.get("/detect-country")
+async def detect_country(
+    request: Request,
+    test_country: str = None,
+    integrations: Integrations = Depends(get_integrations)
+):
+    """
+    Detect user's country based on their IP address.
+    Uses ipapi.co free API for geolocation.
+
+    Args:
+        test_country: Optional parameter to simulate a country for testing (e.g., ?test_country=UAE)
+
+    Returns country name or "India" as default.
+    """
+    try:
+        # For testing: allow manual country override
+        if test_country:
+            logger.info(f"🧪 Testing mode: Using test country: {test_country}")
+            return {
+                "country": test_country,
+                "ip": "test",
+                "source": "test_mode"
+            }
+
+        # Get client IP address
+        # Check X-Forwarded-For header first (for proxies/load balancers)
+        client_ip = request.headers.get("X-Forwarded-For")
+        if client_ip:
+            # X-Forwarded-For can contain multiple IPs, take the first one
+            client_ip = client_ip.split(",")[0].strip()
+        else:
+            # Fallback to direct client IP
+            client_ip = request.client.host
+
+        logger.info(f"Detecting country for IP: {client_ip}")
+
+        # Skip geolocation for localhost/private IPs
+        if client_ip in ["127.0.0.1", "localhost", "::1"] or client_ip.startswith("192.168.") or client_ip.startswith("10."):
+            logger.info("Localhost detected, defaulting to India")
+            return {"country": "India", "ip": client_ip, "source": "localhost"}
+
+        # Use ipapi.co free API (no API key required, 1000 requests/day)
+        with track_outbound("ipapi"):
+            response = await integrations.http_client.get(
+                f"{integrations.ipapi_base_url}/{client_ip}/json/", timeout=5.0
+            )
+
+        if response.status_code == 200:
+            data = response.json()
+            country = data.get("country_name", "India")
+            logger.info(f"Detected country: {country} for IP: {client_ip}")
+            return {
+                "country": country,
+                "ip": client_ip,
+                "country_code": data.get("country_code"),
+                "city": data.get("city"),
+                "source": "ipapi"
+            }
+        else:
+            logger.warning(f"IP geolocation API returned status {response.status_code}")
+            return {"country": "India", "ip": client_ip, "source": "fallback"}
+
+    except Exception as e:
+        logger.error(f"Error detecting country: {str(e)}")
+        # Default to India on any error
+        return {"country": "India", "ip": "unknown", "source": "error"}
+
+
+# Pricing
+@router.get("/pricing")
+async def get_pricing(
+    request: Request,
+    country: str = "India",
+    catalog: ServiceCatalog = Depends(get_catalog)
+):
+    """
+    Discounted, PPP-adjusted price of every service for a country (amounts in paise),
+    plus the amount charged in the country's currency when multi-currency is enabled.
+    Countries sharing a PPP multiplier and currency share one pre-serialized response.
+    """
+    price_book = catalog.pricing
+    charge_currency = get_charge_currency(country)
+    fx_snapshot = get_fx_snapshot() if charge_currency != "INR" else None
+    convert = fx_snapshot.convert_from_inr if fx_snapshot else None
+    ppp_multiplier, price_catalog = price_book.get_price_catalog(country, charge_currency, convert)
+    # Converted prices also change with the FX table
+    etag = build_etag(
+        "pricing", price_book.version, ppp_multiplier, charge_currency, fx_snapshot.version if fx_snapshot else None
+    )
+    if etag_matches(request, etag):
+        return not_modified_response(etag)
+
+    response = Response(content=price_catalog, media_type="application/json")
+    set_cache_headers(response, etag)
+    return response
+
+
+# Testimonials
+@router.get("/testimonials")
+async def get_testimonials(
+    request: Request,
+    limit: int = 50,
+    approved_only: bool = True,
+    db: AsyncIOMotorDatabase = Depends(read_db("testimonials")),
+    primary: AsyncIOMotorDatabase = Depends(get_db)
+):
+    try:
+        # Serve 304 only if the client has the current version: read it from the
+        # primary, since a lagging secondary would revalidate outdated copies
+        version = await get_content_version(primary, "testimonials")
+        etag = build_etag("testimonials", version, limit, approved_only)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+
+        # The list may come from a secondary that hasn't caught up yet: tag it with
+        # the version that secondary has, so a client never caches an old list under
+        # the new version and refetches on its next request
+        if db is not primary:
+            etag = build_etag("testimonials", await get_content_version(db, "testimonials"), limit, approved_only)
+
+        # Build query
+        query = {"approved": True} if approved_only else {}
+
+        # Optimized query with projection
+        projection = {
+            "_id": 0,
+            "id": 1,
+            "name": 1,
+            "rating": 1,
+            "text": 1,
+            "service": 1,
+            "location": 1,
+            "created_at": 1,
+            "approved": 1
+        }
+
+        # Fetch testimonials sorted by creation date (most recent first)
+        testimonials = await db.testimonials.find(query, projection).sort("created_at", -1).limit(limit).to_list(limit)
+
+        response = ORJSONResponse(testimonials)
+        set_cache_headers(response, etag)
+        return response
+    except Exception as e:
+        logger.error(f"Error fetching testimonials: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/testimonials")
+async def create_testimonial(
+    testimonial_data: TestimonialCreate,
+    background_tasks: BackgroundTasks,
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    try:
+        # Create testimonial object
+        testimonial = Testimonial(
+            **testimonial_data.model_dump(),
+            approved=False  # Requires admin approval
+        )
+
+        # Save to database
+        testimonial_doc = testimonial.model_dump()
+
+        await db.testimonials.insert_one(testimonial_doc)
+        await bump_content_version(db, "testimonials")
+
+        # Send notification email to admin
+        admin_email = os.environ.get('ADMIN_EMAIL', 'raushankumar.rk.rk@gmail.com')
+        admin_email_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #7c3aed;">New Testimonial Submitted</h2>
+                <p>A new testimonial has been submitted and is awaiting approval.</p>
+
+                <div style="background-color: #f3f4f6; padding: 15px; border-radius: 8px; margin: 20px 0;">
+                    <p><strong>Name:</strong> {testimonial.name}</p>
+                    <p><strong>Email:</strong> {testimonial.email}</p>
+                    <p><strong>Rating:</strong> {'⭐' * testimonial.rating}</p>
+                    <p><strong>Service:</strong> {testimonial.service}</p>
+                    {f'<p><strong>Location:</strong> {testimonial.location}</p>' if testimonial.location else ''}
+                    <p><strong>Testimonial:</strong></p>
+                    <p style="font-style: italic;">"{testimonial.text}"</p>
+                </div>
+
+                <p style="margin-top: 30px;">Please review and approve this testimonial in the admin panel.</p>
+            </div>
+        </body>
+        </html>
+        """
+
+        # Send email in background
+        background_tasks.add_task(traced_task(send_email), admin_email, "New Testimonial Awaiting Approval", admin_email_body)
+
+        # Send confirmation email to user
+        user_email_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #7c3aed;">Thank You for Your Testimonial!</h2>
+                <p>Dear {testimonial.name},</p>
+                <p>Thank you for taking the time to share your experience with us. Your feedback is invaluable and helps us serve our clients better.</p>
+
+                <div style="background-color: #f3f4f6; padding: 15px; border-radius: 8px; margin: 20px 0;">
+                    <p><strong>Your Testimonial:</strong></p>
+                    <p style="font-style: italic;">"{testimonial.text}"</p>
+                    <p><strong>Rating:</strong> {'⭐' * testimonial.rating}</p>
+                </div>
+
+                <p>Your testimonial is currently under review and will be published on our website once approved.</p>
+
+                <p style="margin-top: 30px;">Best regards,<br><strong>Acharyaa Indira Pandey Team</strong></p>
+            </div>
+        </body>
+        </html>
+        """
+
+        background_tasks.add_task(traced_task(send_email), testimonial.email, "Thank You for Your Testimonial", user_email_body)
+
+        logger.info(f"New testimonial submitted by {testimonial.name} ({testimonial.email})")
+
+        return {
+            "message": "Testimonial submitted successfully. It will be published after review.",
+            "id": testimonial.id
+        }
+    except Exception as e:
+        logger.error(f"Error creating testimonial: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.patch("/testimonials/{testimonial_id}/approve")
+async def approve_testimonial(testimonial_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Approve a testimonial by ID (admin only)
+    """
+    try:
+        result = await db.testimonials.update_one(
+            {"id": testimonial_id},
+            {"$set": {"approved": True, "updated_at": datetime.now(timezone.utc)}}
+        )
+
+        if result.matched_count == 0:
+            raise HTTPException(status_code=404, detail="Testimonial not found")
+
+        await bump_content_version(db, "testimonials")
+        logger.info(f"Testimonial {testimonial_id} approved")
+        return {"message": "Testimonial approved successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error approving testimonial: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/testimonials/pending")
+async def get_pending_testimonials(db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Get all pending (unapproved) testimonials for admin review
+    """
+    try:
+        testimonials = await db.testimonials.find(
+            {"approved": False},
+            {"_id": 0}
+        ).sort("created_at", -1).to_list(100)
+
+        return ORJSONResponse(testimonials)
+    except Exception as e:
+        logger.error(f"Error fetching pending testimonials: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.delete("/testimonials/{testimonial_id}")
+async def delete_testimonial(testimonial_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
+    """
+    Delete a testimonial by ID (admin only)
+    """
+    try:
+        result = await db.testimonials.delete_one({"id": testimonial_id})
+
+        if result.deleted_count == 0:
+            raise HTTPException(status_code=404, detail="Testimonial not found")
+
+        await bump_content_version(db, "testimonials")
+        logger.info(f"Testimonial {testimonial_id} deleted")
+        return {"message": "Testimonial deleted successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error deleting testimonial: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Blog posts
+@router.get("/blog")
+async def get_blog_posts(
+    request: Request,
+    category: str = None,
+    db: AsyncIOMotorDatabase = Depends(read_db("blog"))
+):
+    try:
+        query = {"published": True}
+        if category and category != "All":
+            query["category"] = category
+        
+        # Optimized query - exclude content field for list view
+        projection = {
+            "_id": 0,
+            "id": 1,
+            "title": 1,
+            "excerpt": 1,
+            "image": 1,
+            "author": 1,
+            "date": 1,
+            "category": 1,
+            "read_time": 1,
+            "published": 1
+        }
+        
+        posts = await db.blog_posts.find(query, projection).sort("date", -1).to_list(50)
+        response = ORJSONResponse(posts)
+        etag = build_content_etag("blog_posts", response.body)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+        set_cache_headers(response, etag)
+        return response
+    except Exception as e:
+        logger.error(f"Error fetching blog posts: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/blog/{post_id}")
+async def get_blog_post(post_id: str, request: Request, db: AsyncIOMotorDatabase = Depends(read_db("blog"))):
+    try:
+        post = await db.blog_posts.find_one({"id": post_id, "published": True}, {"_id": 0})
+        if not post:
+            raise HTTPException(status_code=404, detail="Blog post not found")
+        response = ORJSONResponse(post)
+        etag = build_content_etag("blog_posts", response.body)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+        set_cache_headers(response, etag)
+        return response
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching blog post: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# Gemstones
+@router.get("/gemstones")
+async def get_gemstones(request: Request, db: AsyncIOMotorDatabase = Depends(read_db("gemstones"))):
+    try:
+        # Optimized query with projection
+        projection = {
+            "_id": 0,
+            "id": 1,
+            "name": 1,
+            "description": 1,
+            "price": 1,
+            "benefits": 1,
+            "image": 1,
+            "in_stock": 1,
+            "weight": 1,
+            "quality": 1
+        }
+        gemstones = await db.gemstones.find({"in_stock": True}, projection).sort("price", 1).to_list(50)
+        response = ORJSONResponse(gemstones)
+        etag = build_content_etag("gemstones", response.body)
+        if etag_matches(request, etag):
+            return not_modified_response(etag)
+        set_cache_headers(response, etag)
+        return response
+    except Exception as e:
+        logger.error(f"Error fetching gemstones: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
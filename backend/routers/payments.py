@@ -0,0 +1,922 @@
+"""
+Razorpay orders, payment confirmation, webhooks and refund sync
+"""
+
+from fastapi import APIRouter, HTTPException, Request, BackgroundTasks, Depends
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+import os
+import logging
+import asyncio
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+import hashlib
+
+from models import BookingStatus, PaymentStatus
+from database import get_db
+from security import get_current_user
+from emails import send_email
+from integrations import Integrations, get_integrations
+from timestamps import parse_timestamp
+from currency import BASE_CURRENCY, format_amount
+from service_catalog import CatalogStore, ServiceCatalog, get_catalog
+from metrics import track_outbound
+from tracing import current_traceparent, parse_traceparent, start_span, traced_task
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/api", tags=["payments"])
+
+
+# Razorpay order lifecycle
+# A booking keeps the order it was last given. The order is reused while the booking is
+# unpaid, the amount is unchanged and the order is younger than RAZORPAY_ORDER_REUSE_SECONDS,
+# so reopening the payment modal doesn't create a new order each time.
+RAZORPAY_ORDER_REUSE_SECONDS = int(os.environ.get('RAZORPAY_ORDER_REUSE_SECONDS', 12 * 3600))
+
+
+def get_booking_charge(booking: dict) -> tuple:
+    """(currency, amount in its smallest unit) charged for a booking; INR paise for older bookings"""
+    return booking.get("charge_currency") or "INR", booking.get("charge_amount") or booking.get("amount", 0)
+
+
+def format_booking_charge(booking: dict, with_inr: bool = False) -> str:
+    """Charged amount for emails; with_inr adds the INR price (for admins) when charged in another currency"""
+    charge_currency, charge_amount = get_booking_charge(booking)
+    charged = format_amount(charge_amount, charge_currency)
+    if with_inr and charge_currency != BASE_CURRENCY:
+        return f"{charged} ({format_amount(booking.get('amount', 0), BASE_CURRENCY)})"
+    return charged
+
+
+async def get_or_create_razorpay_order(db: AsyncIOMotorDatabase, razorpay_client, booking: dict) -> str:
+    """Return a usable Razorpay order id for an unpaid booking, creating one if needed"""
+    currency, amount = get_booking_charge(booking)
+    order_created_at = parse_timestamp(booking.get("razorpay_order_created_at"))
+
+    if (
+        booking.get("razorpay_order_id")
+        and booking.get("razorpay_order_amount") == amount
+        and (booking.get("razorpay_order_currency") or "INR") == currency
+        and order_created_at is not None
+        and datetime.now(timezone.utc) - order_created_at < timedelta(seconds=RAZORPAY_ORDER_REUSE_SECONDS)
+    ):
+        logger.info(f"Reusing Razorpay order {booking['razorpay_order_id']} for booking {booking['id']}")
+        return booking["razorpay_order_id"]
+
+    order_data = {
+        "amount": amount,
+        "currency": currency,
+        "receipt": booking["id"],
+        "payment_capture": 1,
+        "notes": {"booking_id": booking["id"]}
+    }
+    # The SDK is blocking - keep it off the event loop
+    with track_outbound("razorpay"):
+        razorpay_order = await asyncio.to_thread(razorpay_client.order.create, data=order_data)
+    razorpay_order_id = razorpay_order['id']
+
+    await db.bookings.update_one(
+        {"id": booking["id"]},
+        {
+            "$set": {
+                "razorpay_order_id": razorpay_order_id,
+                "razorpay_order_amount": amount,
+                "razorpay_order_currency": currency,
+                "razorpay_order_created_at": datetime.now(timezone.utc),
+                "updated_at": datetime.now(timezone.utc)
+            },
+            # Every order the booking was given: a client may still pay on a superseded one
+            "$addToSet": {"razorpay_order_ids": razorpay_order_id}
+        }
+    )
+
+    logger.info(f"New payment order {razorpay_order_id} created for booking {booking['id']}")
+    return razorpay_order_id
+
+
+@router.post("/bookings/{booking_id}/payment-order")
+@router.post("/bookings/{booking_id}/retry-payment")
+async def get_payment_order(
+    booking_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    integrations: Integrations = Depends(get_integrations)
+):
+    """
+    Get the Razorpay order for a pending payment.
+    Called when the payment modal opens; reuses the booking's current order when still valid.
+    """
+    try:
+        booking = await db.bookings.find_one(
+            {"id": booking_id},
+            {"_id": 0, "id": 1, "email": 1, "amount": 1, "payment_status": 1,
+             "charge_currency": 1, "charge_amount": 1, "razorpay_order_id": 1,
+             "razorpay_order_amount": 1, "razorpay_order_currency": 1, "razorpay_order_created_at": 1}
+        )
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        # Verify the booking belongs to the current user
+        if booking["email"] != current_user["email"]:
+            raise HTTPException(status_code=403, detail="Not authorized to access this booking")
+
+        # Check if payment is pending
+        if booking.get("payment_status", "").lower() != PaymentStatus.PENDING.value:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Payment is not pending. Current status: {booking.get('payment_status')}"
+            )
+
+        amount = booking.get("amount", 0)
+        if amount <= 0:
+            raise HTTPException(status_code=400, detail="No payment required for this booking")
+
+        if integrations.razorpay_client is None:
+            logger.error("Razorpay is not enabled or client is None")
+            raise HTTPException(status_code=503, detail="Payment service is not available")
+
+        razorpay_order_id = await get_or_create_razorpay_order(db, integrations.razorpay_client, booking)
+        charge_currency, charge_amount = get_booking_charge(booking)
+
+        return {
+            "razorpay_order_id": razorpay_order_id,
+            "amount": charge_amount,
+            "currency": charge_currency,
+            "razorpay_key_id": integrations.razorpay_key_id
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating payment order: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Payment confirmation
+# A booking is confirmed either by the browser calling /verify-payment after checkout or by
+# Razorpay's payment.captured / order.paid webhooks, whichever arrives first. The conditional
+# update makes the transition happen once, so confirmation emails are sent exactly once.
+# The order may no longer be the booking's current one (expired, re-priced or raced
+# order creation), so any order the booking was ever given matches.
+def booking_order_query(order_id: str) -> dict:
+    """Filter for the booking a Razorpay order was created for"""
+    return {"$or": [{"razorpay_order_id": order_id}, {"razorpay_order_ids": order_id}]}
+
+
+async def confirm_booking_payment(
+    db: AsyncIOMotorDatabase,
+    order_id: str,
+    payment_id: str,
+    booking_id: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Mark the booking for a Razorpay order as paid and confirmed.
+    Returns the updated booking if this call made the transition, None if the booking
+    was already paid or no booking matches the order.
+    """
+    query = {
+        **booking_order_query(order_id),
+        "payment_status": {"$ne": PaymentStatus.COMPLETED.value}
+    }
+    if booking_id:
+        query["id"] = booking_id
+
+    update = {
+        "payment_status": PaymentStatus.COMPLETED.value,
+        "razorpay_payment_id": payment_id,
+        "status": BookingStatus.CONFIRMED.value,
+        "updated_at": datetime.now(timezone.utc)
+    }
+    # The pre-image plus the update equals the post-image; mongomock re-checks the
+    # filter against the updated document and returns None for ReturnDocument.AFTER
+    booking = await db.bookings.find_one_and_update(query, {"$set": update}, projection={"_id": 0})
+    if booking:
+        booking.update(update)
+    return booking
+
+
+async def send_payment_confirmation_emails(booking: dict, payment_id: str, catalog: ServiceCatalog):
+    """Send payment confirmation emails to the customer and admin"""
+    amount_paid = format_booking_charge(booking)
+    amount_paid_admin = format_booking_charge(booking, with_inr=True)
+
+    # Send payment confirmation email to customer
+    duration_display_payment = f"{booking['consultation_duration']} minutes"
+    customer_email_body = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+            <h2 style="color: #10b981;">✅ Payment Confirmed!</h2>
+            <p>Dear {booking['name']},</p>
+            <p>Your payment has been received successfully! Your consultation is now confirmed.</p>
+            <h3 style="color: #7c3aed;">Payment Details:</h3>
+            <table style="width: 100%; border-collapse: collapse;">
+                <tr><td style="padding: 8px 0;"><strong>Payment ID:</strong></td><td>{payment_id}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Amount Paid:</strong></td><td>{amount_paid}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Booking Status:</strong></td><td style="color: #10b981;">Confirmed</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Service:</strong></td><td>{catalog.get_service_name(booking['service'])}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Duration:</strong></td><td>{duration_display_payment}</td></tr>
+            </table>
+            <p style="margin-top: 20px;">We will contact you shortly to schedule your consultation.</p>
+            <p style="margin-top: 30px;">Best regards,<br><strong>Acharyaa Indira Pandey Team</strong></p>
+        </div>
+    </body>
+    </html>
+    """
+    await send_email(booking['email'], "✅ Payment Confirmed - Consultation Booked", customer_email_body)
+
+    # Send admin notification about payment success
+    admin_email = os.environ.get('SENDGRID_FROM_EMAIL', 'indirapandey2526@gmail.com')
+    admin_email_body = f"""
+    <html>
+    <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+        <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+            <h2 style="color: #10b981;">✅ Payment Received - Booking Confirmed</h2>
+            <div style="margin: 20px 0; padding: 15px; background-color: #d1fae5; border-left: 4px solid #10b981;">
+                <strong>✅ Payment Status: COMPLETED</strong><br>
+                Amount: {amount_paid_admin}<br>
+                Payment ID: {payment_id}
+            </div>
+            <h3 style="color: #7c3aed;">Customer Details:</h3>
+            <table style="width: 100%; border-collapse: collapse;">
+                <tr><td style="padding: 8px 0;"><strong>Name:</strong></td><td>{booking['name']}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Email:</strong></td><td>{booking['email']}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Phone:</strong></td><td>{booking['phone']}</td></tr>
+            </table>
+
+            <h3 style="color: #7c3aed; margin-top: 20px;">Birth Details:</h3>
+            <table style="width: 100%; border-collapse: collapse;">
+                <tr><td style="padding: 8px 0;"><strong>Date of Birth:</strong></td><td>{booking['date_of_birth'] or '<em style="color: #999;">To be collected during call</em>'}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Time of Birth:</strong></td><td>{booking['time_of_birth'] or '<em style="color: #999;">To be collected during call</em>'}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Place of Birth:</strong></td><td>{booking['place_of_birth'] or '<em style="color: #999;">To be collected during call</em>'}</td></tr>
+            </table>
+
+            <h3 style="color: #7c3aed; margin-top: 20px;">Consultation Details:</h3>
+            <table style="width: 100%; border-collapse: collapse;">
+                <tr><td style="padding: 8px 0;"><strong>Chosen Astrologer:</strong></td><td>{booking['astrologer']}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Service:</strong></td><td>{catalog.get_service_name(booking['service'])}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Duration:</strong></td><td>{duration_display_payment}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Preferred Date:</strong></td><td>{booking['preferred_date']}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Preferred Time:</strong></td><td>{booking['preferred_time']}</td></tr>
+                <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong></td><td>{booking['id']}</td></tr>
+            </table>
+            <p style="margin-top: 30px; padding: 15px; background-color: #d1fae5; border-left: 4px solid #10b981;">
+                <strong>✅ Action Required:</strong> Payment confirmed! Please contact the customer within 24 hours to schedule the appointment.
+            </p>
+        </div>
+    </body>
+    </html>
+    """
+    await send_email(admin_email, f"✅ Payment Confirmed - {booking['name']}", admin_email_body)
+
+    logger.info(f"✅ Payment confirmed for booking {booking['id']}, emails sent to customer and admin")
+
+
+# Payment verification
+@router.post("/verify-payment")
+async def verify_payment(
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    integrations: Integrations = Depends(get_integrations),
+    catalog: ServiceCatalog = Depends(get_catalog)
+):
+    """
+    Confirm a payment after Razorpay checkout.
+
+    Idempotent: if the booking is already paid (usually confirmed by the payment.captured
+    webhook) this is a status read. Otherwise the checkout signature is verified and the
+    booking is confirmed; emails are sent in the background.
+    """
+    try:
+        data = await request.json()
+        razorpay_payment_id = data.get('razorpay_payment_id')
+        razorpay_order_id = data.get('razorpay_order_id')
+        razorpay_signature = data.get('razorpay_signature')
+        booking_id = data.get('booking_id')
+
+        # Already confirmed (webhook or earlier call) - nothing to verify
+        booking = await db.bookings.find_one(
+            {"id": booking_id},
+            {"_id": 0, "payment_status": 1, "razorpay_order_id": 1}
+        )
+        if booking and booking.get("payment_status") == PaymentStatus.COMPLETED.value:
+            return {"status": "success", "message": "Payment verified successfully"}
+
+        if integrations.razorpay_client is None:
+            raise HTTPException(status_code=400, detail="Razorpay not configured")
+
+        # Verify signature
+        if not integrations.payment_signature_verifier.verify_payment(razorpay_order_id, razorpay_payment_id, razorpay_signature):
+            raise HTTPException(status_code=400, detail="Invalid payment signature")
+
+        # Update booking (no-op if the webhook confirmed it in the meantime)
+        confirmed_booking = await confirm_booking_payment(db, razorpay_order_id, razorpay_payment_id, booking_id)
+        if confirmed_booking:
+            background_tasks.add_task(traced_task(send_payment_confirmation_emails), confirmed_booking, razorpay_payment_id, catalog)
+        elif not await db.bookings.find_one(
+            {"id": booking_id, "payment_status": PaymentStatus.COMPLETED.value, **booking_order_query(razorpay_order_id)},
+            {"_id": 1}
+        ):
+            # Paid, but not for an order of this booking - needs manual reconciliation
+            logger.error(
+                f"❌ Payment {razorpay_payment_id} on order {razorpay_order_id} "
+                f"matches no order of booking {booking_id}"
+            )
+            raise HTTPException(status_code=400, detail="Payment does not match this booking")
+
+        return {"status": "success", "message": "Payment verified successfully"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Payment verification failed: {str(e)}")
+        raise HTTPException(status_code=400, detail="Payment verification failed")
+
+# Payment failure notification
+@router.post("/payment-failed")
+async def payment_failed(
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    catalog: ServiceCatalog = Depends(get_catalog)
+):
+    try:
+        data = await request.json()
+        booking_id = data.get('booking_id')
+        error_description = data.get('error_description', 'Payment was not completed')
+
+        # Get booking details
+        booking = await db.bookings.find_one({"id": booking_id})
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        # Update booking status to failed
+        await db.bookings.update_one(
+            {"id": booking_id},
+            {
+                "$set": {
+                    "payment_status": PaymentStatus.FAILED.value,
+                    "updated_at": datetime.now(timezone.utc)
+                }
+            }
+        )
+
+        amount_due = format_booking_charge(booking)
+        amount_due_admin = format_booking_charge(booking, with_inr=True)
+
+        # Send payment failure email to customer
+        duration_display_failed = f"{booking['consultation_duration']} minutes"
+        customer_email_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #ef4444;">❌ Payment Failed</h2>
+                <p>Dear {booking['name']},</p>
+                <p>Unfortunately, your payment could not be processed.</p>
+                <div style="margin: 20px 0; padding: 15px; background-color: #fee2e2; border-left: 4px solid #ef4444;">
+                    <strong>Reason:</strong> {error_description}
+                </div>
+                <h3 style="color: #7c3aed;">Booking Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong></td><td>{booking['id']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Service:</strong></td><td>{catalog.get_service_name(booking['service'])}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Amount:</strong></td><td>{amount_due}</td></tr>
+                </table>
+                <div style="margin-top: 30px; padding: 15px; background-color: #dbeafe; border-left: 4px solid #3b82f6;">
+                    <strong>What's Next?</strong><br>
+                    • You can try booking again from our website<br>
+                    • Or contact us directly at {os.environ.get('SENDGRID_FROM_EMAIL', 'indirapandey2526@gmail.com')}<br>
+                    • We're here to help!
+                </div>
+                <p style="margin-top: 30px;">Best regards,<br><strong>Acharyaa Indira Pandey Team</strong></p>
+            </div>
+        </body>
+        </html>
+        """
+        await send_email(booking['email'], "❌ Payment Failed - Booking Not Confirmed", customer_email_body)
+
+        # Send admin notification about payment failure
+        admin_email = os.environ.get('SENDGRID_FROM_EMAIL', 'indirapandey2526@gmail.com')
+        admin_email_body = f"""
+        <html>
+        <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+            <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                <h2 style="color: #ef4444;">❌ Payment Failed</h2>
+                <div style="margin: 20px 0; padding: 15px; background-color: #fee2e2; border-left: 4px solid #ef4444;">
+                    <strong>❌ Payment Status: FAILED</strong><br>
+                    Amount: {amount_due_admin}<br>
+                    Reason: {error_description}
+                </div>
+                <h3 style="color: #7c3aed;">Customer Details:</h3>
+                <table style="width: 100%; border-collapse: collapse;">
+                    <tr><td style="padding: 8px 0;"><strong>Name:</strong></td><td>{booking['name']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Email:</strong></td><td>{booking['email']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Phone:</strong></td><td>{booking['phone']}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Service:</strong></td><td>{catalog.get_service_name(booking['service'])}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Duration:</strong></td><td>{duration_display_failed}</td></tr>
+                    <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong></td><td>{booking['id']}</td></tr>
+                </table>
+                <p style="margin-top: 30px; padding: 15px; background-color: #fef3c7; border-left: 4px solid #f59e0b;">
+                    <strong>⚠️ Note:</strong> Customer's payment failed. You may want to follow up if they contact you directly.
+                </p>
+            </div>
+        </body>
+        </html>
+        """
+        await send_email(admin_email, f"❌ Payment Failed - {booking['name']}", admin_email_body)
+
+        logger.info(f"❌ Payment failed for booking {booking_id}, emails sent to customer and admin")
+
+        return {"status": "failed", "message": "Payment failure recorded and notifications sent"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error handling payment failure: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Razorpay webhook ingestion queue
+# The webhook handler only verifies the signature and inserts the raw event into
+# webhook_events; run_webhook_consumer applies events in the background, in
+# arrival order per payment id. The unique event_id index rejects retried
+# deliveries and the TTL index expires old events.
+# Razorpay retries failed deliveries for up to 24 hours, so the TTL must be longer than that.
+WEBHOOK_EVENT_TTL_DAYS = int(os.environ.get('WEBHOOK_EVENT_TTL_DAYS', 7))
+WEBHOOK_MAX_ATTEMPTS = 5
+WEBHOOK_RETRY_BASE_SECONDS = 30
+WEBHOOK_CLAIM_TIMEOUT_SECONDS = 300  # Reclaim events left "processing" by a crashed worker
+WEBHOOK_POLL_INTERVAL_SECONDS = 30
+WEBHOOK_BATCH_SIZE = 100
+
+# The webhook handler sets app.state.webhook_queue_wakeup to wake the consumer
+# as soon as an event is stored
+
+
+def get_webhook_ordering_key(payload_data: dict) -> Optional[str]:
+    """Payment id an event belongs to; events for the same payment are applied in order"""
+    refund_entity = payload_data.get('refund', {}).get('entity', {})
+    payment_entity = payload_data.get('payment', {}).get('entity', {})
+    return refund_entity.get('payment_id') or payment_entity.get('id')
+
+
+async def apply_razorpay_webhook_event(db: AsyncIOMotorDatabase, event: str, payload_data: dict, catalog: ServiceCatalog):
+    """Apply a verified Razorpay webhook event to bookings and send notifications"""
+    refund_entity = payload_data.get('refund', {}).get('entity', {})
+    payment_entity = payload_data.get('payment', {}).get('entity', {})
+
+    # Handle successful payments - confirms the booking even if the browser never calls /verify-payment
+    if event in ['payment.captured', 'order.paid']:
+        order_id = payment_entity.get('order_id')
+        payment_id = payment_entity.get('id')
+        if not order_id or not payment_id:
+            logger.warning(f"⚠️ {event} webhook without order/payment id, ignoring")
+            return
+
+        booking = await confirm_booking_payment(db, order_id, payment_id)
+        if booking:
+            logger.info(f"✅ Booking {booking['id']} confirmed from {event} webhook")
+            await send_payment_confirmation_emails(booking, payment_id, catalog)
+        elif not await db.bookings.find_one(booking_order_query(order_id), {"_id": 1}):
+            logger.error(f"❌ {event} webhook: payment {payment_id} on order {order_id} matches no booking")
+        return
+
+    # Handle refund events
+    if event in ['refund.processed', 'refund.failed', 'refund.speed_changed']:
+        refund_id = refund_entity.get('id')
+        refund_status = refund_entity.get('status')  # processed, failed, pending
+        payment_id = refund_entity.get('payment_id')
+        amount = refund_entity.get('amount')
+        # Refunds are made in the currency the payment was charged in
+        refund_amount = format_amount(amount or 0, refund_entity.get('currency') or BASE_CURRENCY)
+
+        # Find booking by refund_id or payment_id
+        booking = await db.bookings.find_one({
+            "$or": [
+                {"refund_id": refund_id},
+                {"razorpay_payment_id": payment_id}
+            ]
+        })
+
+        if booking:
+            # Update refund status in database
+            update_data = {
+                "refund_status": refund_status,
+                "refund_updated_at": datetime.now(timezone.utc)
+            }
+
+            if event == 'refund.processed':
+                update_data["refund_completed_at"] = datetime.now(timezone.utc)
+
+            await db.bookings.update_one(
+                {"id": booking['id']},
+                {"$set": update_data}
+            )
+
+            logger.info(
+                f"✅ Updated refund status for booking {booking['id']}: "
+                f"{refund_status} (Refund ID: {refund_id})"
+            )
+
+            # Send email notification to customer if refund is processed
+            if event == 'refund.processed':
+                refund_email_body = f"""
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                        <h2 style="color: #10b981;">✅ Refund Processed Successfully</h2>
+                        <p>Dear {booking.get('name')},</p>
+                        <p>Your refund has been successfully processed!</p>
+
+                        <div style="margin: 20px 0; padding: 15px; background-color: #d1fae5; border-left: 4px solid #10b981;">
+                            <strong>Refund Details:</strong><br>
+                            <strong>Amount:</strong> {refund_amount}<br>
+                            <strong>Refund ID:</strong> {refund_id}<br>
+                            <strong>Booking ID:</strong> {booking['id']}<br>
+                            <strong>Status:</strong> Processed
+                        </div>
+
+                        <p>The refund amount will be credited to your original payment method within 5-7 business days.</p>
+                        <p style="margin-top: 30px;">Best regards,<br><strong>Acharyaa Indira Pandey Team</strong></p>
+                    </div>
+                </body>
+                </html>
+                """
+                await send_email(
+                    booking.get('email'),
+                    "✅ Refund Processed Successfully",
+                    refund_email_body
+                )
+
+            elif event == 'refund.failed':
+                # Notify admin about failed refund
+                admin_email = os.environ.get('SENDGRID_FROM_EMAIL', 'indirapandey2526@gmail.com')
+                admin_email_body = f"""
+                <html>
+                <body style="font-family: Arial, sans-serif; line-height: 1.6;">
+                    <div style="max-width: 600px; margin: 0 auto; padding: 20px;">
+                        <h2 style="color: #ef4444;">❌ Refund Failed - Action Required</h2>
+                        <p>A refund has failed and requires manual processing:</p>
+
+                        <table style="width: 100%; border-collapse: collapse;">
+                            <tr><td style="padding: 8px 0;"><strong>Booking ID:</strong></td><td>{booking['id']}</td></tr>
+                            <tr><td style="padding: 8px 0;"><strong>Customer:</strong></td><td>{booking.get('name')}</td></tr>
+                            <tr><td style="padding: 8px 0;"><strong>Email:</strong></td><td>{booking.get('email')}</td></tr>
+                            <tr><td style="padding: 8px 0;"><strong>Amount:</strong></td><td>{refund_amount}</td></tr>
+                            <tr><td style="padding: 8px 0;"><strong>Refund ID:</strong></td><td>{refund_id}</td></tr>
+                            <tr><td style="padding: 8px 0;"><strong>Payment ID:</strong></td><td>{payment_id}</td></tr>
+                        </table>
+
+                        <p style="margin-top: 20px; padding: 15px; background-color: #fee2e2; border-left: 4px solid #ef4444;">
+                            <strong>Action Required:</strong> Please process this refund manually through Razorpay dashboard or contact Razorpay support.
+                        </p>
+                    </div>
+                </body>
+                </html>
+                """
+                await send_email(admin_email, "❌ Refund Failed - Manual Action Required", admin_email_body)
+        else:
+            logger.warning(f"Booking not found for refund_id: {refund_id}, payment_id: {payment_id}")
+
+
+async def process_webhook_event(db: AsyncIOMotorDatabase, event_doc: dict, catalog: ServiceCatalog) -> bool:
+    """
+    Claim and apply one queued webhook event.
+    Returns True if the event was applied, False if it failed or another worker claimed it.
+    """
+    now = datetime.now(timezone.utc)
+    claimed = await db.webhook_events.find_one_and_update(
+        {
+            "_id": event_doc["_id"],
+            "$or": [
+                {"status": {"$in": ["pending", "failed"]}},
+                {"status": "processing", "claimed_at": {"$lt": now - timedelta(seconds=WEBHOOK_CLAIM_TIMEOUT_SECONDS)}}
+            ]
+        },
+        {"$set": {"status": "processing", "claimed_at": now}}
+    )
+    if not claimed:
+        return False
+
+    try:
+        import json
+        data = json.loads(claimed["payload"])
+        # Continue the trace of the webhook request that queued the event
+        with start_span(
+            f"webhook {claimed['event']}",
+            attributes={"webhook.event_id": claimed["event_id"], "webhook.attempt": claimed.get("attempts", 0) + 1},
+            parent=parse_traceparent(claimed.get("traceparent"))
+        ):
+            await apply_razorpay_webhook_event(db, claimed["event"], data.get("payload", {}), catalog)
+
+        await db.webhook_events.update_one(
+            {"_id": claimed["_id"]},
+            {"$set": {"status": "processed", "processed_at": datetime.now(timezone.utc)}}
+        )
+        return True
+    except Exception as e:
+        attempts = claimed.get("attempts", 0) + 1
+        status = "failed" if attempts < WEBHOOK_MAX_ATTEMPTS else "dead"
+        retry_delay = WEBHOOK_RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+        logger.error(
+            f"Error processing Razorpay webhook {claimed['event_id']} ({claimed['event']}), "
+            f"attempt {attempts}/{WEBHOOK_MAX_ATTEMPTS}: {str(e)}"
+        )
+        await db.webhook_events.update_one(
+            {"_id": claimed["_id"]},
+            {
+                "$set": {
+                    "status": status,
+                    "attempts": attempts,
+                    "error": str(e),
+                    "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=retry_delay)
+                }
+            }
+        )
+        return False
+
+
+async def drain_webhook_queue(db: AsyncIOMotorDatabase, catalog: ServiceCatalog) -> int:
+    """
+    Apply all due webhook events. Events are grouped by payment id: groups run
+    concurrently, events within a group run sequentially in arrival order, and a
+    group stops at its first failure so later events wait for the retry. A payment
+    with an event claimed by another worker is skipped until that event is done.
+    Returns the number of events applied.
+    """
+    now = datetime.now(timezone.utc)
+    claim_expiry = now - timedelta(seconds=WEBHOOK_CLAIM_TIMEOUT_SECONDS)
+    due_events = await db.webhook_events.find(
+        {
+            "$or": [
+                {"status": "pending"},
+                {"status": "failed", "next_attempt_at": {"$lte": now}},
+                {"status": "processing", "claimed_at": {"$lt": claim_expiry}}
+            ]
+        }
+    ).sort("received_at", 1).limit(WEBHOOK_BATCH_SIZE).to_list(WEBHOOK_BATCH_SIZE)
+
+    if not due_events:
+        return 0
+
+    # Payments with an earlier event still waiting for a retry, or being applied by
+    # another worker, must not skip ahead of it
+    waiting = await db.webhook_events.find(
+        {
+            "$or": [
+                {"status": "failed", "next_attempt_at": {"$gt": now}},
+                {"status": "processing", "claimed_at": {"$gte": claim_expiry}}
+            ]
+        },
+        {"ordering_key": 1}
+    ).to_list(None)
+    blocked_keys = {event.get("ordering_key") for event in waiting if event.get("ordering_key")}
+
+    groups = {}
+    for event_doc in due_events:
+        key = event_doc.get("ordering_key") or event_doc["event_id"]
+        if key in blocked_keys:
+            continue
+        groups.setdefault(key, []).append(event_doc)
+
+    async def process_group(group):
+        applied = 0
+        for event_doc in group:
+            if not await process_webhook_event(db, event_doc, catalog):
+                break
+            applied += 1
+        return applied
+
+    results = await asyncio.gather(*(process_group(group) for group in groups.values()))
+    return sum(results)
+
+
+async def run_webhook_consumer(db: AsyncIOMotorDatabase, wakeup: asyncio.Event, catalog_store: CatalogStore):
+    """Background loop applying queued webhook events (woken by new events, polls for retries)"""
+    while True:
+        try:
+            # asyncio.wait rather than wait_for: on Python < 3.12, wait_for drops a
+            # cancellation that arrives as the event is set, and shutdown hangs
+            waiter = asyncio.ensure_future(wakeup.wait())
+            try:
+                await asyncio.wait({waiter}, timeout=WEBHOOK_POLL_INTERVAL_SECONDS)
+            finally:
+                waiter.cancel()
+            wakeup.clear()
+
+            # Keep draining while full batches come back
+            while await drain_webhook_queue(db, catalog_store.catalog) >= WEBHOOK_BATCH_SIZE:
+                pass
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in webhook consumer: {str(e)}")
+            await asyncio.sleep(WEBHOOK_POLL_INTERVAL_SECONDS)
+
+
+# Razorpay Webhook for Refund Status Updates
+@router.post("/razorpay-webhook")
+async def razorpay_webhook(
+    request: Request,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+    integrations: Integrations = Depends(get_integrations)
+):
+    """
+    Webhook endpoint to receive refund status updates from Razorpay.
+
+    Razorpay sends webhooks for events like:
+    - refund.processed: Refund successfully processed
+    - refund.failed: Refund failed
+    - refund.speed_changed: Refund speed changed
+
+    After signature verification the raw event is stored in webhook_events and
+    acknowledged; run_webhook_consumer applies it in the background. Retried
+    deliveries are rejected by the unique event_id index.
+
+    Setup: Add this URL in Razorpay Dashboard > Settings > Webhooks
+    URL: https://your-domain.com/api/razorpay-webhook
+    """
+    try:
+        # Get webhook payload
+        payload = await request.body()
+        webhook_signature = request.headers.get('X-Razorpay-Signature', '')
+
+        if integrations.razorpay_client is None:
+            logger.warning("Razorpay webhook received but Razorpay not configured")
+            return {"status": "ignored"}
+
+        # Verify webhook signature - unsigned events could otherwise confirm unpaid bookings
+        webhook_signature_verifier = integrations.webhook_signature_verifier
+        if not webhook_signature_verifier.enabled:
+            logger.error("❌ Razorpay webhook rejected: RAZORPAY_WEBHOOK_SECRET is not configured")
+            raise HTTPException(status_code=503, detail="Webhook signature verification is not configured")
+        if not webhook_signature_verifier.verify(payload, webhook_signature):
+            logger.error("Webhook signature verification failed")
+            raise HTTPException(status_code=400, detail="Invalid webhook signature")
+
+        # Parse webhook data
+        import json
+        data = json.loads(payload)
+        event = data.get('event')
+
+        # Retried deliveries carry the same event id; fall back to a hash of the body
+        event_id = request.headers.get('X-Razorpay-Event-Id') or hashlib.sha256(payload).hexdigest()
+
+        try:
+            await db.webhook_events.insert_one({
+                "event_id": event_id,
+                "event": event,
+                "ordering_key": get_webhook_ordering_key(data.get('payload', {})),
+                "payload": payload.decode('utf-8'),
+                "status": "pending",
+                "attempts": 0,
+                "received_at": datetime.now(timezone.utc),
+                "traceparent": current_traceparent()
+            })
+        except DuplicateKeyError:
+            logger.info(f"Duplicate Razorpay webhook ignored: {event} ({event_id})")
+            return {"status": "duplicate"}
+
+        logger.info(f"Queued Razorpay webhook: {event} ({event_id})")
+        request.app.state.webhook_queue_wakeup.set()
+
+        return {"status": "success"}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error processing Razorpay webhook: {str(e)}")
+        # Return 200 to prevent Razorpay from retrying
+        return {"status": "error", "message": str(e)}
+
+
+# Refund status sync
+# Refund webhooks normally keep refund_status current. As a fallback, sync_pending_refunds
+# polls Razorpay for refunds that are still in a non-terminal state, backing off per refund
+# (REFUND_SYNC_BASE_SECONDS doubling up to REFUND_SYNC_MAX_SECONDS), and writes the results
+# back in one bulk write. The refund-status endpoint only reads from the database.
+REFUND_PENDING_STATUSES = ["pending", "created"]
+REFUND_SYNC_INTERVAL_SECONDS = int(os.environ.get('REFUND_SYNC_INTERVAL_SECONDS', 300))
+REFUND_SYNC_BASE_SECONDS = 300
+REFUND_SYNC_MAX_SECONDS = 6 * 3600
+REFUND_SYNC_BATCH_SIZE = 100
+
+
+def get_refund_next_sync_at(attempts: int) -> datetime:
+    """When a pending refund should next be checked, after `attempts` unchanged checks"""
+    delay = min(REFUND_SYNC_BASE_SECONDS * (2 ** attempts), REFUND_SYNC_MAX_SECONDS)
+    return datetime.now(timezone.utc) + timedelta(seconds=delay)
+
+
+async def sync_pending_refunds(db: AsyncIOMotorDatabase, razorpay_client) -> int:
+    """
+    Refresh refund_status from Razorpay for refunds that are due for a check.
+    Returns the number of bookings whose refund status changed.
+    """
+    if razorpay_client is None:
+        return 0
+
+    now = datetime.now(timezone.utc)
+    due_bookings = await db.bookings.find(
+        {
+            "refund_status": {"$in": REFUND_PENDING_STATUSES},
+            "refund_id": {"$ne": None},
+            "$or": [
+                {"refund_next_sync_at": {"$lte": now}},
+                {"refund_next_sync_at": {"$exists": False}}
+            ]
+        },
+        {"_id": 0, "id": 1, "refund_id": 1, "refund_status": 1,
+         "razorpay_payment_id": 1, "refund_sync_attempts": 1}
+    ).sort("refund_next_sync_at", 1).limit(REFUND_SYNC_BATCH_SIZE).to_list(REFUND_SYNC_BATCH_SIZE)
+
+    operations = []
+    changed = 0
+    for booking in due_bookings:
+        attempts = booking.get("refund_sync_attempts", 0) + 1
+        try:
+            # The SDK is blocking - keep it off the event loop
+            with track_outbound("razorpay"):
+                refund = await asyncio.to_thread(
+                    razorpay_client.payment.fetch_refund_id,
+                    booking.get("razorpay_payment_id"),
+                    booking["refund_id"]
+                )
+            latest_status = refund.get("status")
+        except Exception as e:
+            logger.error(f"Error syncing refund {booking['refund_id']} from Razorpay: {str(e)}")
+            latest_status = booking.get("refund_status")
+
+        update_data = {"refund_sync_attempts": attempts}
+        if latest_status != booking.get("refund_status"):
+            changed += 1
+            update_data["refund_status"] = latest_status
+            update_data["refund_updated_at"] = datetime.now(timezone.utc)
+            if latest_status == "processed":
+                update_data["refund_completed_at"] = datetime.now(timezone.utc)
+            logger.info(f"Updated refund status for booking {booking['id']}: {latest_status}")
+
+        if latest_status in REFUND_PENDING_STATUSES:
+            update_data["refund_next_sync_at"] = get_refund_next_sync_at(attempts)
+
+        # Only apply if a webhook hasn't moved the refund on in the meantime
+        operations.append(UpdateOne(
+            {"id": booking["id"], "refund_status": booking.get("refund_status")},
+            {"$set": update_data}
+        ))
+
+    if operations:
+        await db.bookings.bulk_write(operations, ordered=False)
+
+    return changed
+
+
+# Get refund status for a booking
+@router.get("/bookings/{booking_id}/refund-status")
+async def get_refund_status(
+    booking_id: str,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """
+    Get the current refund status for a booking.
+    Served from the database; webhooks and sync_pending_refunds keep it current.
+    """
+    try:
+        booking = await db.bookings.find_one(
+            {"id": booking_id},
+            {"_id": 0, "email": 1, "refund_id": 1, "refund_status": 1, "refund_amount": 1, "refund_currency": 1,
+             "refund_initiated_at": 1, "refund_completed_at": 1, "refund_updated_at": 1}
+        )
+        if not booking:
+            raise HTTPException(status_code=404, detail="Booking not found")
+
+        # Verify the booking belongs to the current user
+        if booking["email"] != current_user["email"]:
+            raise HTTPException(status_code=403, detail="Not authorized")
+
+        return {
+            "booking_id": booking_id,
+            "has_refund": booking.get("refund_id") is not None,
+            "refund_id": booking.get("refund_id"),
+            "refund_status": booking.get("refund_status"),
+            "refund_amount": booking.get("refund_amount"),
+            "refund_currency": booking.get("refund_currency") or BASE_CURRENCY,
+            "refund_initiated_at": booking.get("refund_initiated_at"),
+            "refund_completed_at": booking.get("refund_completed_at"),
+            "refund_updated_at": booking.get("refund_updated_at")
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting refund status: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# Get Razorpay key for frontend
+@router.get("/razorpay-key")
+async def get_razorpay_key(integrations: Integrations = Depends(get_integrations)):
+    if not integrations.razorpay_enabled:
+        raise HTTPException(status_code=400, detail="Razorpay not configured")
+    return {"key": integrations.razorpay_key_id}
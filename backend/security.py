@@ -0,0 +1,79 @@
+"""
+Password hashing and JWT authentication
+"""
+
+import hmac
+import os
+from datetime import datetime, timedelta
+from typing import Optional
+
+import bcrypt
+import jwt
+from fastapi import Depends, Header, HTTPException
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from database import get_db
+
+# JWT Configuration
+JWT_SECRET = os.environ.get('JWT_SECRET', 'your-secret-key-change-in-production')
+JWT_ALGORITHM = 'HS256'
+JWT_EXPIRATION_HOURS = 24 * 7  # 7 days
+
+# Security
+security = HTTPBearer()
+
+# Shared key for admin writes, sent as X-Admin-Key; unset disables the protected endpoints
+ADMIN_API_KEY = os.environ.get('ADMIN_API_KEY', '')
+
+# Helper functions for authentication
+def hash_password(password: str) -> str:
+    """Hash a password using bcrypt"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    """Verify a password against a hash"""
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def create_access_token(user_id: str, email: str) -> str:
+    """Create a JWT access token"""
+    payload = {
+        'user_id': user_id,
+        'email': email,
+        'exp': datetime.utcnow() + timedelta(hours=JWT_EXPIRATION_HOURS)
+    }
+    return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+
+def decode_access_token(token: str) -> dict:
+    """Decode and verify a JWT token"""
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        return payload
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=401, detail="Token has expired")
+    except jwt.InvalidTokenError:
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
+    """Get the current authenticated user"""
+    token = credentials.credentials
+    payload = decode_access_token(token)
+    user = await db.users.find_one({"id": payload['user_id']})
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    return user
+
+
+def require_admin(x_admin_key: Optional[str] = Header(None)):
+    """Dependency for admin writes: requires the X-Admin-Key header to match ADMIN_API_KEY"""
+    if not ADMIN_API_KEY:
+        raise HTTPException(status_code=503, detail="Admin API is not configured")
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode('utf-8'), ADMIN_API_KEY.encode('utf-8')):
+        raise HTTPException(status_code=401, detail="Invalid admin key")
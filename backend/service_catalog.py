@@ -0,0 +1,142 @@
+"""
+Service catalog
+
+Service names, prices and slot durations live in the `services` collection.
+They are loaded into an immutable ServiceCatalog snapshot (with its compiled
+PriceBook) and swapped in with a single assignment, so readers never see a
+half-updated catalog and every lookup stays an O(1) dict access. Each app
+keeps its own snapshot in a CatalogStore on app.state.
+
+Edits go through the admin endpoint, which bumps the "services" counter in
+content_versions. Each app polls that counter (CatalogStore.run_reloader) and
+reloads when it changes, so edits reach every process without a redeploy.
+DEFAULT_SERVICES seeds an empty collection and is used until the first load.
+"""
+
+import asyncio
+import logging
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional
+
+from fastapi import Request
+
+from pricing import PriceBook
+
+logger = logging.getLogger(__name__)
+
+CATALOG_POLL_INTERVAL_SECONDS = 30
+
+DEFAULT_SERVICE_NAME = "General Consultation"
+DEFAULT_SLOT_DURATION = 30  # minutes
+
+# Seed data for the services collection
+DEFAULT_SERVICES = [
+    {"id": "1", "name": "Birth Chart (Kundli) Analysis", "actual_price": 4100, "discount_percent": 25,
+     "price_multiplier": 1.0, "duration_minutes": 30},
+    {"id": "2", "name": "Career & Business Guidance", "actual_price": 3500, "discount_percent": 25,
+     "price_multiplier": 1.0, "duration_minutes": 30},
+    {"id": "3", "name": "Marriage & Relationship Compatibility", "actual_price": 5100, "discount_percent": 25,
+     "price_multiplier": 1.5, "duration_minutes": 45},
+    {"id": "4", "name": "Health & Life Path Insights", "actual_price": 3500, "discount_percent": 25,
+     "price_multiplier": 1.0, "duration_minutes": 30},
+    # Vastu is 20-30 mins; slots use the maximum
+    {"id": "5", "name": "Vastu Consultation", "actual_price": 3000, "discount_percent": 25,
+     "price_multiplier": 1.0, "duration_minutes": 30},
+    {"id": "6", "name": "Palmistry", "actual_price": 2000, "discount_percent": 25,
+     "price_multiplier": 1.0, "duration_minutes": 15},
+    {"id": "7", "name": "Gemstone Remedies & Sales", "actual_price": 3500, "discount_percent": 25,
+     "price_multiplier": 1.0, "duration_minutes": 20},
+    {"id": "8", "name": "Auspicious Childbirth Timing (Muhurat)", "actual_price": 3500, "discount_percent": 25,
+     "price_multiplier": 1.0, "duration_minutes": 30},
+    {"id": "9", "name": "Naming Ceremony", "actual_price": 1100, "discount_percent": 25,
+     "price_multiplier": 1.0, "duration_minutes": 10},
+]
+
+# Fields stored per service (everything else in a document is ignored)
+SERVICE_FIELDS = ("id", "name", "actual_price", "discount_percent", "price_multiplier", "duration_minutes", "active")
+
+
+class ServiceCatalog:
+    """Immutable snapshot of the service catalog"""
+
+    def __init__(self, services: Iterable[Mapping], version: int = 0):
+        all_services = [
+            MappingProxyType({field: service[field] for field in SERVICE_FIELDS if field in service})
+            for service in sorted(services, key=lambda s: (len(s["id"]), s["id"]))
+        ]
+        self.version = version
+        # Only active services can be booked and priced
+        self.services = MappingProxyType({
+            service["id"]: service for service in all_services if service.get("active", True)
+        })
+        # Inactive services keep their name and duration for existing bookings
+        self.names = MappingProxyType({service["id"]: service["name"] for service in all_services})
+        self.durations = MappingProxyType({service["id"]: service["duration_minutes"] for service in all_services})
+        self.pricing = PriceBook(self.services)
+
+    def get_service_name(self, service_id_or_name: Optional[str]) -> str:
+        """Convert service ID to human-readable name, or return as-is if already a name"""
+        if not service_id_or_name:
+            return DEFAULT_SERVICE_NAME
+        return self.names.get(service_id_or_name, service_id_or_name)
+
+    def get_slot_duration(self, service_id: Optional[str]) -> int:
+        """Slot length in minutes for a service (default 30)"""
+        return self.durations.get(service_id, DEFAULT_SLOT_DURATION)
+
+
+class CatalogStore:
+    """
+    One app's current catalog snapshot (kept on app.state.catalog_store).
+    Handlers read it through the get_catalog dependency; background jobs are
+    handed the store and take a snapshot when they need one.
+    """
+
+    def __init__(self):
+        self.catalog = ServiceCatalog(DEFAULT_SERVICES)
+
+    async def load(self, db) -> ServiceCatalog:
+        """Load the services collection (seeding it if empty) and swap in a new snapshot"""
+        # Read the version first: an edit landing in between just triggers one more reload
+        version = await get_catalog_version(db)
+        services = await db.services.find({}, {"_id": 0}).to_list(None)
+
+        if not services:
+            await db.services.insert_many([dict(service) for service in DEFAULT_SERVICES])
+            services = DEFAULT_SERVICES
+            logger.info(f"✅ Seeded services collection with {len(DEFAULT_SERVICES)} services")
+
+        self.catalog = ServiceCatalog(services, version)
+        logger.info(f"Service catalog loaded: {len(self.catalog.services)} services (version {version})")
+        return self.catalog
+
+    async def reload_if_changed(self, db) -> bool:
+        """Reload the catalog if its content version moved; returns True if reloaded"""
+        if await get_catalog_version(db) == self.catalog.version:
+            return False
+        await self.load(db)
+        return True
+
+    async def run_reloader(self, db):
+        """Poll the services content version and hot-reload the catalog on change"""
+        while True:
+            await asyncio.sleep(CATALOG_POLL_INTERVAL_SECONDS)
+            try:
+                await self.reload_if_changed(db)
+            except Exception as e:
+                logger.error(f"Error reloading service catalog: {str(e)}")
+
+
+async def get_catalog_version(db) -> int:
+    doc = await db.content_versions.find_one({"_id": "services"}, {"version": 1})
+    return doc.get("version", 0) if doc else 0
+
+
+def get_catalog_store(request: Request) -> CatalogStore:
+    """FastAPI dependency returning the app's catalog store"""
+    return request.app.state.catalog_store
+
+
+def get_catalog(request: Request) -> ServiceCatalog:
+    """FastAPI dependency returning the app's current catalog snapshot (stable for the request)"""
+    return request.app.state.catalog_store.catalog
@@ -0,0 +1,73 @@
+"""
+Razorpay signature verification
+
+Checkout callbacks are signed with HMAC-SHA256(order_id|payment_id, key secret)
+and webhooks with HMAC-SHA256(raw body, webhook secret). The Razorpay SDK
+re-encodes the secret and rebuilds the HMAC for every call and only knows one
+secret; SignatureVerifier keys the HMACs once and accepts any of several
+active secrets, so a secret can be rotated without rejecting requests signed
+with the previous one.
+
+Secrets are read once when the verifiers are built:
+- RAZORPAY_KEY_SECRET (+ RAZORPAY_PREVIOUS_KEY_SECRETS) for payment signatures
+- RAZORPAY_WEBHOOK_SECRET for webhooks (comma-separated, current secret first)
+"""
+
+import hashlib
+import hmac
+import os
+from typing import Iterable, Optional, Union
+
+
+def parse_secrets(value: Optional[str]) -> list:
+    """Split a comma-separated secrets value, dropping blanks"""
+    if not value:
+        return []
+    return [secret.strip() for secret in value.split(',') if secret.strip()]
+
+
+class SignatureVerifier:
+    """HMAC-SHA256 hex signature verifier for one or more active secrets"""
+
+    def __init__(self, secrets: Iterable[str]):
+        # hmac objects keyed once; copy() reuses the derived inner/outer key state
+        self._keyed_hmacs = [
+            hmac.new(secret.encode('utf-8'), digestmod=hashlib.sha256)
+            for secret in secrets
+        ]
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._keyed_hmacs)
+
+    def verify(self, message: Union[str, bytes], signature: Optional[str]) -> bool:
+        """True if `signature` matches the message under any active secret"""
+        if not signature or not self._keyed_hmacs:
+            return False
+        if isinstance(message, str):
+            message = message.encode('utf-8')
+        signature_bytes = signature.encode('utf-8')
+
+        valid = False
+        for keyed_hmac in self._keyed_hmacs:
+            digest = keyed_hmac.copy()
+            digest.update(message)
+            # Check every secret so timing doesn't reveal which one matched
+            valid |= hmac.compare_digest(digest.hexdigest().encode('ascii'), signature_bytes)
+        return valid
+
+    def verify_payment(self, order_id: str, payment_id: str, signature: Optional[str]) -> bool:
+        """Verify a Checkout callback signature (order_id|payment_id)"""
+        return self.verify(f"{order_id}|{payment_id}", signature)
+
+
+def build_payment_verifier() -> SignatureVerifier:
+    """Verifier for Checkout payment signatures (Razorpay key secret)"""
+    secrets = parse_secrets(os.environ.get('RAZORPAY_KEY_SECRET'))
+    secrets += parse_secrets(os.environ.get('RAZORPAY_PREVIOUS_KEY_SECRETS'))
+    return SignatureVerifier(secrets)
+
+
+def build_webhook_verifier() -> SignatureVerifier:
+    """Verifier for webhook signatures (Razorpay webhook secret)"""
+    return SignatureVerifier(parse_secrets(os.environ.get('RAZORPAY_WEBHOOK_SECRET')))
@@ -0,0 +1,259 @@
+"""
+Slow query log
+
+SlowQueryListener (pymongo CommandListener, registered on the Motor client)
+flags read/query commands that take longer than SLOW_QUERY_THRESHOLD_MS. For
+each one, run_slow_query_recorder stores the query shape (field names and
+operators, values replaced by "?") and an explain summary - winning plan
+stages (COLLSCAN vs IXSCAN), indexes used, keys and documents examined - in
+the capped `slow_queries` collection, browsable at /api/admin/slow-queries.
+
+The listener runs on Motor's executor threads and only hands entries to the
+event loop; explains run in the background. `explain` with executionStats
+re-runs the query, so each query shape is explained at most once per
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS and later hits reuse that summary.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from pymongo import MongoClient, monitoring
+from pymongo.errors import CollectionInvalid
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))  # 0 disables the log
+SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS = 300
+SLOW_QUERY_QUEUE_SIZE = 100
+
+SLOW_QUERY_COLLECTION = "slow_queries"
+SLOW_QUERY_COLLECTION_BYTES = 16 * 1024 * 1024
+SLOW_QUERY_COLLECTION_MAX_DOCS = 10000
+
+# Commands that have a query plan `explain` can report on
+EXPLAINABLE_COMMANDS = {"find", "aggregate", "count", "distinct", "update", "delete", "findAndModify"}
+
+# Session/transport fields the driver adds; not part of the query and rejected inside explain
+DRIVER_FIELDS = {
+    "lsid", "$db", "$clusterTime", "$readPreference", "txnNumber", "autocommit", "startTransaction",
+    "readConcern", "writeConcern", "apiVersion", "apiStrict", "apiDeprecationErrors",
+}
+
+# Query parts whose values are structural (sort order, projected fields) and kept in the shape
+LITERAL_KEYS = {"sort", "$sort", "projection", "fields", "$project"}
+
+
+def _shape(value: Any, keep_literals: bool = False) -> Any:
+    if isinstance(value, dict):
+        return {
+            key: _shape(item, keep_literals or key in LITERAL_KEYS)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_shape(item, keep_literals) for item in value]
+    return value if keep_literals else "?"
+
+
+def query_shape(command_name: str, command: dict) -> dict:
+    """Filter/sort/pipeline of a command with every literal value replaced by "?" """
+    if command_name in ("update", "delete"):
+        statements = command.get("updates") or command.get("deletes") or [{}]
+        # Update documents are values too; only the filter decides the plan
+        return {"filter": _shape(statements[0].get("q", {}))}
+
+    shape = {}
+    for part in ("filter", "query", "key", "sort", "projection", "fields", "pipeline"):
+        if part in command:
+            shape[part] = command[part] if part == "key" else _shape(command[part], part in LITERAL_KEYS)
+    return shape
+
+
+def build_explain_command(command_name: str, command: dict) -> dict:
+    """The original command without driver fields (explain supports one update/delete statement)"""
+    explained = {key: value for key, value in command.items() if key not in DRIVER_FIELDS}
+    if command_name == "update":
+        explained["updates"] = explained["updates"][:1]
+    elif command_name == "delete":
+        explained["deletes"] = explained["deletes"][:1]
+    return explained
+
+
+def _find_key(document: Any, key: str) -> Optional[dict]:
+    """First value stored under `key` anywhere in an explain document"""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        children = document.values()
+    elif isinstance(document, list):
+        children = document
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, key)
+        if found is not None:
+            return found
+    return None
+
+
+def summarize_explain(explain: dict) -> dict:
+    """Winning plan stages, indexes used and examined counts from an executionStats explain"""
+    planner = _find_key(explain, "queryPlanner") or {}
+    winning_plan = planner.get("winningPlan", {})
+    # Slot-based engine (MongoDB 7+) nests the classic plan tree under queryPlan
+    winning_plan = winning_plan.get("queryPlan", winning_plan)
+
+    stages, indexes = [], []
+    pending = [winning_plan]
+    while pending:
+        stage = pending.pop()
+        if not isinstance(stage, dict):
+            continue
+        if "stage" in stage:
+            stages.append(stage["stage"])
+        if "indexName" in stage:
+            indexes.append(stage["indexName"])
+        if "inputStage" in stage:
+            pending.append(stage["inputStage"])
+        pending.extend(stage.get("inputStages", []))
+
+    stats = _find_key(explain, "executionStats") or {}
+    return {
+        "stages": stages,
+        "collscan": "COLLSCAN" in stages,
+        "indexes": indexes,
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "n_returned": stats.get("nReturned"),
+        "execution_time_ms": stats.get("executionTimeMillis"),
+    }
+
+
+class SlowQueryListener(monitoring.CommandListener):
+    """Hands commands slower than the threshold to run_slow_query_recorder"""
+
+    def __init__(self, threshold_ms: int):
+        self.threshold_ms = threshold_ms
+        # request_id -> (database, command name, command copy)
+        self._pending: Dict[int, tuple] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> asyncio.Queue:
+        """Start queueing slow commands for the recorder running on `loop`"""
+        self._queue = asyncio.Queue(maxsize=SLOW_QUERY_QUEUE_SIZE)
+        self._loop = loop
+        return self._queue
+
+    def started(self, event):
+        if not self.enabled or event.command_name not in EXPLAINABLE_COMMANDS:
+            return
+        if event.command.get(event.command_name) == SLOW_QUERY_COLLECTION:
+            return
+        self._pending[event.request_id] = (event.database_name, event.command_name, dict(event.command))
+
+    def succeeded(self, event):
+        pending = self._pending.pop(event.request_id, None)
+        if pending is None or self._loop is None:
+            return
+        duration_ms = event.duration_micros / 1000
+        if duration_ms >= self.threshold_ms:
+            database, command_name, command = pending
+            self._loop.call_soon_threadsafe(self._enqueue, (database, command_name, command, duration_ms))
+
+    def failed(self, event):
+        self._pending.pop(event.request_id, None)
+
+    def _enqueue(self, entry: tuple):
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            # Under a slow-query storm, drop entries rather than pile up explains
+            pass
+
+
+def get_slow_query_listener(client) -> SlowQueryListener:
+    """The listener registered on `client` by create_mongo_client, or a disabled one (e.g. mongomock)"""
+    # The pymongo client behind Motor; mongomock's stand-in has no listeners
+    delegate = getattr(client, "delegate", None)
+    if isinstance(delegate, MongoClient):
+        for listener in delegate.options.event_listeners:
+            if isinstance(listener, SlowQueryListener):
+                return listener
+    return SlowQueryListener(0)
+
+
+async def ensure_slow_query_collection(db):
+    """Create the capped slow_queries collection if it doesn't exist"""
+    if SLOW_QUERY_COLLECTION in await db.list_collection_names(filter={"name": SLOW_QUERY_COLLECTION}):
+        return
+    try:
+        await db.create_collection(
+            SLOW_QUERY_COLLECTION,
+            capped=True,
+            size=SLOW_QUERY_COLLECTION_BYTES,
+            max=SLOW_QUERY_COLLECTION_MAX_DOCS
+        )
+    except CollectionInvalid:
+        pass  # Created by another worker
+
+
+async def run_slow_query_recorder(db, listener: SlowQueryListener):
+    """Explain and store slow commands reported by the client's listener"""
+    queue = listener.bind(asyncio.get_running_loop())
+    # (database, collection, command, shape) -> (explained at, summary)
+    explained: Dict[tuple, tuple] = {}
+
+    while True:
+        database, command_name, command, duration_ms = await queue.get()
+        try:
+            collection = command.get(command_name)
+            shape = json.dumps(query_shape(command_name, command), default=str)
+            shape_key = (database, collection, command_name, shape)
+
+            cached = explained.get(shape_key)
+            explain_error = None
+            fresh = False
+            if cached and time.monotonic() - cached[0] < SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+                plan = cached[1]
+            else:
+                try:
+                    explain = await db.client[database].command({
+                        "explain": build_explain_command(command_name, command),
+                        "verbosity": "executionStats"
+                    })
+                    plan = summarize_explain(explain)
+                    explained[shape_key] = (time.monotonic(), plan)
+                    fresh = True
+                except Exception as e:
+                    plan, explain_error = None, str(e)
+
+            await db[SLOW_QUERY_COLLECTION].insert_one({
+                "id": str(uuid.uuid4()),
+                "recorded_at": datetime.now(timezone.utc),
+                "database": database,
+                "collection": collection,
+                "command": command_name,
+                "duration_ms": round(duration_ms, 1),
+                # Stored as JSON: shapes contain $-prefixed operator keys
+                "query_shape": shape,
+                "plan": plan,
+                "explain_error": explain_error,
+            })
+            # Warn once per explain interval, not on every slow run of the same shape
+            if fresh and plan["collscan"]:
+                logger.warning(
+                    f"🐢 Slow {command_name} on {collection} ({duration_ms:.0f} ms, COLLSCAN, "
+                    f"{plan['docs_examined']} docs examined): {shape}"
+                )
+        except Exception as e:
+            logger.error(f"Error recording slow query: {str(e)}")
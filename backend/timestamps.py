@@ -0,0 +1,92 @@
+"""
+Timestamp storage helpers
+
+All timestamp fields are stored as native BSON dates (UTC). Older documents
+stored some of them as ISO-8601 strings, which sort differently from dates
+and break range queries and index ordering on fields like created_at.
+
+TIMESTAMP_FIELDS lists every timestamp field per collection; it is used by
+migrate_timestamps.py to convert legacy string values in place.
+"""
+
+from datetime import datetime, timezone
+from typing import Any, Optional
+import pytz
+
+
+# Consultation slots are chosen and displayed in Indian Standard Time
+IST = pytz.timezone('Asia/Kolkata')
+
+# Collection name -> timestamp fields written by the API
+TIMESTAMP_FIELDS = {
+    "bookings": [
+        "created_at", "updated_at", "cancelled_at", "slot_start_at", "razorpay_order_created_at",
+        "refund_initiated_at", "refund_updated_at", "refund_completed_at",
+        "refund_next_sync_at",
+    ],
+    "users": ["created_at"],
+    "password_resets": ["created_at", "expires_at", "used_at"],
+    "testimonials": ["created_at", "updated_at"],
+    "time_slots": ["created_at", "updated_at"],
+    "astrologer_availability": ["created_at", "updated_at"],
+    "contact_inquiries": ["created_at"],
+    "newsletters": ["subscribed_at"],
+    "slow_queries": ["recorded_at"],
+}
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """
+    Convert a stored timestamp value to a UTC datetime.
+
+    Accepts datetimes (naive values are treated as UTC) and ISO-8601 strings,
+    including a trailing 'Z'. Returns None for empty or unparseable values.
+    """
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def normalize_timestamps(collection: str, doc: dict) -> dict:
+    """
+    Return the subset of a document's timestamp fields that are stored as
+    strings, converted to datetimes (suitable for a $set update).
+    """
+    updates = {}
+    for field in TIMESTAMP_FIELDS.get(collection, []):
+        value = doc.get(field)
+        if isinstance(value, str):
+            parsed = parse_timestamp(value)
+            if parsed is not None:
+                updates[field] = parsed
+    return updates
+
+
+def compute_slot_start_at(preferred_date: Optional[str], preferred_time: Optional[str]) -> Optional[datetime]:
+    """
+    Derive the UTC start of a booked slot from its IST date and time strings.
+
+    preferred_date is YYYY-MM-DD and preferred_time is HH:MM (24-hour, IST).
+    A missing time means midnight IST. Returns None if the date is missing or
+    the values cannot be parsed.
+    """
+    if not preferred_date:
+        return None
+    try:
+        slot_start = datetime.fromisoformat(f"{preferred_date}T{preferred_time or '00:00'}")
+    except ValueError:
+        return None
+
+    if slot_start.tzinfo is None:
+        slot_start = IST.localize(slot_start)
+    return slot_start.astimezone(timezone.utc)
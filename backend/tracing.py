@@ -0,0 +1,355 @@
+"""
+Request tracing
+
+Lightweight spans propagated through contextvars, so work started from a
+request stays in its trace: Mongo commands (TracingCommandListener on the
+Motor client; Motor copies contextvars into its executor threads), outbound
+calls (metrics.track_outbound), BackgroundTasks wrapped with traced_task(),
+and queued webhook events, which carry the W3C traceparent of the request
+that stored them.
+
+Ids and traceparent headers follow W3C Trace Context, and exported spans use
+OTLP field names (traceId, spanId, parentSpanId, startTimeUnixNano, ...), one
+JSON object per line, so they can be loaded into OpenTelemetry tooling.
+
+TRACING_EXPORTER selects where spans go: "console" (stdout), "file"
+(TRACING_FILE_PATH) or unset to disable tracing. Spans are written by a
+background thread, never on the event loop.
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, NamedTuple, Optional
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTER = os.environ.get('TRACING_EXPORTER', '').lower()  # "console", "file" or "" (off)
+TRACING_FILE_PATH = os.environ.get('TRACING_FILE_PATH', 'traces.jsonl')
+TRACING_SERVICE_NAME = os.environ.get('TRACING_SERVICE_NAME', 'astrology-backend')
+SPAN_EXPORT_WARNING_INTERVAL_SECONDS = 60  # At most one export failure warning per interval
+
+# OTLP span kinds
+KIND_INTERNAL = "SPAN_KIND_INTERNAL"
+KIND_SERVER = "SPAN_KIND_SERVER"
+KIND_CLIENT = "SPAN_KIND_CLIENT"
+
+
+class SpanContext(NamedTuple):
+    trace_id: str  # 32 hex chars
+    span_id: str   # 16 hex chars
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[SpanContext]:
+    """SpanContext from a W3C traceparent value ("00-<trace id>-<span id>-<flags>"), or None"""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16), int(parts[2], 16)
+    except ValueError:
+        return None
+    if parts[1] == "0" * 32 or parts[2] == "0" * 16:
+        return None
+    return SpanContext(parts[1], parts[2])
+
+
+class SpanExporter:
+    """Writes finished spans as JSON lines from a daemon thread"""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        # Failures since the last warning, and when it was logged (time.monotonic)
+        self._failures = 0
+        self._last_warning_at: Optional[float] = None
+        threading.Thread(target=self._run, name="span-exporter", daemon=True).start()
+
+    def export(self, span_data: dict) -> None:
+        self._queue.put(span_data)
+
+    def _run(self):
+        while True:
+            span_data = self._queue.get()
+            try:
+                self._stream.write(json.dumps(span_data, default=str) + "\n")
+                # Drain whatever else is queued before flushing
+                while not self._queue.empty():
+                    self._stream.write(json.dumps(self._queue.get(), default=str) + "\n")
+                self._stream.flush()
+            except Exception as e:
+                self._report_failure(e)
+
+    def _report_failure(self, error: Exception) -> None:
+        """Log export failures, at most once per SPAN_EXPORT_WARNING_INTERVAL_SECONDS"""
+        self._failures += 1
+        now = time.monotonic()
+        if self._last_warning_at is not None and now - self._last_warning_at < SPAN_EXPORT_WARNING_INTERVAL_SECONDS:
+            return
+        logger.warning(f"⚠️ Span export failed ({self._failures} failure(s) since last report): {error}")
+        self._failures = 0
+        self._last_warning_at = now
+
+
+def _build_exporter() -> Optional[SpanExporter]:
+    if TRACING_EXPORTER == "console":
+        return SpanExporter(sys.stdout)
+    if TRACING_EXPORTER == "file":
+        return SpanExporter(open(TRACING_FILE_PATH, "a", encoding="utf-8"))
+    return None
+
+
+_exporter = _build_exporter()
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+class Span:
+    """One timed operation; exported when ended"""
+
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_span_id", "attributes",
+                 "status_code", "status_message", "start_ns", "end_ns")
+
+    def __init__(self, name: str, kind: str = KIND_INTERNAL, parent: Optional[SpanContext] = None,
+                 attributes: Optional[dict] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = parent.trace_id if parent else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent.span_id if parent else None
+        self.attributes = dict(attributes) if attributes else {}
+        self.status_code = "STATUS_CODE_UNSET"
+        self.status_message = None
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+
+    @property
+    def context(self) -> SpanContext:
+        return SpanContext(self.trace_id, self.span_id)
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value) -> None:
+        self.attributes[key] = value
+
+    def set_error(self, message: Optional[str] = None) -> None:
+        self.status_code = "STATUS_CODE_ERROR"
+        self.status_message = message
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+        self.set_error(str(exc))
+
+    def end(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if _exporter is not None:
+            _exporter.export(self.to_dict())
+
+    def to_dict(self) -> dict:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": self.status_code, "message": self.status_message},
+            "resource": {"service.name": TRACING_SERVICE_NAME},
+        }
+
+
+class _NoopSpan:
+    """Returned by start_span while tracing is disabled"""
+
+    context = None
+    traceparent = None
+
+    def set_attribute(self, key, value):
+        pass
+
+    def set_error(self, message=None):
+        pass
+
+    def record_exception(self, exc):
+        pass
+
+    def end(self):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+# Innermost active span of the current request/task
+current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_traceparent() -> Optional[str]:
+    """traceparent of the active span, for handing work to another process or queue"""
+    span = current_span.get()
+    return span.traceparent if span else None
+
+
+@contextmanager
+def start_span(name: str, kind: str = KIND_INTERNAL, attributes: Optional[dict] = None,
+               parent: Optional[SpanContext] = None):
+    """
+    Run a block in a new span, child of `parent` or of the active span.
+    Exceptions are recorded on the span and re-raised.
+    """
+    if _exporter is None:
+        yield NOOP_SPAN
+        return
+
+    if parent is None:
+        active = current_span.get()
+        parent = active.context if active else None
+    span = Span(name, kind, parent, attributes)
+    token = current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        current_span.reset(token)
+        span.end()
+
+
+def traced_task(func: Callable, name: Optional[str] = None) -> Callable:
+    """
+    Wrap a BackgroundTasks/create_task callable to run in its own span, child of
+    the span active when it was scheduled: background_tasks.add_task(traced_task(send_email), ...)
+    """
+    if _exporter is None:
+        return func
+
+    span_name = name or f"background {func.__name__}"
+    active = current_span.get()
+    parent = active.context if active else None
+
+    if asyncio.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            with start_span(span_name, parent=parent):
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with start_span(span_name, parent=parent):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class TracingCommandListener(monitoring.CommandListener):
+    """Client span per Mongo command issued inside a trace (commands outside one are ignored)"""
+
+    def __init__(self):
+        self._spans: Dict[int, Span] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        parent = current_span.get()
+        if parent is None:
+            return
+        collection = event.command.get(event.command_name)
+        span = Span(f"mongodb.{event.command_name}", KIND_CLIENT, parent.context, {
+            "db.system": "mongodb",
+            "db.name": event.database_name,
+            "db.operation": event.command_name,
+            "db.mongodb.collection": collection if isinstance(collection, str) else "",
+        })
+        with self._lock:
+            self._spans[event.request_id] = span
+
+    def succeeded(self, event):
+        with self._lock:
+            span = self._spans.pop(event.request_id, None)
+        if span is not None:
+            span.end()
+
+    def failed(self, event):
+        with self._lock:
+            span = self._spans.pop(event.request_id, None)
+        if span is not None:
+            failure = event.failure if isinstance(event.failure, dict) else {}
+            span.set_error(failure.get("errmsg"))
+            span.end()
+
+
+tracing_command_listener = TracingCommandListener()
+
+
+class TracingMiddleware:
+    """ASGI middleware opening a server span per HTTP request (continues an incoming traceparent)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or _exporter is None:
+            await self.app(scope, receive, send)
+            return
+
+        traceparent = None
+        for header, value in scope["headers"]:
+            if header == b"traceparent":
+                traceparent = value.decode("latin-1")
+                break
+
+        method = scope["method"]
+        span = Span(method, KIND_SERVER, parse_traceparent(traceparent), {
+            "http.method": method,
+            "http.target": scope["path"],
+        })
+        token = current_span.set(span)
+
+        def finish():
+            if span.end_ns is None:
+                # Route template (e.g. /api/bookings/{booking_id}) as the span name
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.name = f"{method} {route}"
+                    span.set_attribute("http.route", route)
+                span.end()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.set_attribute("http.status_code", message["status"])
+                if message["status"] >= 500:
+                    span.set_error()
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                # The request span ends with the response; BackgroundTasks get their own spans
+                finish()
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_exception(e)
+            raise
+        finally:
+            current_span.reset(token)
+            finish()
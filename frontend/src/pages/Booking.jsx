@@ -31,6 +31,9 @@ const Booking = () => {
   const [checkingFirstBooking, setCheckingFirstBooking] = useState(true);
   const [preSelectedService, setPreSelectedService] = useState(null);
   const [calculatedPrice, setCalculatedPrice] = useState(0);
+  const [servicePrices, setServicePrices] = useState({});
+  // Price in the currency the client is charged in (smallest unit), when not INR
+  const [chargePrices, setChargePrices] = useState({ currency: 'INR', prices: {} });
 
   const [formData, setFormData] = useState({
     name: '',
@@ -251,91 +254,38 @@ const Booking = () => {
     };
   }, []);
 
-  // PPP (Purchasing Power Parity) multipliers for different countries/regions
-  const getPPPMultiplier = (country) => {
-    const countryLower = country.toLowerCase();
-
-    // High-income countries (Higher PPP multiplier)
-    const highIncomeCountries = {
-      'united states': 3.5,
-      'usa': 3.5,
-      'canada': 3.2,
-      'united kingdom': 3.0,
-      'uk': 3.0,
-      'australia': 3.2,
-      'new zealand': 3.0,
-      'switzerland': 4.0,
-      'norway': 3.8,
-      'denmark': 3.5,
-      'sweden': 3.3,
-      'germany': 2.8,
-      'france': 2.8,
-      'netherlands': 2.9,
-      'belgium': 2.8,
-      'austria': 2.8,
-      'ireland': 3.0,
-      'singapore': 2.5,
-      'hong kong': 2.5,
-      'japan': 2.3,
-      'south korea': 2.0,
-    };
+  // Fetch authoritative prices (paise) for the detected country - one cached call for all services
+  useEffect(() => {
+    if (loadingCountry) return;
+    let isMounted = true;
 
-    // Upper-middle-income countries (Medium-high PPP multiplier)
-    const upperMiddleIncomeCountries = {
-      'united arab emirates': 2.8,
-      'uae': 2.8,
-      'dubai': 2.8,
-      'saudi arabia': 2.5,
-      'qatar': 3.0,
-      'kuwait': 2.7,
-      'bahrain': 2.5,
-      'oman': 2.3,
-      'israel': 2.5,
-      'italy': 2.5,
-      'spain': 2.3,
-      'portugal': 2.0,
-      'greece': 1.8,
-      'poland': 1.7,
-      'czech republic': 1.8,
-      'malaysia': 1.5,
-      'china': 1.8,
-      'russia': 1.5,
-      'brazil': 1.6,
-      'mexico': 1.7,
-      'argentina': 1.5,
-      'chile': 1.8,
-      'turkey': 1.4,
-      'south africa': 1.6,
+    const fetchPricing = async () => {
+      try {
+        const response = await axios.get(`${API}/pricing`, {
+          params: { country: detectedCountry || 'India' },
+          timeout: 5000
+        });
+        const prices = {};
+        const charges = {};
+        (response.data.services || []).forEach(service => {
+          prices[service.id] = service.price;
+          charges[service.id] = service.charge_price;
+        });
+        if (isMounted) {
+          setServicePrices(prices);
+          setChargePrices({ currency: response.data.charge_currency || 'INR', prices: charges });
+        }
+      } catch (error) {
+        console.error('Error fetching pricing:', error.message);
+      }
     };
 
-    // Lower-middle-income countries (Medium PPP multiplier)
-    const lowerMiddleIncomeCountries = {
-      'thailand': 1.3,
-      'indonesia': 1.2,
-      'philippines': 1.2,
-      'vietnam': 1.1,
-      'egypt': 1.2,
-      'morocco': 1.2,
-      'ukraine': 1.1,
-      'colombia': 1.3,
-      'peru': 1.3,
-      'ecuador': 1.2,
-    };
+    fetchPricing();
 
-    // Check which category the country falls into
-    if (highIncomeCountries[countryLower]) {
-      return highIncomeCountries[countryLower];
-    } else if (upperMiddleIncomeCountries[countryLower]) {
-      return upperMiddleIncomeCountries[countryLower];
-    } else if (lowerMiddleIncomeCountries[countryLower]) {
-      return lowerMiddleIncomeCountries[countryLower];
-    } else if (countryLower === 'india') {
-      return 1.0; // Base price for India
-    } else {
-      // Default for unlisted countries (assume medium-high income)
-      return 2.0;
-    }
-  };
+    return () => {
+      isMounted = false;
+    };
+  }, [detectedCountry, loadingCountry]);
 
   // Fetch available time slots when astrologer and date are selected
   const fetchAvailableSlots = useCallback(async (astrologer, date, service) => {
@@ -366,64 +316,23 @@ const Booking = () => {
     }
   }, []); // Empty dependency array since it doesn't depend on any props or state
 
-  // Calculate price based on service, duration, and detected country with PPP
-  useEffect(() => {
-    console.log('💰 Price Calculation Triggered:', {
-      service: formData.service,
-      duration: formData.consultationDuration,
-      country: detectedCountry
-    });
-
-    if (formData.service && formData.consultationDuration) {
-      // If duration is 5-10 mins, it's free
-      if (formData.consultationDuration === '5-10') {
-        console.log('✅ Free consultation (5-10 mins)');
-        setCalculatedPrice(0);
-      } else if (formData.consultationDuration === '10+') {
-        // Find the selected service from mockServices
-        const selectedService = mockServices?.find(s => s.id === formData.service);
-
-        if (selectedService && selectedService.actualPrice && selectedService.discountPercent !== undefined) {
-          // Step 1: Calculate base discounted price
-          const basePrice = selectedService.actualPrice * (1 - selectedService.discountPercent / 100);
-
-          // Step 2: Get PPP multiplier for the country (use detected or default to India)
-          const countryToUse = detectedCountry || 'India';
-          const pppMultiplier = getPPPMultiplier(countryToUse);
-
-          // Step 3: Apply PPP multiplier
-          let finalPrice = basePrice * pppMultiplier;
-
-          // Step 4: For Marriage Compatibility service, apply additional 1.5x multiplier
-          if (formData.service === '3') {
-            finalPrice = finalPrice * 1.5;
-          }
-
-          const roundedPrice = Math.round(finalPrice);
-
-          console.log('💰 Price Calculation Details:', {
-            service: selectedService.title,
-            actualPrice: selectedService.actualPrice,
-            discountPercent: selectedService.discountPercent,
-            basePrice: basePrice,
-            country: countryToUse,
-            pppMultiplier: pppMultiplier,
-            finalPrice: finalPrice,
-            roundedPrice: roundedPrice
-          });
+  // Format an amount in a currency's smallest unit, e.g. 2345 USD -> "$23.45"
+  const formatChargeAmount = (amountMinor, currency) => {
+    const formatter = new Intl.NumberFormat(undefined, { style: 'currency', currency });
+    const fractionDigits = formatter.resolvedOptions().maximumFractionDigits;
+    return formatter.format(amountMinor / Math.pow(10, fractionDigits));
+  };
 
-          setCalculatedPrice(roundedPrice);
-        } else {
-          // Service not found or missing price data
-          console.error('Service not found or missing price data:', formData.service);
-          setCalculatedPrice(0);
-        }
-      }
+  // Price shown for the selected service and duration (backend pricing, in rupees)
+  useEffect(() => {
+    if (formData.service && formData.consultationDuration === '10+') {
+      const pricePaise = servicePrices[formData.service];
+      setCalculatedPrice(pricePaise ? Math.round(pricePaise / 100) : 0);
     } else {
-      console.log('⏳ Waiting for service or duration selection...');
+      // Free consultation (5-10 mins) or nothing selected yet
       setCalculatedPrice(0);
     }
-  }, [formData.service, formData.consultationDuration, detectedCountry]);
+  }, [formData.service, formData.consultationDuration, servicePrices]);
 
   // Auto-set duration to "10+" for second-time users when service is selected
   useEffect(() => {
@@ -461,18 +370,23 @@ const Booking = () => {
       return;
     }
 
-    // Get Razorpay key from backend
+    // Get (or reuse) the Razorpay order for this booking - created only when payment starts
     try {
-      const keyResponse = await axios.get(`${API}/razorpay-key`);
-      const key = keyResponse.data.key;
+      const token = localStorage.getItem('authToken');
+      const orderResponse = await axios.post(
+        `${API}/bookings/${bookingData.id}/payment-order`,
+        {},
+        { headers: { Authorization: `Bearer ${token}` } }
+      );
+      const { razorpay_order_id, amount, currency, razorpay_key_id } = orderResponse.data;
 
       const options = {
-        key: key,
-        amount: bookingData.amount,
-        currency: 'INR',
+        key: razorpay_key_id,
+        amount: amount,
+        currency: currency,
         name: 'Acharyaa Indira Pandey Astrology',
         description: `${bookingData.service} - ${bookingData.consultation_duration} mins`,
-        order_id: bookingData.razorpay_order_id,
+        order_id: razorpay_order_id,
         handler: async function (response) {
           try {
             // Verify payment
@@ -511,7 +425,7 @@ const Booking = () => {
     } catch (error) {
       console.error('Payment error:', error);
       // If Razorpay is not configured, inform user and save booking anyway
-      if (error.response?.status === 400) {
+      if (error.response?.status === 400 || error.response?.status === 503) {
         toast.info('Payment gateway not configured yet. Your booking has been saved - our team will contact you for payment.');
         navigate(`/booking-success/${bookingData.id}`);
       } else {
@@ -599,7 +513,7 @@ const Booking = () => {
       console.log('  Match:', calculatedPrice === Math.round(backendPriceInRupees));
 
       // Check if payment is required (duration > 10 mins means paid consultation)
-      if (bookingData.amount > 0 && bookingData.razorpay_order_id) {
+      if (bookingData.amount > 0) {
         // Trigger Razorpay payment
         await handlePayment(bookingData);
       } else {
@@ -1003,6 +917,11 @@ const Booking = () => {
                         <div className="mt-3 p-3 bg-gradient-to-br from-purple-50 to-amber-50 rounded-lg border border-purple-200">
                           <p className="text-sm font-semibold text-purple-900">
                             💰 Consultation Fee: <span className="text-xl">₹{calculatedPrice}</span>
+                            {chargePrices.currency !== 'INR' && chargePrices.prices[formData.service] !== undefined && (
+                              <span className="ml-2 text-gray-600">
+                                (charged as {formatChargeAmount(chargePrices.prices[formData.service], chargePrices.currency)})
+                              </span>
+                            )}
                           </p>
                           <p className="text-xs text-gray-600 mt-1">
                             🎉 Holi Offer: 25% discount already applied!
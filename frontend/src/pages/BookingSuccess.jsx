@@ -104,17 +104,22 @@ const BookingSuccess = () => {
     }
 
     try {
-      // Get Razorpay key from backend
-      const keyResponse = await axios.get(`${API}/razorpay-key`);
-      const key = keyResponse.data.key;
+      // Get (or reuse) the Razorpay order for this booking
+      const token = localStorage.getItem('authToken');
+      const orderResponse = await axios.post(
+        `${API}/bookings/${booking.id}/payment-order`,
+        {},
+        { headers: { Authorization: `Bearer ${token}` } }
+      );
+      const { razorpay_order_id, amount, currency, razorpay_key_id } = orderResponse.data;
 
       const options = {
-        key: key,
-        amount: booking.amount,
-        currency: 'INR',
+        key: razorpay_key_id,
+        amount: amount,
+        currency: currency,
         name: 'Acharyaa Indira Pandey Astrology',
         description: `${booking.service} - ${booking.consultation_duration} mins`,
-        order_id: booking.razorpay_order_id,
+        order_id: razorpay_order_id,
         handler: async function (response) {
           try {
             // Verify payment
@@ -15,6 +15,7 @@ const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
 const ITEMS_PER_PAGE = 5;
+const FETCH_PAGE_SIZE = 20; // Bookings fetched from the server per request
 
 const ManageBookings = () => {
   const navigate = useNavigate();
@@ -22,6 +23,9 @@ const ManageBookings = () => {
   const { t } = useLanguage();
   const [bookings, setBookings] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [serverPage, setServerPage] = useState(1);
+  const [hasMoreBookings, setHasMoreBookings] = useState(false);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [processingPaymentId, setProcessingPaymentId] = useState(null);
   const [processingCancelId, setProcessingCancelId] = useState(null);
   const [showCancelDialog, setShowCancelDialog] = useState(false);
@@ -42,9 +46,14 @@ const ManageBookings = () => {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [isAuthenticated, navigate]);
 
-  const fetchBookings = async () => {
+  // Fetch a page of bookings from the server (page 1 replaces the list, later pages append)
+  const fetchBookings = async (page = 1) => {
     try {
-      setLoading(true);
+      if (page === 1) {
+        setLoading(true);
+      } else {
+        setLoadingMore(true);
+      }
       const token = getToken();
 
       if (!token) {
@@ -55,12 +64,15 @@ const ManageBookings = () => {
 
       const response = await axios.get(`${API}/user/bookings`, {
         headers: { Authorization: `Bearer ${token}` },
+        params: { page, limit: FETCH_PAGE_SIZE },
         timeout: 10000
       });
 
       // Safely handle response
-      const fetchedBookings = response.data?.bookings || [];
-      setBookings(Array.isArray(fetchedBookings) ? fetchedBookings : []);
+      const fetchedBookings = Array.isArray(response.data?.bookings) ? response.data.bookings : [];
+      setBookings(prev => (page === 1 ? fetchedBookings : [...prev, ...fetchedBookings]));
+      setServerPage(page);
+      setHasMoreBookings(Boolean(response.data?.has_more));
     } catch (error) {
       console.error('Error fetching bookings:', error.message);
 
@@ -71,9 +83,12 @@ const ManageBookings = () => {
         toast.error('Failed to load bookings');
       }
 
-      setBookings([]); // Set empty array on error
+      if (page === 1) {
+        setBookings([]); // Set empty array on error
+      }
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
@@ -194,13 +209,13 @@ const ManageBookings = () => {
         { headers: { Authorization: `Bearer ${token}` } }
       );
 
-      const { razorpay_order_id, amount, razorpay_key_id } = response.data;
+      const { razorpay_order_id, amount, currency, razorpay_key_id } = response.data;
 
       // Initialize Razorpay
       const options = {
         key: razorpay_key_id,
         amount: amount,
-        currency: 'INR',
+        currency: currency,
         name: 'Acharyaa Indira Pandey',
         description: 'Astrology Consultation',
         order_id: razorpay_order_id,
@@ -687,6 +702,21 @@ const ManageBookings = () => {
             )}
           </>
         )}
+
+        {/* Load older bookings from the server */}
+        {hasMoreBookings && (
+          <div className="mt-6 text-center">
+            <Button
+              variant="outline"
+              onClick={() => fetchBookings(serverPage + 1)}
+              disabled={loadingMore}
+              className="flex items-center gap-2 mx-auto"
+            >
+              {loadingMore && <Loader2 className="w-4 h-4 animate-spin" />}
+              {t('manageBookings.loadMore')}
+            </Button>
+          </div>
+        )}
       </div>
 
       {/* Cancellation Policy Dialog */}
@@ -511,6 +511,7 @@ export const translations = {
       of: 'of',
       previous: 'Previous',
       next: 'Next',
+      loadMore: 'Load older bookings',
       cancelDialogTitle: 'Cancel Booking',
       cancelDialogDesc: 'Are you sure you want to cancel this booking?',
       refundEligible: 'You are eligible for',
@@ -1040,6 +1041,7 @@ export const translations = {
       of: 'का',
       previous: 'पिछला',
       next: 'अगला',
+      loadMore: 'पुरानी बुकिंग देखें',
       cancelDialogTitle: 'बुकिंग रद्द करें',
       cancelDialogDesc: 'क्या आप वाकई इस बुकिंग को रद्द करना चाहते हैं?',
       refundEligible: 'आप पात्र हैं',
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# The backend uses flat imports (`from models import ...`); make them resolvable from tests
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
@@ -0,0 +1,46 @@
+"""
+Fixtures for the request-path micro-benchmarks
+
+Inputs are fixed (no clock, randomness or database) so runs are comparable
+across commits: slot generation uses a pinned date and "now", tokens use a
+fixed secret, and pricing reads the built-in service catalog.
+"""
+
+import os
+from datetime import datetime
+
+import pytest
+
+# Read at import time; a benchmark run never touches MongoDB
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('JWT_SECRET', 'benchmark-jwt-secret-0123456789abcdef')
+
+from routers.availability import DEFAULT_AVAILABILITY_RANGES  # noqa: E402
+from service_catalog import DEFAULT_SERVICES, ServiceCatalog  # noqa: E402
+from timestamps import IST  # noqa: E402
+
+SLOT_DATE = "2030-01-15"
+
+
+@pytest.fixture(scope="session")
+def catalog():
+    """The built-in catalog, independent of any catalog reloaded from MongoDB"""
+    return ServiceCatalog(DEFAULT_SERVICES)
+
+
+@pytest.fixture(scope="session")
+def slot_inputs():
+    """Default working hours on a future day with two slots already booked"""
+    return {
+        "date": SLOT_DATE,
+        "availability_ranges": DEFAULT_AVAILABILITY_RANGES,
+        "booked_times": {"13:30", "19:00"},
+        "now_ist": IST.localize(datetime(2030, 1, 15, 0, 0)),
+    }
+
+
+def pytest_benchmark_update_json(config, benchmarks, output_json):
+    """Keep --benchmark-json files small enough to commit: summary stats only"""
+    output_json["machine_info"].pop("node", None)
+    for bench in output_json["benchmarks"]:
+        bench["stats"].pop("data", None)
@@ -0,0 +1,70 @@
+"""
+Micro-benchmarks for CPU-bound request-path code
+
+    python -m pytest tests/benchmarks --benchmark-only
+    python -m pytest tests/benchmarks --benchmark-only \
+        --benchmark-compare=tests/benchmarks/baseline.json --benchmark-compare-fail=min:25%
+
+baseline.json was recorded with --benchmark-json; re-record it on the machine
+you compare on (see the README) when a change is meant to move the numbers.
+"""
+
+import pytest
+
+from models import Booking, ContactInquiry
+from pricing import PAID_DURATION, FREE_DURATION, get_ppp_multiplier
+from routers.availability import generate_time_slots
+from security import create_access_token, decode_access_token
+
+COUNTRIES = ["India", "  United   States. ", "Atlantis"]
+
+
+@pytest.mark.parametrize("country", COUNTRIES)
+def test_get_ppp_multiplier(benchmark, country):
+    assert benchmark(get_ppp_multiplier, country) > 0
+
+
+@pytest.mark.parametrize("country", COUNTRIES)
+def test_calculate_price_paid(benchmark, catalog, country):
+    assert benchmark(catalog.pricing.calculate_price, PAID_DURATION, "3", country) > 0
+
+
+def test_calculate_price_free(benchmark, catalog):
+    assert benchmark(catalog.pricing.calculate_price, FREE_DURATION, "3", "India") == 0
+
+
+@pytest.mark.parametrize("service", ["3", "Vastu Consultation", None])
+def test_get_service_name(benchmark, catalog, service):
+    assert benchmark(catalog.get_service_name, service)
+
+
+@pytest.mark.parametrize("phone", ["9876543210", "(987) 654-3210"])
+def test_booking_validate_phone(benchmark, phone):
+    assert benchmark(Booking.validate_phone, phone).endswith("9876543210")
+
+
+@pytest.mark.parametrize("phone", ["", "98765 43210"])
+def test_contact_inquiry_validate_phone(benchmark, phone):
+    benchmark(ContactInquiry.validate_phone, phone)
+
+
+def test_create_access_token(benchmark):
+    assert benchmark(create_access_token, "bench-user-id", "bench@example.com")
+
+
+def test_decode_access_token(benchmark):
+    token = create_access_token("bench-user-id", "bench@example.com")
+    assert benchmark(decode_access_token, token)["user_id"] == "bench-user-id"
+
+
+@pytest.mark.parametrize("slot_duration", [30, 60])
+def test_generate_time_slots(benchmark, slot_inputs, slot_duration):
+    slots = benchmark(
+        generate_time_slots,
+        slot_inputs["date"],
+        slot_inputs["availability_ranges"],
+        slot_duration,
+        slot_inputs["booked_times"],
+        slot_inputs["now_ist"],
+    )
+    assert slots and all(slot["start_time"] not in slot_inputs["booked_times"] for slot in slots)
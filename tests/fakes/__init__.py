@@ -0,0 +1,101 @@
+"""
+Local stand-ins for SendGrid, Razorpay and ipapi
+
+Small ASGI apps emulating the third-party endpoints the backend calls, with
+configurable latency and error injection (see common.py), so throughput and
+tail latency can be measured offline. Point the backend at them with:
+
+    SENDGRID_API_BASE_URL=http://127.0.0.1:9101   (and any SENDGRID_API_KEY)
+    RAZORPAY_API_BASE_URL=http://127.0.0.1:9102
+    IPAPI_BASE_URL=http://127.0.0.1:9103
+
+Run them standalone with `python -m tests.fakes`, or in-process with FakeServers.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from . import ipapi, razorpay, sendgrid
+
+DEFAULT_PORTS = {"sendgrid": 9101, "razorpay": 9102, "ipapi": 9103}
+
+# Backend environment variable pointing at each fake
+BASE_URL_ENV = {
+    "sendgrid": "SENDGRID_API_BASE_URL",
+    "razorpay": "RAZORPAY_API_BASE_URL",
+    "ipapi": "IPAPI_BASE_URL",
+}
+
+
+def create_apps(razorpay_options: Optional[dict] = None, seed: Optional[int] = None) -> dict:
+    return {
+        "sendgrid": sendgrid.create_app(seed=seed),
+        "razorpay": razorpay.create_app(seed=seed, **(razorpay_options or {})),
+        "ipapi": ipapi.create_app(seed=seed),
+    }
+
+
+class FakeServers:
+    """
+    Serves the fake apps with uvicorn on a background thread.
+    Port 0 picks a free port; base_urls/backend_env are available after start().
+    """
+
+    def __init__(self, host: str = "127.0.0.1", ports: Optional[Dict[str, int]] = None,
+                 razorpay_options: Optional[dict] = None, seed: Optional[int] = None):
+        self.host = host
+        self.apps = create_apps(razorpay_options, seed)
+        ports = ports if ports is not None else DEFAULT_PORTS
+        self._servers = {
+            name: uvicorn.Server(uvicorn.Config(
+                app, host=host, port=ports.get(name, 0), log_level="warning", lifespan="off"
+            ))
+            for name, app in self.apps.items()
+        }
+        self._thread: Optional[threading.Thread] = None
+        self.base_urls: Dict[str, str] = {}
+
+    def start(self, timeout: float = 10) -> Dict[str, str]:
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.serve()), name="fake-servers", daemon=True
+        )
+        self._thread.start()
+
+        for _ in range(int(timeout / 0.05)):
+            if all(server.started for server in self._servers.values()):
+                break
+            time.sleep(0.05)
+        else:
+            raise RuntimeError("Fake servers did not start")
+
+        for name, server in self._servers.items():
+            port = server.servers[0].sockets[0].getsockname()[1]
+            self.base_urls[name] = f"http://{self.host}:{port}"
+        return self.base_urls
+
+    async def serve(self):
+        await asyncio.gather(*(server.serve() for server in self._servers.values()))
+
+    def stop(self):
+        for server in self._servers.values():
+            server.should_exit = True
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+    @property
+    def backend_env(self) -> Dict[str, str]:
+        """Environment variables pointing the backend at these servers"""
+        env = {BASE_URL_ENV[name]: url for name, url in self.base_urls.items()}
+        env["SENDGRID_API_KEY"] = "SG.fake"
+        return env
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
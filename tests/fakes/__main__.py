@@ -0,0 +1,39 @@
+"""
+Run the fake SendGrid, Razorpay and ipapi servers
+
+Usage (from the repo root):
+    python -m tests.fakes
+    python -m tests.fakes --webhook-url http://localhost:8000/api/razorpay-webhook
+    FAKE_LATENCY_MS=150 FAKE_JITTER_MS=100 FAKE_RAZORPAY_ERROR_RATE=0.02 python -m tests.fakes
+"""
+
+import argparse
+import asyncio
+
+from . import BASE_URL_ENV, DEFAULT_PORTS, FakeServers
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake third-party servers for local performance testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    for name, port in DEFAULT_PORTS.items():
+        parser.add_argument(f"--{name}-port", type=int, default=port)
+    parser.add_argument("--webhook-url", help="Deliver Razorpay webhooks to this URL")
+    parser.add_argument("--refund-delay", type=float, default=1.0, help="Seconds until refunds are processed")
+    args = parser.parse_args()
+
+    ports = {name: getattr(args, f"{name}_port") for name in DEFAULT_PORTS}
+    servers = FakeServers(args.host, ports, razorpay_options={
+        "webhook_url": args.webhook_url, "refund_delay": args.refund_delay
+    })
+
+    print("Point the backend at the fakes with:")
+    for name, port in ports.items():
+        print(f"  {BASE_URL_ENV[name]}=http://{args.host}:{port}")
+    print("  SENDGRID_API_KEY=SG.fake")
+    # Foreground: uvicorn handles Ctrl+C
+    asyncio.run(servers.serve())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Fault injection shared by the fake servers
+
+Every non-control request is delayed by latency_ms ± jitter_ms and fails with
+error_status at error_rate. Settings come from FAKE_<SERVICE>_* environment
+variables (falling back to FAKE_*), e.g. FAKE_RAZORPAY_LATENCY_MS=300 or
+FAKE_ERROR_RATE=0.05, and can be changed at runtime:
+
+    GET  /__fake__/config            current settings
+    PUT  /__fake__/config            {"latency_ms": 500, "error_rate": 0.1}
+    GET  /__fake__/stats             requests served and errors injected
+"""
+
+import asyncio
+import os
+import random
+from collections import Counter
+from typing import Callable, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+CONTROL_PREFIX = "/__fake__"
+
+
+class FaultConfig:
+    """Latency and error injection settings for one fake server"""
+
+    FIELDS = ("latency_ms", "jitter_ms", "error_rate", "error_status")
+
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0, error_status: int = 503):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    @classmethod
+    def from_env(cls, service: str) -> "FaultConfig":
+        def read(field: str, default: str) -> str:
+            name = field.upper()
+            return os.environ.get(f"FAKE_{service.upper()}_{name}", os.environ.get(f"FAKE_{name}", default))
+
+        return cls(
+            latency_ms=float(read("latency_ms", "0")),
+            jitter_ms=float(read("jitter_ms", "0")),
+            error_rate=float(read("error_rate", "0")),
+            error_status=int(read("error_status", "503")),
+        )
+
+    def update(self, values: dict) -> None:
+        for field in self.FIELDS:
+            if field in values:
+                setattr(self, field, type(getattr(self, field))(values[field]))
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    def delay_seconds(self, rng: random.Random) -> float:
+        jitter = rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+
+def add_fault_injection(
+    app: FastAPI,
+    config: FaultConfig,
+    error_body: Callable[[int], dict],
+    seed: Optional[int] = None
+) -> None:
+    """Install latency/error injection and the /__fake__ control endpoints on a fake server"""
+    rng = random.Random(seed)
+    stats = Counter()
+    app.state.fault_config = config
+    app.state.stats = stats
+
+    @app.middleware("http")
+    async def inject_faults(request: Request, call_next):
+        if request.url.path.startswith(CONTROL_PREFIX):
+            return await call_next(request)
+
+        stats["requests"] += 1
+        delay = config.delay_seconds(rng)
+        if delay:
+            await asyncio.sleep(delay)
+        if config.error_rate and rng.random() < config.error_rate:
+            stats["injected_errors"] += 1
+            return JSONResponse(error_body(config.error_status), status_code=config.error_status)
+        return await call_next(request)
+
+    @app.get(f"{CONTROL_PREFIX}/config")
+    async def get_config():
+        return config.to_dict()
+
+    @app.put(f"{CONTROL_PREFIX}/config")
+    async def update_config(request: Request):
+        config.update(await request.json())
+        return config.to_dict()
+
+    @app.get(f"{CONTROL_PREFIX}/stats")
+    async def get_stats():
+        return dict(stats)
@@ -0,0 +1,55 @@
+"""
+Fake ipapi.co: GET /{ip}/json/
+
+Each IP maps deterministically to one of COUNTRIES, so the same address always
+geolocates to the same country and a spread of addresses covers every PPP tier.
+"""
+
+import hashlib
+import ipaddress
+from typing import Optional
+
+from fastapi import FastAPI
+
+from .common import FaultConfig, add_fault_injection
+
+# (country_name, country_code, city), weighted towards India like real traffic
+COUNTRIES = [
+    ("India", "IN", "Mumbai"), ("India", "IN", "Delhi"), ("India", "IN", "Bengaluru"),
+    ("India", "IN", "Pune"), ("India", "IN", "Kolkata"), ("India", "IN", "Chennai"),
+    ("United States", "US", "New York"), ("United Kingdom", "GB", "London"),
+    ("United Arab Emirates", "AE", "Dubai"), ("Singapore", "SG", "Singapore"),
+    ("Thailand", "TH", "Bangkok"), ("Australia", "AU", "Sydney"),
+]
+
+
+def ipapi_error(status: int) -> dict:
+    if status == 429:
+        return {"error": True, "reason": "RateLimited", "message": "Too many rapid requests."}
+    return {"error": True, "reason": "ServerError"}
+
+
+def create_app(config: Optional[FaultConfig] = None, seed: Optional[int] = None) -> FastAPI:
+    app = FastAPI(title="Fake ipapi")
+    add_fault_injection(app, config or FaultConfig.from_env("ipapi"), ipapi_error, seed)
+
+    @app.get("/{ip}/json/")
+    async def lookup(ip: str):
+        try:
+            address = ipaddress.ip_address(ip)
+        except ValueError:
+            return {"ip": ip, "error": True, "reason": "Invalid IP Address"}
+        if address.is_private or address.is_loopback or address.is_reserved:
+            return {"ip": ip, "bogon": True}
+
+        index = int.from_bytes(hashlib.sha1(ip.encode()).digest()[:4], "big") % len(COUNTRIES)
+        country_name, country_code, city = COUNTRIES[index]
+        return {
+            "ip": ip,
+            "version": "IPv6" if address.version == 6 else "IPv4",
+            "city": city,
+            "country_name": country_name,
+            "country_code": country_code,
+        }
+
+    return app
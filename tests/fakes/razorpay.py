@@ -0,0 +1,186 @@
+"""
+Fake Razorpay API
+
+Implements the calls the backend makes through the SDK:
+    POST /v1/orders                                  create order
+    GET  /v1/orders/{order_id}
+    POST /v1/payments/{payment_id}/refund            create refund (pending)
+    GET  /v1/payments/{payment_id}/refunds/{refund_id}
+
+Checkout happens in the browser, so it is simulated with a control endpoint:
+    POST /__fake__/orders/{order_id}/pay             capture a payment for the order
+
+which returns the razorpay_order_id / razorpay_payment_id / razorpay_signature
+triple checkout would hand to /api/verify-payment. If webhook_url is set, the
+fake also delivers signed payment.captured webhooks and, refund_delay seconds
+after a refund is created, refund.processed webhooks.
+
+Requests must use basic auth with key_id/key_secret, and signatures use the
+same secrets as the backend (RAZORPAY_KEY_SECRET / RAZORPAY_WEBHOOK_SECRET).
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+import uuid
+from typing import Optional
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .common import CONTROL_PREFIX, FaultConfig, add_fault_injection
+
+
+def razorpay_error(status: int, description: str = "The server encountered an error", code: Optional[str] = None) -> dict:
+    if code is None:
+        code = "BAD_REQUEST_ERROR" if status < 500 else "SERVER_ERROR"
+    return {"error": {"code": code, "description": description}}
+
+
+def _entity_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:14]}"
+
+
+def sign(secret: str, message: bytes) -> str:
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def create_app(
+    config: Optional[FaultConfig] = None,
+    key_id: Optional[str] = None,
+    key_secret: Optional[str] = None,
+    webhook_secret: Optional[str] = None,
+    webhook_url: Optional[str] = None,
+    refund_delay: float = 1.0,
+    seed: Optional[int] = None
+) -> FastAPI:
+    key_id = key_id or os.environ.get('RAZORPAY_KEY_ID', 'rzp_test_fake')
+    key_secret = key_secret or os.environ.get('RAZORPAY_KEY_SECRET', 'fake_key_secret')
+    webhook_secret = webhook_secret or os.environ.get('RAZORPAY_WEBHOOK_SECRET', '')
+    webhook_url = webhook_url or os.environ.get('FAKE_RAZORPAY_WEBHOOK_URL')
+    expected_auth = "Basic " + base64.b64encode(f"{key_id}:{key_secret}".encode()).decode()
+
+    app = FastAPI(title="Fake Razorpay")
+    add_fault_injection(app, config or FaultConfig.from_env("razorpay"), razorpay_error, seed)
+
+    orders, payments, refunds = {}, {}, {}
+    background = set()
+
+    def unauthorized(request: Request) -> Optional[JSONResponse]:
+        if request.headers.get("authorization") != expected_auth:
+            return JSONResponse(razorpay_error(401, "Authentication failed"), status_code=401)
+        return None
+
+    def not_found(description: str = "The id provided does not exist") -> JSONResponse:
+        return JSONResponse(razorpay_error(400, description), status_code=400)
+
+    async def deliver_webhook(event: str, payload: dict):
+        if not webhook_url:
+            return
+        body = json.dumps({"entity": "event", "event": event, "payload": payload,
+                           "created_at": int(time.time())}).encode('utf-8')
+        headers = {"Content-Type": "application/json", "X-Razorpay-Event-Id": _entity_id("evt")}
+        if webhook_secret:
+            headers["X-Razorpay-Signature"] = sign(webhook_secret, body)
+        try:
+            async with httpx.AsyncClient(timeout=10) as client:
+                await client.post(webhook_url, content=body, headers=headers)
+        except httpx.HTTPError:
+            pass  # Razorpay retries; the fake doesn't
+
+    def run_in_background(coro):
+        task = asyncio.create_task(coro)
+        background.add(task)
+        task.add_done_callback(background.discard)
+
+    @app.post("/v1/orders")
+    async def create_order(request: Request):
+        if (error := unauthorized(request)) is not None:
+            return error
+        data = await request.json()
+        if not isinstance(data.get("amount"), int) or data["amount"] < 100:
+            return JSONResponse(razorpay_error(400, "Order amount less than minimum amount allowed"), status_code=400)
+
+        order = {
+            "id": _entity_id("order"), "entity": "order",
+            "amount": data["amount"], "amount_paid": 0, "amount_due": data["amount"],
+            "currency": data.get("currency", "INR"), "receipt": data.get("receipt"),
+            "status": "created", "attempts": 0, "notes": data.get("notes", {}),
+            "created_at": int(time.time()),
+        }
+        orders[order["id"]] = order
+        return order
+
+    @app.get("/v1/orders/{order_id}")
+    async def fetch_order(order_id: str, request: Request):
+        if (error := unauthorized(request)) is not None:
+            return error
+        return orders.get(order_id) or not_found()
+
+    @app.post("/v1/payments/{payment_id}/refund")
+    async def create_refund(payment_id: str, request: Request):
+        if (error := unauthorized(request)) is not None:
+            return error
+        payment = payments.get(payment_id)
+        if payment is None:
+            return not_found()
+        data = await request.json()
+        amount = data.get("amount", payment["amount"])
+        if amount > payment["amount"] - payment["amount_refunded"]:
+            return JSONResponse(razorpay_error(400, "The refund amount provided is greater than amount captured"),
+                                status_code=400)
+
+        payment["amount_refunded"] += amount
+        refund = {
+            "id": _entity_id("rfnd"), "entity": "refund", "amount": amount,
+            "currency": payment["currency"], "payment_id": payment_id,
+            "notes": data.get("notes", {}), "status": "pending",
+            "speed_requested": data.get("speed", "normal"), "created_at": int(time.time()),
+        }
+        refunds[refund["id"]] = refund
+
+        async def process_refund():
+            await asyncio.sleep(refund_delay)
+            refund["status"] = "processed"
+            await deliver_webhook("refund.processed", {
+                "refund": {"entity": dict(refund)}, "payment": {"entity": dict(payment)}
+            })
+        run_in_background(process_refund())
+        return refund
+
+    @app.get("/v1/payments/{payment_id}/refunds/{refund_id}")
+    async def fetch_refund(payment_id: str, refund_id: str, request: Request):
+        if (error := unauthorized(request)) is not None:
+            return error
+        refund = refunds.get(refund_id)
+        if refund is None or refund["payment_id"] != payment_id:
+            return not_found()
+        return refund
+
+    @app.post(f"{CONTROL_PREFIX}/orders/{{order_id}}/pay")
+    async def pay_order(order_id: str):
+        """Simulate a successful checkout for an order"""
+        order = orders.get(order_id)
+        if order is None:
+            return not_found()
+        payment = {
+            "id": _entity_id("pay"), "entity": "payment", "amount": order["amount"],
+            "currency": order["currency"], "status": "captured", "order_id": order_id,
+            "amount_refunded": 0, "captured": True, "created_at": int(time.time()),
+        }
+        payments[payment["id"]] = payment
+        order.update(status="paid", amount_paid=order["amount"], amount_due=0, attempts=order["attempts"] + 1)
+
+        run_in_background(deliver_webhook("payment.captured", {"payment": {"entity": dict(payment)}}))
+        return {
+            "razorpay_order_id": order_id,
+            "razorpay_payment_id": payment["id"],
+            "razorpay_signature": sign(key_secret, f"{order_id}|{payment['id']}".encode('utf-8')),
+        }
+
+    return app
@@ -0,0 +1,49 @@
+"""
+Fake SendGrid v3 API: POST /v3/mail/send
+
+Accepts well-formed mail sends with a bearer token and answers 202 like
+SendGrid. The most recent messages can be inspected at GET /__fake__/messages.
+"""
+
+from collections import deque
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+from .common import CONTROL_PREFIX, FaultConfig, add_fault_injection
+
+MAX_STORED_MESSAGES = 1000
+
+
+def sendgrid_error(status: int, message: str = "Service unavailable", field: Optional[str] = None) -> dict:
+    return {"errors": [{"message": message, "field": field, "help": None}]}
+
+
+def create_app(config: Optional[FaultConfig] = None, seed: Optional[int] = None) -> FastAPI:
+    app = FastAPI(title="Fake SendGrid")
+    add_fault_injection(app, config or FaultConfig.from_env("sendgrid"), sendgrid_error, seed)
+    messages = deque(maxlen=MAX_STORED_MESSAGES)
+
+    @app.post("/v3/mail/send")
+    async def mail_send(request: Request):
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            return JSONResponse(sendgrid_error(401, "The provided authorization grant is invalid"), status_code=401)
+
+        message = await request.json()
+        for field in ("personalizations", "from", "subject", "content"):
+            if not message.get(field):
+                return JSONResponse(sendgrid_error(400, f"The {field} field is required", field), status_code=400)
+
+        messages.append({
+            "to": [recipient["email"] for p in message["personalizations"] for recipient in p.get("to", [])],
+            "from": message["from"].get("email"),
+            "subject": message["subject"],
+        })
+        return Response(status_code=202)
+
+    @app.get(f"{CONTROL_PREFIX}/messages")
+    async def list_messages():
+        return list(messages)
+
+    return app
@@ -0,0 +1,76 @@
+"""
+In-process app for API tests
+
+Builds the app on mongomock with test Razorpay credentials; outbound Razorpay
+and ipapi calls point at a closed local port, so nothing leaves the machine.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import os
+from contextlib import asynccontextmanager
+from datetime import timezone
+from typing import Iterable
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+os.environ.setdefault('JWT_SECRET', 'test-jwt-secret-0123456789abcdefghijkl')
+# mongomock doesn't emit command events or support explain
+os.environ.setdefault('SLOW_QUERY_THRESHOLD_MS', '0')
+
+KEY_ID = "rzp_test_harness"
+KEY_SECRET = "harness_key_secret"
+WEBHOOK_SECRET = "harness_webhook_secret"
+# Tests patch security.ADMIN_API_KEY to this and send it as X-Admin-Key
+ADMIN_KEY = "test-admin-key"
+UNREACHABLE_URL = "http://127.0.0.1:9"
+
+
+def sign(secret: str, message: bytes) -> str:
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def make_integrations(webhook_secrets: Iterable[str] = (WEBHOOK_SECRET,)):
+    from integrations import Integrations
+    from signatures import SignatureVerifier
+
+    return Integrations(
+        razorpay_key_id=KEY_ID,
+        razorpay_key_secret=KEY_SECRET,
+        razorpay_api_base_url=UNREACHABLE_URL,
+        ipapi_base_url=UNREACHABLE_URL,
+        payment_signature_verifier=SignatureVerifier([KEY_SECRET]),
+        webhook_signature_verifier=SignatureVerifier(list(webhook_secrets))
+    )
+
+
+@asynccontextmanager
+async def running_app(integrations=None, mongo_client=None):
+    """Yield (app, client) for an app whose startup (indexes, catalog, seeding) has finished"""
+    import main
+
+    app = main.create_app(
+        # tz_aware like create_mongo_client, so dates read back carry their UTC offset
+        mongo_client=mongo_client or AsyncMongoMockClient(tz_aware=True, tzinfo=timezone.utc),
+        db_name="astrology_test",
+        integrations=integrations or make_integrations()
+    )
+    async with app.router.lifespan_context(app):
+        # Startup seeds availability last, in the background; wait for it
+        for _ in range(100):
+            if await app.state.db.astrologer_availability.count_documents({}) > 0:
+                break
+            await asyncio.sleep(0.02)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            yield app, client
+
+
+async def auth_headers(client: httpx.AsyncClient, email: str = "client@example.com") -> dict:
+    """Sign up a user and return their Authorization header"""
+    response = await client.post("/api/auth/signup", json={
+        "name": "Client", "email": email, "phone": "9876543210", "password": "client-password"
+    })
+    return {"Authorization": f"Bearer {response.json()['token']}"}
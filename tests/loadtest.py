@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Load test for the booking funnel
+
+Virtual users repeatedly run weighted scenarios against the API - slot browsing,
+signup/login, and booking creation -> payment order -> checkout -> payment
+verification (half of the payments are confirmed by a payment.captured webhook
+first, as in production) - and every request's latency is recorded. The report
+lists requests, errors, requests/sec and p50/p95/p99 latency per endpoint.
+
+Third parties are the fake servers from tests/fakes (real HTTP, configurable
+latency and error rate); bookings come from public IPs so ipapi is exercised.
+By default the app and the fakes run in-process and the app uses
+mongomock-motor, so no network or database is needed. --mongo-url runs it
+against a real MongoDB (database astrology_loadtest, dropped before the run).
+--url targets an already running server that uses `python -m tests.fakes` and
+the same Razorpay test secrets (RAZORPAY_KEY_ID/RAZORPAY_KEY_SECRET/
+RAZORPAY_WEBHOOK_SECRET) so payment and webhook signatures verify.
+
+In-process, httpx's ASGI transport returns only after BackgroundTasks finish,
+so endpoints that send emails in the background include that time; --url
+measures what clients actually see.
+
+Usage (from the repo root):
+    python -m tests.loadtest
+    python -m tests.loadtest --users 50 --duration 60 --mongo-url mongodb://localhost:27017
+    python -m tests.loadtest --fake-latency-ms 200 --fake-error-rate 0.02
+    python -m tests.loadtest --json results.json
+    python -m tests.loadtest --baseline results.json   # exit code 1 on p95/throughput regression
+"""
+
+import argparse
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from datetime import date, timedelta, timezone
+from typing import Dict, List, Optional
+
+import httpx
+
+from tests.fakes import DEFAULT_PORTS, FakeServers
+
+LOADTEST_DB_NAME = "astrology_loadtest"
+ASTROLOGER = "Acharyaa Indira Pandey"
+SERVICE_IDS = [str(service_id) for service_id in range(1, 10)]
+# Mostly Indian clients, some international (exercises every PPP tier)
+COUNTRIES = ["India"] * 6 + ["United States", "United Kingdom", "UAE", "Thailand"]
+DEFAULT_FAKE_RAZORPAY_URL = f"http://127.0.0.1:{DEFAULT_PORTS['razorpay']}"
+PASSWORD = "loadtest-password"
+
+RAZORPAY_KEY_ID = os.environ.get('RAZORPAY_KEY_ID', 'rzp_test_loadtest')
+RAZORPAY_KEY_SECRET = os.environ.get('RAZORPAY_KEY_SECRET', 'loadtest_key_secret')
+RAZORPAY_WEBHOOK_SECRET = os.environ.get('RAZORPAY_WEBHOOK_SECRET', 'loadtest_webhook_secret')
+
+
+def sign(secret: str, message: bytes) -> str:
+    return hmac.new(secret.encode('utf-8'), message, hashlib.sha256).hexdigest()
+
+
+def start_fake_servers(latency_ms: float = 0, error_rate: float = 0.0) -> FakeServers:
+    """Fake SendGrid/Razorpay/ipapi on free ports, using the load test's Razorpay secrets"""
+    servers = FakeServers(ports={}, razorpay_options={
+        "key_id": RAZORPAY_KEY_ID, "key_secret": RAZORPAY_KEY_SECRET, "webhook_secret": RAZORPAY_WEBHOOK_SECRET
+    })
+    for app in servers.apps.values():
+        app.state.fault_config.update({"latency_ms": latency_ms, "error_rate": error_rate})
+    servers.start()
+    return servers
+
+
+def configure_environment(mongo_url: Optional[str], servers: FakeServers):
+    """Environment for an in-process app; must run before main is imported"""
+    os.environ['MONGO_URL'] = mongo_url or 'mongodb://localhost:27017'  # Unused with mongomock
+    os.environ['DB_NAME'] = LOADTEST_DB_NAME
+    os.environ['RAZORPAY_KEY_ID'] = RAZORPAY_KEY_ID
+    os.environ['RAZORPAY_KEY_SECRET'] = RAZORPAY_KEY_SECRET
+    os.environ['RAZORPAY_WEBHOOK_SECRET'] = RAZORPAY_WEBHOOK_SECRET
+    os.environ.pop('RAZORPAY_PREVIOUS_KEY_SECRETS', None)
+    os.environ.update(servers.backend_env)
+    if mongo_url is None:
+        # mongomock doesn't emit command events or support explain
+        os.environ['SLOW_QUERY_THRESHOLD_MS'] = '0'
+
+
+@asynccontextmanager
+async def running_app(servers: FakeServers, mongo_url: Optional[str] = None, quiet: bool = True):
+    """Build the app against the fake servers and run it (lifespan included) for the duration of the block"""
+    configure_environment(mongo_url, servers)
+    import main
+    from database import create_mongo_client
+    from integrations import Integrations
+
+    if quiet:
+        # Per-request INFO logs would dominate the profile
+        logging.getLogger().setLevel(logging.WARNING)
+
+    if mongo_url is None:
+        from mongomock_motor import AsyncMongoMockClient
+        mongo_client = AsyncMongoMockClient(tz_aware=True, tzinfo=timezone.utc)
+    else:
+        mongo_client = create_mongo_client(mongo_url)
+        await mongo_client.drop_database(LOADTEST_DB_NAME)
+
+    # Settings are passed explicitly: the backend may have been imported earlier with a different environment
+    integrations = Integrations(
+        razorpay_key_id=RAZORPAY_KEY_ID,
+        razorpay_key_secret=RAZORPAY_KEY_SECRET,
+        razorpay_api_base_url=servers.base_urls["razorpay"],
+        ipapi_base_url=servers.base_urls["ipapi"]
+    )
+    app = main.create_app(mongo_client=mongo_client, db_name=LOADTEST_DB_NAME, integrations=integrations)
+    try:
+        async with app.router.lifespan_context(app):
+            # Startup seeds availability in the background; wait for it
+            for _ in range(100):
+                if await app.state.db.astrologer_availability.count_documents({}) > 0:
+                    break
+                await asyncio.sleep(0.05)
+            yield app
+    finally:
+        mongo_client.close()
+
+
+# Measurement
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Stats:
+    """Latencies and error counts per request name"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Counter = Counter()
+
+    def record(self, name: str, seconds: float, ok: bool):
+        self.latencies[name].append(seconds)
+        if not ok:
+            self.errors[name] += 1
+
+    def summary(self, elapsed: float) -> dict:
+        def summarize(latencies: List[float], errors: int) -> dict:
+            ordered = sorted(latencies)
+            return {
+                "requests": len(ordered),
+                "errors": errors,
+                "rps": round(len(ordered) / elapsed, 2),
+                "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+                "max_ms": round((ordered[-1] if ordered else 0) * 1000, 2),
+            }
+
+        all_latencies = [value for values in self.latencies.values() for value in values]
+        return {
+            "duration_s": round(elapsed, 2),
+            "requests": {name: summarize(values, self.errors[name]) for name, values in sorted(self.latencies.items())},
+            "total": summarize(all_latencies, sum(self.errors.values())),
+        }
+
+
+class VirtualUser:
+    """One simulated client: an HTTP client, its login token, IP address and a private RNG"""
+
+    def __init__(self, client: httpx.AsyncClient, checkout: httpx.AsyncClient, stats: Stats, rng: random.Random):
+        self.client = client
+        self.checkout = checkout  # Fake Razorpay, standing in for the browser checkout
+        self.stats = stats
+        self.rng = rng
+        self.token: Optional[str] = None
+        # Public address, geolocated by the ipapi fake
+        self.ip = f"{rng.randint(11, 99)}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+
+    @property
+    def auth_headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.token}"}
+
+    async def request(self, name: str, method: str, url: str, expected=(200,), **kwargs) -> Optional[httpx.Response]:
+        """Send a request and record it under `name`; returns the response if its status was expected"""
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+            ok = response.status_code in expected
+        except httpx.HTTPError:
+            response, ok = None, False
+        self.stats.record(name, time.perf_counter() - start, ok)
+        return response if ok else None
+
+    async def signup(self) -> bool:
+        email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+        response = await self.request("POST /api/auth/signup", "POST", "/api/auth/signup", json={
+            "name": "Load Test", "email": email, "phone": "9876543210", "password": PASSWORD
+        })
+        if response is None:
+            return False
+        self.token = response.json()["token"]
+        self.email = email
+        return True
+
+
+# Scenarios
+
+async def browse_slots(user: VirtualUser):
+    """Visitor comparing prices and looking for a free slot"""
+    country = user.rng.choice(COUNTRIES)
+    await user.request("GET /api/pricing", "GET", "/api/pricing", params={"country": country})
+    for _ in range(user.rng.randint(1, 3)):
+        slot_date = date.today() + timedelta(days=user.rng.randint(1, 14))
+        await user.request("GET /api/available-slots", "GET", "/api/available-slots", params={
+            "astrologer": ASTROLOGER, "date": slot_date.isoformat(), "service": user.rng.choice(SERVICE_IDS)
+        })
+    await user.request("GET /api/testimonials", "GET", "/api/testimonials")
+
+
+async def signup_login(user: VirtualUser):
+    """New account, then a fresh login"""
+    if not await user.signup():
+        return
+    response = await user.request("POST /api/auth/login", "POST", "/api/auth/login", json={
+        "email": user.email, "password": PASSWORD
+    })
+    if response is not None:
+        await user.request("GET /api/auth/verify", "GET", "/api/auth/verify", headers=user.auth_headers)
+
+
+async def book_and_pay(user: VirtualUser):
+    """Paid booking through checkout; half the payments are confirmed by webhook first"""
+    if user.token is None and not await user.signup():
+        return
+
+    slot_date = date.today() + timedelta(days=user.rng.randint(1, 14))
+    response = await user.request("POST /api/bookings", "POST", "/api/bookings", headers={
+        **user.auth_headers, "X-Forwarded-For": user.ip
+    }, json={
+        "name": "Load Test", "email": user.email, "phone": "9876543210",
+        "astrologer": ASTROLOGER, "service": user.rng.choice(SERVICE_IDS),
+        "consultation_type": "online", "consultation_duration": "10+",
+        "preferred_date": slot_date.isoformat(),
+        "preferred_time": f"{user.rng.choice([18, 19, 20, 21])}:{user.rng.choice(['00', '30'])}",
+    })
+    if response is None:
+        return
+    booking_id = response.json()["id"]
+
+    response = await user.request(
+        "POST /api/bookings/{booking_id}/payment-order", "POST", f"/api/bookings/{booking_id}/payment-order",
+        headers=user.auth_headers
+    )
+    if response is None:
+        return
+    order = response.json()
+    order_id = order["razorpay_order_id"]
+
+    # Browser checkout, simulated by the fake; not one of our endpoints, so only failures are recorded
+    try:
+        checkout = await user.checkout.post(f"/__fake__/orders/{order_id}/pay")
+        checkout.raise_for_status()
+    except httpx.HTTPError:
+        user.stats.record("checkout (fake Razorpay)", 0, False)
+        return
+    payment = checkout.json()
+    payment_id = payment["razorpay_payment_id"]
+
+    if user.rng.random() < 0.5:
+        body = json.dumps({
+            "event": "payment.captured",
+            "payload": {"payment": {"entity": {
+                "id": payment_id, "order_id": order_id, "amount": order["amount"],
+                "currency": order["currency"], "status": "captured"
+            }}}
+        }).encode('utf-8')
+        await user.request("POST /api/razorpay-webhook", "POST", "/api/razorpay-webhook", content=body, headers={
+            "Content-Type": "application/json",
+            "X-Razorpay-Signature": sign(RAZORPAY_WEBHOOK_SECRET, body),
+            "X-Razorpay-Event-Id": f"evt_{uuid.uuid4().hex[:14]}",
+        })
+
+    await user.request("POST /api/verify-payment", "POST", "/api/verify-payment", json={
+        **payment, "booking_id": booking_id
+    })
+
+    await user.request("GET /api/user/bookings", "GET", "/api/user/bookings", headers=user.auth_headers)
+
+
+# (scenario, weight)
+SCENARIOS = [
+    (browse_slots, 6),
+    (signup_login, 1),
+    (book_and_pay, 3),
+]
+
+
+async def run_load_test(client: httpx.AsyncClient, checkout: httpx.AsyncClient, users: int, duration: float,
+                        seed: int = 0) -> dict:
+    """Run `users` virtual users for `duration` seconds; returns the summary"""
+    stats = Stats()
+    scenarios = [scenario for scenario, _ in SCENARIOS]
+    weights = [weight for _, weight in SCENARIOS]
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
+
+    async def run_user(index: int):
+        user = VirtualUser(client, checkout, stats, random.Random(seed + index))
+        while loop.time() < deadline:
+            scenario = user.rng.choices(scenarios, weights)[0]
+            await scenario(user)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_user(index) for index in range(users)))
+    return stats.summary(time.perf_counter() - start)
+
+
+async def run_in_process(users: int, duration: float, mongo_url: Optional[str] = None, fake_latency_ms: float = 20,
+                         fake_error_rate: float = 0.0, seed: int = 0, quiet: bool = True) -> dict:
+    """Boot the app and the fake servers in-process and load test the app through an ASGI transport"""
+    servers = start_fake_servers(fake_latency_ms, fake_error_rate)
+    try:
+        async with running_app(servers, mongo_url, quiet) as app:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=30) as client, \
+                    httpx.AsyncClient(base_url=servers.base_urls["razorpay"], timeout=30) as checkout:
+                return await run_load_test(client, checkout, users, duration, seed)
+    finally:
+        servers.stop()
+
+
+async def run_against_url(url: str, users: int, duration: float, fake_razorpay_url: str = DEFAULT_FAKE_RAZORPAY_URL,
+                          seed: int = 0) -> dict:
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=url, timeout=30, limits=limits) as client, \
+            httpx.AsyncClient(base_url=fake_razorpay_url, timeout=30) as checkout:
+        return await run_load_test(client, checkout, users, duration, seed)
+
+
+def compare_to_baseline(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Regressions against a previous --json result: p95 per endpoint and total throughput"""
+    regressions = []
+    for name, previous in baseline.get("requests", {}).items():
+        current = results["requests"].get(name)
+        if current and current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {current['p95_ms']} ms vs baseline {previous['p95_ms']} ms")
+    previous_rps = baseline.get("total", {}).get("rps", 0)
+    if results["total"]["rps"] < previous_rps * (1 - tolerance):
+        regressions.append(f"throughput: {results['total']['rps']} req/s vs baseline {previous_rps} req/s")
+    return regressions
+
+
+def print_report(results: dict):
+    header = f"{'Request':<48} {'reqs':>7} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(f"\nLoad test results ({results['duration_s']} s)\n")
+    print(header)
+    print("-" * len(header))
+    rows = list(results["requests"].items()) + [("TOTAL", results["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<48} {row['requests']:>7} {row['errors']:>7} {row['rps']:>8.1f} "
+            f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f} {row['max_ms']:>8.1f}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Booking funnel load test")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users (default 20)")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run (default 30)")
+    parser.add_argument("--url", help="Test a running server instead of an in-process app")
+    parser.add_argument("--mongo-url", help="In-process app on this MongoDB instead of mongomock-motor")
+    parser.add_argument("--fake-latency-ms", type=float, default=20, help="In-process fake server latency (default 20)")
+    parser.add_argument("--fake-error-rate", type=float, default=0.0, help="In-process fake server error rate")
+    parser.add_argument("--fake-razorpay-url", default=DEFAULT_FAKE_RAZORPAY_URL,
+                        help="Fake Razorpay used for checkout with --url")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Fail if results regress against this --json file")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression ratio (default 0.25)")
+    parser.add_argument("--verbose", action="store_true", help="Keep the app's INFO logs")
+    args = parser.parse_args(argv)
+
+    if args.url:
+        results = asyncio.run(run_against_url(args.url, args.users, args.duration, args.fake_razorpay_url, args.seed))
+    else:
+        results = asyncio.run(run_in_process(
+            args.users, args.duration, args.mongo_url, args.fake_latency_ms, args.fake_error_rate,
+            args.seed, not args.verbose
+        ))
+
+    print_report(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_to_baseline(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""Apps built by create_app own their database, clients and jobs, so several can run in one process"""
+
+import asyncio
+
+import httpx
+from mongomock_motor import AsyncMongoMockClient
+
+
+async def signup(app, email: str) -> int:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/auth/signup", json={"name": "Test User", "email": email, "password": "test-password"}
+        )
+    return response.status_code
+
+
+def test_app_instances_are_isolated():
+    import main
+    from integrations import Integrations
+
+    async def run():
+        apps = [
+            main.create_app(mongo_client=AsyncMongoMockClient(), db_name="astrology_test", integrations=Integrations())
+            for _ in range(2)
+        ]
+        first, second = apps
+        async with first.router.lifespan_context(first), second.router.lifespan_context(second):
+            assert first.state.db is not second.state.db
+            assert first.state.integrations is not second.state.integrations
+
+            # Same email in both apps: each has its own users collection
+            assert await signup(first, "user@example.com") == 200
+            assert await signup(second, "user@example.com") == 200
+            assert await signup(first, "user@example.com") == 400
+
+        for app in apps:
+            assert app.state.integrations.http_client.is_closed
+
+    asyncio.run(run())
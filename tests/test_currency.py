@@ -0,0 +1,122 @@
+"""Multi-currency: cache validators follow the FX table, emails show the charged currency"""
+
+import asyncio
+
+from tests.harness import running_app
+
+import routers.catalog as catalog  # after the harness sets the test environment
+import routers.payments as payments
+from currency import FxSnapshot, format_amount
+from service_catalog import DEFAULT_SERVICES, ServiceCatalog
+
+
+def test_format_amount_uses_currency_exponent():
+    assert format_amount(110000, "INR") == "₹1,100.00"
+    assert format_amount(1320, "USD") == "USD 13.20"
+    assert format_amount(2000, "JPY") == "JPY 2,000"
+    assert format_amount(4120, "KWD") == "KWD 4.120"
+
+
+def test_pricing_etag_changes_with_fx_rates(monkeypatch):
+    monkeypatch.setattr(catalog, "get_charge_currency", lambda country: "USD")
+
+    async def run():
+        async with running_app() as (app, client):
+            etags = []
+            for rate in (0.012, 0.013):
+                monkeypatch.setattr(catalog, "get_fx_snapshot", lambda: FxSnapshot({"USD": rate}, "2026-10-01"))
+                response = await client.get("/api/pricing", params={"country": "United States"})
+                assert response.status_code == 200
+                etags.append(response.headers["etag"])
+            assert etags[0] != etags[1]
+
+            # Same rates, same validator
+            response = await client.get(
+                "/api/pricing", params={"country": "United States"}, headers={"If-None-Match": etags[1]}
+            )
+            assert response.status_code == 304
+
+    asyncio.run(run())
+
+
+def test_payment_confirmation_email_shows_charged_currency(monkeypatch):
+    sent = {}
+
+    async def record_email(to, subject, body):
+        sent[to] = body
+
+    monkeypatch.setattr(payments, "send_email", record_email)
+    booking = {
+        "id": "booking-1", "name": "Client", "email": "client@example.com", "phone": "9876543210",
+        "astrologer": "Acharyaa Indira Pandey", "service": "3", "consultation_duration": "10+",
+        "preferred_date": "2026-11-02", "preferred_time": "10:00",
+        "date_of_birth": None, "time_of_birth": None, "place_of_birth": None,
+        "amount": 110000, "charge_currency": "USD", "charge_amount": 1320,
+    }
+
+    asyncio.run(payments.send_payment_confirmation_emails(booking, "pay_1", ServiceCatalog(DEFAULT_SERVICES)))
+
+    customer_body = sent.pop("client@example.com")
+    assert "USD 13.20" in customer_body and "₹" not in customer_body
+    (admin_body,) = sent.values()
+    assert "USD 13.20 (₹1,100.00)" in admin_body
+
+
+class FakeRefunds:
+    def __init__(self):
+        self.requests = []
+
+    def refund(self, payment_id, data):
+        self.requests.append(data)
+        return {"id": "rfnd_1", "status": "pending"}
+
+
+class FakeRazorpayClient:
+    def __init__(self):
+        self.payment = FakeRefunds()
+
+
+def test_booking_and_cancellation_emails_use_charged_currency(monkeypatch):
+    import routers.bookings as bookings
+    from tests.harness import auth_headers
+
+    sent = []
+
+    async def record_email(to, subject, body):
+        sent.append(body)
+        return True
+
+    monkeypatch.setattr(bookings, "send_email", record_email)
+    monkeypatch.setattr(bookings, "quote_in_charge_currency", lambda amount, country: ("USD", 1320))
+
+    async def run():
+        async with running_app() as (app, client):
+            headers = await auth_headers(client)
+            response = await client.post("/api/bookings", headers=headers, json={
+                "name": "Client", "email": "client@example.com", "phone": "9876543210",
+                "astrologer": "Acharyaa Indira Pandey", "service": "3",
+                "consultation_type": "online", "consultation_duration": "10+",
+            })
+            assert response.status_code == 200
+            booking_id = response.json()["id"]
+            customer_body, admin_body = sent
+            assert "USD 13.20" in customer_body and "₹" not in customer_body
+            assert "USD 13.20 (₹" in admin_body
+
+            sent.clear()
+            await app.state.db.bookings.update_one({"id": booking_id}, {"$set": {
+                "payment_status": "completed", "status": "confirmed", "razorpay_payment_id": "pay_1"
+            }})
+            razorpay_client = FakeRazorpayClient()
+            app.state.integrations.razorpay_client = razorpay_client
+            response = await client.put(f"/api/bookings/{booking_id}/cancel", headers=headers)
+            assert response.status_code == 200
+
+            assert razorpay_client.payment.requests[0]["amount"] == 1320
+            booking = await app.state.db.bookings.find_one({"id": booking_id})
+            assert (booking["refund_amount"], booking["refund_currency"]) == (1320, "USD")
+            customer_body, admin_body = sent
+            assert "A full refund of USD 13.20" in customer_body and "₹" not in customer_body
+            assert "Process refund for USD 13.20" in admin_body
+
+    asyncio.run(run())
@@ -0,0 +1,67 @@
+"""Handlers turn unexpected failures into a 500, never a 200 with an empty body"""
+
+import asyncio
+
+import pytest
+
+from database import READ_WORKLOADS, ReadRouter
+from tests.harness import ADMIN_KEY, running_app
+
+
+class BrokenDatabase:
+    """Stands in for a database whose every operation fails"""
+
+    def __getattr__(self, name):
+        return self
+
+    def __getitem__(self, name):
+        return self
+
+    def __call__(self, *args, **kwargs):
+        raise RuntimeError("database unavailable")
+
+
+@pytest.mark.parametrize("method, url", [
+    ("GET", "/api/gemstones"),
+    ("GET", "/api/astrologer-availability/Acharyaa%20Indira%20Pandey"),
+    ("PUT", "/api/bookings/booking-1/status?status=confirmed"),
+    ("GET", "/api/admin/slow-queries"),
+])
+def test_database_failure_returns_500(monkeypatch, method, url):
+    import security
+
+    monkeypatch.setattr(security, "ADMIN_API_KEY", ADMIN_KEY)
+
+    async def run():
+        async with running_app() as (app, client):
+            broken = BrokenDatabase()
+            app.state.db = broken
+            app.state.read_router = ReadRouter(broken, broken, frozenset(READ_WORKLOADS))
+            response = await client.request(method, url, headers={"X-Admin-Key": ADMIN_KEY})
+            assert response.status_code == 500
+
+    asyncio.run(run())
+
+
+def test_gemstone_inquiry_failure_returns_500(monkeypatch):
+    import routers.contact
+
+    async def failing_send_email(*args, **kwargs):
+        raise RuntimeError("mail server unavailable")
+
+    monkeypatch.setattr(routers.contact, "send_email", failing_send_email)
+
+    async def run():
+        async with running_app() as (app, client):
+            signup = await client.post("/api/auth/signup", json={
+                "name": "Client", "email": "client@example.com", "password": "client-password"
+            })
+            response = await client.post(
+                "/api/gemstone-inquiry",
+                json={"gemstone": {"name": "Ruby"}, "customer": {"email": "client@example.com"}},
+                headers={"Authorization": f"Bearer {signup.json()['token']}"}
+            )
+            assert response.status_code == 500
+            assert response.json() == {"detail": "Failed to process inquiry"}
+
+    asyncio.run(run())
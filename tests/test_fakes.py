@@ -0,0 +1,70 @@
+"""The fake third-party servers answer the backend's clients like the real APIs"""
+
+import httpx
+import pytest
+import razorpay
+import requests
+
+from tests.fakes import FakeServers
+
+KEY_ID, KEY_SECRET = "rzp_test_fake", "fake_key_secret"
+
+
+@pytest.fixture(scope="module")
+def servers():
+    with FakeServers(ports={}, razorpay_options={"key_id": KEY_ID, "key_secret": KEY_SECRET}) as servers:
+        yield servers
+
+
+@pytest.fixture
+def razorpay_client(servers):
+    return razorpay.Client(auth=(KEY_ID, KEY_SECRET), base_url=servers.base_urls["razorpay"])
+
+
+def test_sendgrid_accepts_mail_send(servers):
+    response = requests.post(f"{servers.base_urls['sendgrid']}/v3/mail/send", headers={
+        "Authorization": "Bearer SG.fake"
+    }, json={
+        "personalizations": [{"to": [{"email": "client@example.com"}]}],
+        "from": {"email": "noreply@example.com"},
+        "subject": "Booking Confirmation",
+        "content": [{"type": "text/html", "value": "<p>Hi</p>"}],
+    }, timeout=5)
+
+    assert response.status_code == 202
+    messages = httpx.get(f"{servers.base_urls['sendgrid']}/__fake__/messages").json()
+    assert messages[-1]["to"] == ["client@example.com"]
+
+
+def test_ipapi_geolocates_deterministically(servers):
+    first = httpx.get(f"{servers.base_urls['ipapi']}/8.8.8.8/json/").json()
+    second = httpx.get(f"{servers.base_urls['ipapi']}/8.8.8.8/json/").json()
+
+    assert first == second
+    assert first["country_name"] and first["country_code"]
+
+
+def test_razorpay_order_checkout_and_refund(servers, razorpay_client):
+    order = razorpay_client.order.create(data={"amount": 307500, "currency": "INR", "receipt": "booking-1"})
+    payment = httpx.post(f"{servers.base_urls['razorpay']}/__fake__/orders/{order['id']}/pay").json()
+
+    # The checkout signature verifies with the SDK, like a real one
+    razorpay_client.utility.verify_payment_signature(payment)
+
+    refund = razorpay_client.payment.refund(payment["razorpay_payment_id"], {"amount": 307500})
+    assert refund["status"] == "pending"
+    fetched = razorpay_client.payment.fetch_refund_id(payment["razorpay_payment_id"], refund["id"])
+    assert fetched["id"] == refund["id"]
+
+    with pytest.raises(razorpay.errors.BadRequestError):
+        razorpay_client.payment.refund("pay_unknown", {"amount": 100})
+
+
+def test_error_injection_surfaces_as_sdk_errors(servers, razorpay_client):
+    config_url = f"{servers.base_urls['razorpay']}/__fake__/config"
+    httpx.put(config_url, json={"error_rate": 1.0})
+    try:
+        with pytest.raises(razorpay.errors.ServerError):
+            razorpay_client.order.create(data={"amount": 5000, "currency": "INR"})
+    finally:
+        httpx.put(config_url, json={"error_rate": 0.0})
@@ -0,0 +1,45 @@
+"""ETags of public content change when the content does, however it was written"""
+
+import asyncio
+
+from tests.harness import running_app
+
+
+def test_gemstones_etag_follows_direct_writes():
+    async def run():
+        async with running_app() as (app, client):
+            db = app.state.db
+            await db.gemstones.insert_one({"id": "ruby", "name": "Ruby", "price": 5000, "in_stock": True})
+
+            first = await client.get("/api/gemstones")
+            etag = first.headers["etag"]
+            response = await client.get("/api/gemstones", headers={"If-None-Match": etag})
+            assert response.status_code == 304
+
+            # Edited directly in Mongo, as the catalog is maintained
+            await db.gemstones.update_one({"id": "ruby"}, {"$set": {"price": 6000}})
+            response = await client.get("/api/gemstones", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["etag"] != etag
+            assert response.json()[0]["price"] == 6000
+
+    asyncio.run(run())
+
+
+def test_blog_post_etag_follows_direct_writes():
+    async def run():
+        async with running_app() as (app, client):
+            db = app.state.db
+            await db.blog_posts.insert_one({"id": "post-1", "title": "Saturn", "published": True, "date": "2026-01-01"})
+
+            etag = (await client.get("/api/blog/post-1")).headers["etag"]
+            listing_etag = (await client.get("/api/blog")).headers["etag"]
+            await db.blog_posts.update_one({"id": "post-1"}, {"$set": {"title": "Saturn return"}})
+
+            response = await client.get("/api/blog/post-1", headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.json()["title"] == "Saturn return"
+            response = await client.get("/api/blog", headers={"If-None-Match": listing_etag})
+            assert response.status_code == 200
+
+    asyncio.run(run())
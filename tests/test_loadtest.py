@@ -0,0 +1,32 @@
+"""Short in-process run of the load test: every funnel step must succeed"""
+
+import asyncio
+
+from tests import loadtest
+
+
+def test_booking_funnel_load_test_has_no_errors():
+    results = asyncio.run(loadtest.run_in_process(users=4, duration=3, fake_latency_ms=1))
+
+    assert results["total"]["errors"] == 0, results["requests"]
+    for name in (
+        "GET /api/available-slots",
+        "POST /api/bookings",
+        "POST /api/bookings/{booking_id}/payment-order",
+        "POST /api/verify-payment",
+    ):
+        assert results["requests"][name]["requests"] > 0
+
+
+def test_compare_to_baseline_flags_p95_and_throughput_regressions():
+    baseline = {
+        "requests": {"GET /api/pricing": {"p95_ms": 10.0}},
+        "total": {"rps": 100.0},
+    }
+    results = {
+        "requests": {"GET /api/pricing": {"p95_ms": 13.0}},
+        "total": {"rps": 70.0},
+    }
+
+    assert len(loadtest.compare_to_baseline(results, baseline, tolerance=0.25)) == 2
+    assert loadtest.compare_to_baseline(results, baseline, tolerance=0.5) == []
@@ -0,0 +1,120 @@
+"""A payment is confirmed once, whether checkout or the webhook reports it first"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from tests.harness import KEY_SECRET, running_app, sign
+
+import routers.payments as payments  # after the harness sets the test environment
+
+
+async def insert_pending_booking(db):
+    await db.bookings.insert_one({
+        "id": "booking-1", "name": "Client", "email": "client@example.com", "phone": "9876543210",
+        "astrologer": "Acharyaa Indira Pandey", "service": "3", "consultation_duration": "10+",
+        "preferred_date": "2026-11-02", "preferred_time": "10:00",
+        "date_of_birth": None, "time_of_birth": None, "place_of_birth": None,
+        "amount": 110000, "status": "pending", "payment_status": "pending", "razorpay_order_id": "order_1"
+    })
+
+
+def test_second_confirmation_sends_no_email_and_changes_nothing(monkeypatch):
+    sent = []
+
+    async def record_email(to, subject, body):
+        sent.append(subject)
+
+    monkeypatch.setattr(payments, "send_email", record_email)
+
+    async def run():
+        async with running_app() as (app, client):
+            db = app.state.db
+            await insert_pending_booking(db)
+
+            response = await client.post("/api/verify-payment", json={
+                "booking_id": "booking-1", "razorpay_order_id": "order_1", "razorpay_payment_id": "pay_1",
+                "razorpay_signature": sign(KEY_SECRET, b"order_1|pay_1"),
+            })
+            assert response.status_code == 200
+            assert len(sent) == 2  # Customer and admin
+            confirmed = await db.bookings.find_one({"id": "booking-1"}, {"_id": 0})
+            assert confirmed["payment_status"] == "completed" and confirmed["status"] == "confirmed"
+
+            # The payment.captured webhook for the same payment, then checkout retried
+            assert await payments.confirm_booking_payment(db, "order_1", "pay_1") is None
+            await payments.apply_razorpay_webhook_event(db, "payment.captured", {
+                "payment": {"entity": {"id": "pay_1", "order_id": "order_1"}}
+            }, app.state.catalog_store.catalog)
+            response = await client.post("/api/verify-payment", json={
+                "booking_id": "booking-1", "razorpay_order_id": "order_1", "razorpay_payment_id": "pay_1",
+                "razorpay_signature": sign(KEY_SECRET, b"order_1|pay_1"),
+            })
+            assert response.status_code == 200
+
+            assert len(sent) == 2
+            assert await db.bookings.find_one({"id": "booking-1"}, {"_id": 0}) == confirmed
+
+    asyncio.run(run())
+
+
+class FakeOrders:
+    """Razorpay order API handing out order_2, order_3, ..."""
+
+    def __init__(self):
+        self.created = 1
+
+    def create(self, data):
+        self.created += 1
+        return {"id": f"order_{self.created}"}
+
+
+class FakeRazorpayClient:
+    def __init__(self):
+        self.order = FakeOrders()
+
+
+def test_payment_on_replaced_order_confirms_booking(monkeypatch):
+    async def record_email(to, subject, body):
+        pass
+
+    monkeypatch.setattr(payments, "send_email", record_email)
+
+    async def run():
+        async with running_app() as (app, client):
+            db = app.state.db
+            await insert_pending_booking(db)
+            # order_1 expired, so reopening the payment modal created order_2
+            await db.bookings.update_one({"id": "booking-1"}, {"$set": {
+                "razorpay_order_ids": ["order_1"], "razorpay_order_amount": 110000,
+                "razorpay_order_created_at": datetime.now(timezone.utc) - timedelta(days=1),
+            }})
+            booking = await db.bookings.find_one({"id": "booking-1"}, {"_id": 0})
+            assert await payments.get_or_create_razorpay_order(db, FakeRazorpayClient(), booking) == "order_2"
+
+            # The client still pays in the checkout opened on order_1
+            response = await client.post("/api/verify-payment", json={
+                "booking_id": "booking-1", "razorpay_order_id": "order_1", "razorpay_payment_id": "pay_1",
+                "razorpay_signature": sign(KEY_SECRET, b"order_1|pay_1"),
+            })
+            assert response.json()["status"] == "success"
+            booking = await db.bookings.find_one({"id": "booking-1"})
+            assert booking["payment_status"] == "completed" and booking["razorpay_payment_id"] == "pay_1"
+
+    asyncio.run(run())
+
+
+def test_payment_on_unrelated_order_rejected():
+    async def run():
+        async with running_app() as (app, client):
+            db = app.state.db
+            await insert_pending_booking(db)
+
+            # Validly signed, but for an order this booking was never given
+            response = await client.post("/api/verify-payment", json={
+                "booking_id": "booking-1", "razorpay_order_id": "order_other", "razorpay_payment_id": "pay_1",
+                "razorpay_signature": sign(KEY_SECRET, b"order_other|pay_1"),
+            })
+            assert response.status_code == 400
+            assert (await db.bookings.find_one({"id": "booking-1"}))["payment_status"] == "pending"
+
+    asyncio.run(run())
@@ -0,0 +1,52 @@
+"""Designated read workloads go to the secondary handle; everything else, and cache validation, stays on the primary"""
+
+import asyncio
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from tests.harness import running_app
+
+from database import READ_WORKLOADS, ReadRouter, read_db
+from http_cache import bump_content_version
+
+
+def test_read_router_sends_only_listed_workloads_to_secondary():
+    primary, secondary = object(), object()
+    router = ReadRouter(primary, secondary, frozenset({"blog", "gemstones"}))
+
+    assert router.database("blog") is secondary
+    assert router.database("gemstones") is secondary
+    for workload in READ_WORKLOADS.keys() - {"blog", "gemstones"}:
+        assert router.database(workload) is primary
+
+
+def test_read_db_rejects_unknown_workload():
+    with pytest.raises(ValueError):
+        read_db("bookings")
+
+
+def test_testimonials_revalidated_against_primary_version():
+    async def run():
+        async with running_app() as (app, client):
+            # A secondary that hasn't replicated the latest testimonial edit yet
+            lagging = AsyncMongoMockClient(tz_aware=True)["astrology_test"]
+            app.state.read_router = ReadRouter(app.state.db, lagging, frozenset({"testimonials"}))
+
+            stale = await client.get("/api/testimonials")
+            assert stale.status_code == 200
+            await bump_content_version(app.state.db, "testimonials")
+
+            # The primary moved on: the old copy is not revalidated
+            response = await client.get("/api/testimonials", headers={"If-None-Match": stale.headers["etag"]})
+            assert response.status_code == 200
+            # and the list read from the lagging secondary isn't tagged with the new version
+            assert response.headers["etag"] == stale.headers["etag"]
+
+            await bump_content_version(lagging, "testimonials")
+            current = await client.get("/api/testimonials")
+            assert current.headers["etag"] != stale.headers["etag"]
+            response = await client.get("/api/testimonials", headers={"If-None-Match": current.headers["etag"]})
+            assert response.status_code == 304
+
+    asyncio.run(run())
@@ -0,0 +1,106 @@
+"""Only active catalog services can be booked, catalog edits stay in their app, and admin endpoints need the admin key"""
+
+import asyncio
+
+import pytest
+
+from tests.harness import ADMIN_KEY, auth_headers, running_app
+
+import security  # after the harness sets JWT_SECRET
+
+
+def booking_request(service: str, duration: str) -> dict:
+    return {
+        "name": "Client", "email": "client@example.com", "phone": "9876543210",
+        "astrologer": "Acharyaa Indira Pandey", "service": service,
+        "consultation_type": "online", "consultation_duration": duration,
+    }
+
+
+def test_paid_booking_of_unknown_or_inactive_service_rejected(monkeypatch):
+    monkeypatch.setattr(security, "ADMIN_API_KEY", ADMIN_KEY)
+
+    async def run():
+        async with running_app() as (app, client):
+            headers = await auth_headers(client)
+
+            response = await client.post("/api/bookings", json=booking_request("999", "10+"), headers=headers)
+            assert response.status_code == 400
+
+            response = await client.put(
+                "/api/admin/services/3", json={"active": False}, headers={"X-Admin-Key": ADMIN_KEY}
+            )
+            assert response.status_code == 200
+            response = await client.post("/api/bookings", json=booking_request("3", "10+"), headers=headers)
+            assert response.status_code == 400
+            assert await app.state.db.bookings.count_documents({}) == 0
+
+            # The free short consultation stays free
+            response = await client.post("/api/bookings", json=booking_request("3", "5-10"), headers=headers)
+            assert response.status_code == 200
+            assert response.json()["amount"] == 0
+
+    asyncio.run(run())
+
+
+def test_service_update_requires_admin_key(monkeypatch):
+    async def run():
+        async with running_app() as (app, client):
+            monkeypatch.setattr(security, "ADMIN_API_KEY", "")
+            response = await client.put("/api/admin/services/1", json={"actual_price": 1})
+            assert response.status_code == 503
+
+            monkeypatch.setattr(security, "ADMIN_API_KEY", ADMIN_KEY)
+            response = await client.put("/api/admin/services/1", json={"actual_price": 1})
+            assert response.status_code == 401
+            response = await client.put(
+                "/api/admin/services/1", json={"actual_price": 1}, headers={"X-Admin-Key": "wrong"}
+            )
+            assert response.status_code == 401
+
+            response = await client.put(
+                "/api/admin/services/1", json={"name": None}, headers={"X-Admin-Key": ADMIN_KEY}
+            )
+            assert response.status_code == 422
+
+            service = await app.state.db.services.find_one({"id": "1"})
+            assert service["actual_price"] != 1 and service["name"]
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("url", [
+    "/api/admin/upcoming-sessions?astrologer=Acharyaa%20Indira%20Pandey",
+    "/api/admin/services",
+    "/api/admin/metrics",
+    "/api/admin/slow-queries",
+])
+def test_admin_reads_require_admin_key(monkeypatch, url):
+    monkeypatch.setattr(security, "ADMIN_API_KEY", ADMIN_KEY)
+
+    async def run():
+        async with running_app() as (app, client):
+            assert (await client.get(url)).status_code == 401
+            assert (await client.get(url, headers={"X-Admin-Key": "wrong"})).status_code == 401
+            assert (await client.get(url, headers={"X-Admin-Key": ADMIN_KEY})).status_code == 200
+
+    asyncio.run(run())
+
+
+def test_service_edit_stays_in_its_own_app(monkeypatch):
+    monkeypatch.setattr(security, "ADMIN_API_KEY", ADMIN_KEY)
+
+    async def run():
+        async with running_app() as (first, first_client), running_app() as (second, second_client):
+            before = (await second_client.get("/api/pricing")).content
+            assert (await first_client.get("/api/pricing")).content == before
+
+            response = await first_client.put(
+                "/api/admin/services/3", json={"actual_price": 1}, headers={"X-Admin-Key": ADMIN_KEY}
+            )
+            assert response.status_code == 200
+            assert (await first_client.get("/api/pricing")).content != before
+            assert (await second_client.get("/api/pricing")).content == before
+            assert second.state.catalog_store.catalog is not first.state.catalog_store.catalog
+
+    asyncio.run(run())
@@ -0,0 +1,44 @@
+"""Razorpay signature verification with rotating secrets"""
+
+from tests.harness import sign
+
+from signatures import SignatureVerifier, build_payment_verifier, build_webhook_verifier, parse_secrets
+
+BODY = b'{"event": "payment.captured"}'
+
+
+def test_previous_secret_still_verifies_during_rotation():
+    verifier = SignatureVerifier(["new-secret", "old-secret"])
+
+    assert verifier.verify(BODY, sign("new-secret", BODY))
+    assert verifier.verify(BODY, sign("old-secret", BODY))
+    assert verifier.verify_payment("order_1", "pay_1", sign("old-secret", b"order_1|pay_1"))
+
+
+def test_wrong_signature_rejected():
+    verifier = SignatureVerifier(["new-secret", "old-secret"])
+
+    assert not verifier.verify(BODY, sign("retired-secret", BODY))
+    assert not verifier.verify(BODY + b" ", sign("new-secret", BODY))
+    assert not verifier.verify(BODY, sign("new-secret", BODY).upper())
+    assert not verifier.verify(BODY, "")
+    assert not verifier.verify(BODY, None)
+    assert not verifier.verify_payment("order_1", "pay_2", sign("new-secret", b"order_1|pay_1"))
+
+
+def test_no_secrets_disables_verification():
+    verifier = SignatureVerifier([])
+
+    assert not verifier.enabled
+    # Nothing verifies, not even a signature made with an empty key
+    assert not verifier.verify(BODY, sign("", BODY))
+
+
+def test_verifiers_read_secrets_from_environment(monkeypatch):
+    monkeypatch.setenv("RAZORPAY_KEY_SECRET", "key-secret")
+    monkeypatch.setenv("RAZORPAY_PREVIOUS_KEY_SECRETS", " old-key-secret, ,")
+    monkeypatch.setenv("RAZORPAY_WEBHOOK_SECRET", "")
+
+    assert parse_secrets(" a, ,b ") == ["a", "b"]
+    assert build_payment_verifier().verify(BODY, sign("old-key-secret", BODY))
+    assert not build_webhook_verifier().enabled
@@ -0,0 +1,42 @@
+"""Slow query log: per-client listeners, and startup without the capped collection"""
+
+import asyncio
+
+from mongomock_motor import AsyncMongoMockClient
+
+from tests.harness import running_app
+
+
+def test_each_client_has_its_own_listener():
+    from database import create_mongo_client
+    from slow_queries import get_slow_query_listener
+
+    first, second = create_mongo_client("mongodb://127.0.0.1:9"), create_mongo_client("mongodb://127.0.0.1:9")
+    try:
+        assert get_slow_query_listener(first) is not get_slow_query_listener(second)
+        assert get_slow_query_listener(first) is get_slow_query_listener(first)
+    finally:
+        first.close()
+        second.close()
+
+    assert not get_slow_query_listener(AsyncMongoMockClient()).enabled
+
+
+def test_startup_continues_when_slow_query_collection_fails(monkeypatch):
+    import main
+    from slow_queries import SlowQueryListener
+
+    async def failing_ensure_slow_query_collection(db):
+        raise RuntimeError("capped collections not supported")
+
+    monkeypatch.setattr(main, "get_slow_query_listener", lambda client: SlowQueryListener(100))
+    monkeypatch.setattr(main, "ensure_slow_query_collection", failing_ensure_slow_query_collection)
+
+    async def run():
+        async with running_app() as (app, client):
+            assert app.state.slow_query_listener.enabled
+            # Catalog and availability seeding ran after the failure
+            assert await app.state.db.services.count_documents({}) > 0
+            assert await app.state.db.astrologer_availability.count_documents({}) > 0
+
+    asyncio.run(run())
@@ -0,0 +1,51 @@
+"""Timestamps in API output carry their UTC offset; the slot start backfill finishes"""
+
+import asyncio
+from datetime import datetime, timezone
+
+from mongomock_motor import AsyncMongoMockClient
+
+from tests.harness import auth_headers, running_app
+
+from routers.bookings import backfill_slot_start_at  # after the harness sets the test environment
+
+
+def test_booking_timestamps_include_offset():
+    async def run():
+        async with running_app() as (app, client):
+            response = await client.post("/api/bookings", headers=await auth_headers(client), json={
+                "name": "Client", "email": "client@example.com", "phone": "9876543210",
+                "astrologer": "Acharyaa Indira Pandey", "service": "3",
+                "consultation_type": "online", "consultation_duration": "5-10",
+            })
+            assert response.status_code == 200
+            created = response.json()
+
+            # Read back from the database, not just the model that was just built
+            stored = (await client.get(f"/api/bookings/{created['id']}")).json()
+            for booking in (created, stored):
+                for field in ("created_at", "updated_at"):
+                    assert datetime.fromisoformat(booking[field]).utcoffset() is not None, booking[field]
+
+    asyncio.run(run())
+
+
+def test_backfill_marks_unparseable_bookings_once():
+    async def run():
+        db = AsyncMongoMockClient(tz_aware=True, tzinfo=timezone.utc)["backfill_test"]
+        await db.bookings.insert_many([
+            {"id": "booking-1", "preferred_date": "2026-11-02", "preferred_time": "10:00"},
+            {"id": "booking-2", "preferred_date": "next Tuesday", "preferred_time": "10:00"},
+        ])
+
+        assert await backfill_slot_start_at(db) == 1
+        assert (await db.bookings.find_one({"id": "booking-1"}))["slot_start_at"] == datetime(
+            2026, 11, 2, 4, 30, tzinfo=timezone.utc
+        )
+        assert (await db.bookings.find_one({"id": "booking-2"}))["slot_start_at"] is None
+
+        # Nothing left to scan on the next startup
+        assert await db.bookings.count_documents({"slot_start_at": {"$exists": False}}) == 0
+        assert await backfill_slot_start_at(db) == 0
+
+    asyncio.run(run())
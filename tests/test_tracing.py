@@ -0,0 +1,23 @@
+"""Span export failures are logged, but not once per span"""
+
+import io
+import logging
+
+import tracing
+
+
+def test_export_failures_logged_at_most_once_per_interval(monkeypatch, caplog):
+    clock = [1000.0]
+    monkeypatch.setattr(tracing.time, "monotonic", lambda: clock[0])
+    exporter = tracing.SpanExporter(io.StringIO())
+
+    with caplog.at_level(logging.WARNING, logger="tracing"):
+        for _ in range(5):
+            exporter._report_failure(OSError("disk full"))
+        assert len(caplog.records) == 1
+
+        # The next warning after the interval counts the failures it stood in for
+        clock[0] += tracing.SPAN_EXPORT_WARNING_INTERVAL_SECONDS
+        exporter._report_failure(OSError("disk full"))
+        assert len(caplog.records) == 2
+        assert "5 failure(s)" in caplog.records[1].getMessage()
@@ -0,0 +1,155 @@
+"""Webhook queue: duplicates are dropped, failures retried after backoff, events of a payment applied in order"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+from mongomock_motor import AsyncMongoMockClient
+
+from tests.harness import WEBHOOK_SECRET, running_app, sign
+
+import routers.payments as payments  # after the harness sets the test environment
+from service_catalog import DEFAULT_SERVICES, ServiceCatalog
+
+CATALOG = ServiceCatalog(DEFAULT_SERVICES)
+
+
+def captured_payload(payment_id: str, n: int = 0) -> dict:
+    return {"payment": {"entity": {"id": payment_id, "order_id": f"order_{payment_id}", "n": n}}}
+
+
+async def queue_event(db, event_id: str, payment_id: str, n: int, received_at: datetime):
+    await db.webhook_events.insert_one({
+        "event_id": event_id,
+        "event": "payment.captured",
+        "ordering_key": payment_id,
+        "payload": json.dumps({"event": "payment.captured", "payload": captured_payload(payment_id, n)}),
+        "status": "pending",
+        "attempts": 0,
+        "received_at": received_at,
+    })
+
+
+def record_applied(monkeypatch, fail_once=()):
+    """Replace event application with a recorder; events numbered in fail_once fail on their first attempt"""
+    applied, failed = [], set()
+
+    async def apply(db, event, payload_data, catalog):
+        entity = payload_data["payment"]["entity"]
+        key = (entity["id"], entity["n"])
+        await asyncio.sleep(0)  # Let other payment groups interleave
+        if key in fail_once and key not in failed:
+            failed.add(key)
+            raise RuntimeError("booking update failed")
+        applied.append(key)
+
+    monkeypatch.setattr(payments, "apply_razorpay_webhook_event", apply)
+    return applied
+
+
+async def expire_backoff(db):
+    """Move every waiting retry into the past, as if the backoff had elapsed"""
+    await db.webhook_events.update_many(
+        {"status": "failed"}, {"$set": {"next_attempt_at": datetime.now(timezone.utc) - timedelta(seconds=1)}}
+    )
+
+
+def test_duplicate_event_acknowledged_and_not_reprocessed(monkeypatch):
+    applied = record_applied(monkeypatch)
+
+    async def run():
+        async with running_app() as (app, client):
+            body = json.dumps({"event": "payment.captured", "payload": captured_payload("pay_1")}).encode('utf-8')
+            headers = {"X-Razorpay-Signature": sign(WEBHOOK_SECRET, body), "X-Razorpay-Event-Id": "evt_1"}
+
+            assert (await client.post("/api/razorpay-webhook", content=body, headers=headers)).json() == {
+                "status": "success"
+            }
+            await payments.drain_webhook_queue(app.state.db, app.state.catalog_store.catalog)
+
+            # Razorpay redelivers the event after it was applied
+            assert (await client.post("/api/razorpay-webhook", content=body, headers=headers)).json() == {
+                "status": "duplicate"
+            }
+            await payments.drain_webhook_queue(app.state.db, app.state.catalog_store.catalog)
+
+            assert applied == [("pay_1", 0)]
+            assert await app.state.db.webhook_events.count_documents({}) == 1
+
+    asyncio.run(run())
+
+
+def test_failed_event_retried_after_backoff(monkeypatch):
+    applied = record_applied(monkeypatch, fail_once={("pay_1", 0)})
+
+    async def run():
+        db = AsyncMongoMockClient(tz_aware=True)["webhook_queue_test"]
+        await queue_event(db, "evt_1", "pay_1", 0, datetime.now(timezone.utc))
+
+        assert await payments.drain_webhook_queue(db, CATALOG) == 0
+        event = await db.webhook_events.find_one({"event_id": "evt_1"})
+        assert event["status"] == "failed" and event["attempts"] == 1
+        assert event["next_attempt_at"] > datetime.now(timezone.utc)
+
+        # Not retried before the backoff elapses
+        assert await payments.drain_webhook_queue(db, CATALOG) == 0
+        assert applied == []
+
+        await expire_backoff(db)
+        assert await payments.drain_webhook_queue(db, CATALOG) == 1
+        assert applied == [("pay_1", 0)]
+        assert (await db.webhook_events.find_one({"event_id": "evt_1"}))["status"] == "processed"
+
+    asyncio.run(run())
+
+
+def test_events_of_a_payment_applied_in_order(monkeypatch):
+    # The first event of pay_1 fails: its later events must wait for the retry
+    applied = record_applied(monkeypatch, fail_once={("pay_1", 0)})
+
+    async def run():
+        db = AsyncMongoMockClient(tz_aware=True)["webhook_queue_test"]
+        start = datetime.now(timezone.utc) - timedelta(minutes=1)
+        for n in range(3):
+            await queue_event(db, f"evt_1_{n}", "pay_1", n, start + timedelta(seconds=2 * n))
+            await queue_event(db, f"evt_2_{n}", "pay_2", n, start + timedelta(seconds=2 * n + 1))
+
+        await payments.drain_webhook_queue(db, CATALOG)
+        assert [key for key in applied if key[0] == "pay_1"] == []
+        assert [key for key in applied if key[0] == "pay_2"] == [("pay_2", 0), ("pay_2", 1), ("pay_2", 2)]
+
+        # Events that arrive while the payment waits for its retry don't skip ahead either
+        await queue_event(db, "evt_1_3", "pay_1", 3, datetime.now(timezone.utc))
+        await payments.drain_webhook_queue(db, CATALOG)
+        assert [key for key in applied if key[0] == "pay_1"] == []
+
+        await expire_backoff(db)
+        await payments.drain_webhook_queue(db, CATALOG)
+        assert [key for key in applied if key[0] == "pay_1"] == [("pay_1", 0), ("pay_1", 1), ("pay_1", 2), ("pay_1", 3)]
+
+    asyncio.run(run())
+
+
+def test_payment_with_event_claimed_elsewhere_waits(monkeypatch):
+    applied = record_applied(monkeypatch)
+
+    async def run():
+        db = AsyncMongoMockClient(tz_aware=True)["webhook_queue_test"]
+        start = datetime.now(timezone.utc) - timedelta(minutes=1)
+        for n in range(2):
+            await queue_event(db, f"evt_1_{n}", "pay_1", n, start + timedelta(seconds=2 * n))
+        await queue_event(db, "evt_2_0", "pay_2", 0, start + timedelta(seconds=1))
+
+        # Another worker is applying the first event of pay_1
+        await db.webhook_events.update_one(
+            {"event_id": "evt_1_0"}, {"$set": {"status": "processing", "claimed_at": datetime.now(timezone.utc)}}
+        )
+        assert await payments.drain_webhook_queue(db, CATALOG) == 1
+        assert applied == [("pay_2", 0)]
+
+        # That worker finishes; the next event of pay_1 can go
+        await db.webhook_events.update_one({"event_id": "evt_1_0"}, {"$set": {"status": "processed"}})
+        assert await payments.drain_webhook_queue(db, CATALOG) == 1
+        assert applied == [("pay_2", 0), ("pay_1", 1)]
+
+    asyncio.run(run())
@@ -0,0 +1,55 @@
+"""Razorpay webhooks: only signed events are accepted"""
+
+import asyncio
+import json
+
+from tests.harness import WEBHOOK_SECRET, make_integrations, running_app, sign
+
+
+def captured_event(order_id: str, payment_id: str) -> bytes:
+    return json.dumps({
+        "event": "payment.captured",
+        "payload": {"payment": {"entity": {"id": payment_id, "order_id": order_id}}}
+    }).encode('utf-8')
+
+
+async def insert_pending_booking(db, booking_id: str = "booking-1", order_id: str = "order_1"):
+    await db.bookings.insert_one({
+        "id": booking_id, "email": "client@example.com", "name": "Client", "amount": 1100,
+        "status": "pending", "payment_status": "pending", "razorpay_order_id": order_id
+    })
+
+
+def test_webhook_rejected_without_secret():
+    async def run():
+        async with running_app(make_integrations(webhook_secrets=())) as (app, client):
+            await insert_pending_booking(app.state.db)
+            response = await client.post("/api/razorpay-webhook", content=captured_event("order_1", "pay_forged"))
+            assert response.status_code == 503
+
+            booking = await app.state.db.bookings.find_one({"id": "booking-1"})
+            assert booking["payment_status"] == "pending"
+            assert await app.state.db.webhook_events.count_documents({}) == 0
+
+    asyncio.run(run())
+
+
+def test_webhook_with_wrong_signature_rejected():
+    async def run():
+        async with running_app() as (app, client):
+            await insert_pending_booking(app.state.db)
+            body = captured_event("order_1", "pay_forged")
+            response = await client.post(
+                "/api/razorpay-webhook", content=body,
+                headers={"X-Razorpay-Signature": sign("not-the-secret", body)}
+            )
+            assert response.status_code == 400
+            assert await app.state.db.webhook_events.count_documents({}) == 0
+
+            response = await client.post(
+                "/api/razorpay-webhook", content=body,
+                headers={"X-Razorpay-Signature": sign(WEBHOOK_SECRET, body)}
+            )
+            assert response.json() == {"status": "success"}
+
+    asyncio.run(run())